@@ -0,0 +1,12 @@
+import pyaspg as pya
+
+
+DURATION = 24*60
+TIMESTEP = 1
+
+# Load the grid of 1.simple_grid.py from its grid file; later runs reuse the cached grid
+my_grid = pya.PyASPGCreator.from_file("examples/simple_grid.yaml")
+
+# Run the simulation
+simulator = pya.GridSimulator(my_grid)
+simulator.run_simulation(duration=DURATION, timestep=TIMESTEP, output_dir='simulation_results')
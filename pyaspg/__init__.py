@@ -1,6 +1,6 @@
-from pyaspg.communication import CommunicationNetwork, SmartMeter
-from pyaspg.distribution import Transmitter, Distributor, Substation
+from pyaspg.communication import CommunicationNetwork, SmartMeter, CompactSmartMeter
+from pyaspg.distribution import Transmitter, Distributor, Substation, CompactTransmitter, CompactDistributor, CompactSubstation
 from pyaspg.generation import WindTurbine, SolarPanel, PowerPlant, Generator
-from pyaspg.management import NetAggregator, UtilityCompany, ControlSystem
+from pyaspg.management import NetAggregator, UtilityCompany, ControlSystem, CompactNetAggregator
 from pyaspg.simulation import PyASPGCreator, GridSimulator
-from pyaspg.prosume import Prosumer
+from pyaspg.prosume import Prosumer, CompactProsumer
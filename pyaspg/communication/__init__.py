@@ -1,2 +1,3 @@
-from pyaspg.communication.smart_meter import SmartMeter
+from pyaspg.communication.smart_meter import SmartMeter, CompactSmartMeter
 from pyaspg.communication.communication_network import CommunicationNetwork
+from pyaspg.communication.event_network import EventCommunicationNetwork
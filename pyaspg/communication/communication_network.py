@@ -9,8 +9,15 @@ class CommunicationNetwork:
         transmitted_data (list): The list of data packets transmitted by the network.
         received_data (list): The list of data packets received by the network.
         reliability (float): The reliability of the network (a factor between 0 and 1).
+        packets_sent (int): The packets transmitted so far.
+        packets_lost (int): The packets lost by unreliability.
+        log_fields (tuple): The packet lists and reliability logged for the network; the packet counters are not logged.
+        static_fields (tuple): The reliability, the only network setting.
     """
 
+    log_fields = ('name', 'transmitted_data', 'received_data', 'reliability')
+    static_fields = ('reliability',)
+
     def __init__(self, name, reliability=0.99):
         """
         Initialize a CommunicationNetwork instance.
@@ -26,6 +33,8 @@ class CommunicationNetwork:
         self.transmitted_data = []
         self.received_data = []
         self.reliability = reliability
+        self.packets_sent = 0
+        self.packets_lost = 0
 
     def transmit_data(self, data):
         """
@@ -37,10 +46,12 @@ class CommunicationNetwork:
         Returns:
             bool: True if the data was transmitted successfully, False otherwise.
         """
+        self.packets_sent += 1
         if random() <= self.reliability:
             self.transmitted_data.append(data)
             return True
         else:
+            self.packets_lost += 1
             return False
 
     def receive_data(self, data):
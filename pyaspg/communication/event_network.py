@@ -0,0 +1,141 @@
+import numpy as np
+from pyaspg.communication.communication_network import CommunicationNetwork
+
+
+class EventCommunicationNetwork(CommunicationNetwork):
+    """
+    Class representing a communication network with latency, limited bandwidth and a bounded queue, run on SimPy events.
+
+    Packets submitted together, such as the meter readings of a reporting interval, get their loss outcomes
+    from one vectorized Bernoulli draw. The packets that survive join a first-in first-out queue served at
+    ``bandwidth`` packets per unit of simulation time, and packets that find the queue full are dropped.
+    Each packet reaches its destination ``latency`` after leaving the queue. Deliveries are scheduled as SimPy
+    timeouts, one per distinct arrival time, so ``resolution`` (rounding arrival times up) groups them further.
+
+    The network runs on the SimPy environment of GridSimulator.run_simulation, which attaches it.
+
+    Attributes:
+        latency (float): The transit time of a packet after it leaves the queue.
+        bandwidth (float): The packets sent per unit of simulation time, or None for no limit.
+        queue_capacity (int): The packets the queue holds, including the one being sent, or None for no limit.
+        resolution (float): The time grid arrival times are rounded up to, or None for exact times.
+        env (simpy.Environment): The environment the network runs on.
+        packets_dropped (int): The packets dropped because the queue was full.
+        packets_delivered (int): The packets delivered.
+        backlog (int): The packets waiting or being sent after the last submission.
+        total_delay (float): The summed time from submission to delivery of the delivered packets.
+    """
+
+    log_fields = CommunicationNetwork.log_fields + ('packets_sent', 'packets_lost', 'packets_dropped', 'packets_delivered', 'backlog')
+    static_fields = CommunicationNetwork.static_fields + ('latency', 'bandwidth', 'queue_capacity')
+    event_driven = True
+
+    def __init__(self, name, reliability=0.99, latency=0.0, bandwidth=None, queue_capacity=None, resolution=None, seed=None):
+        """
+        Initialize an EventCommunicationNetwork instance.
+
+        Args:
+            name (str): The name of the communication network.
+            reliability (float): The reliability of the network (a factor between 0 and 1).
+            latency (float): The transit time of a packet after it leaves the queue.
+            bandwidth (float): The packets sent per unit of simulation time. Default is no limit.
+            queue_capacity (int): The packets the queue holds. Default is no limit.
+            resolution (float): The time grid arrival times are rounded up to. Default is exact times.
+            seed (int): The seed of the random generator drawing the losses.
+        """
+        super().__init__(name, reliability)
+        if latency < 0:
+            raise ValueError("Latency cannot be negative")
+        if bandwidth is not None and bandwidth <= 0:
+            raise ValueError("Bandwidth must be positive")
+        if queue_capacity is not None and queue_capacity < 0:
+            raise ValueError("Queue capacity cannot be negative")
+        if resolution is not None and resolution <= 0:
+            raise ValueError("Resolution must be positive")
+
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.queue_capacity = queue_capacity
+        self.resolution = resolution
+        self.rng = np.random.default_rng(seed)
+        self.env = None
+        self.busy_until = 0.0
+        self.packets_dropped = 0
+        self.packets_delivered = 0
+        self.backlog = 0
+        self.total_delay = 0.0
+
+    def attach(self, env):
+        """
+        Run the network on a SimPy environment.
+
+        Args:
+            env (simpy.Environment): The environment.
+        """
+        self.env = env
+        self.busy_until = env.now
+
+    def submit(self, packets, deliver):
+        """
+        Send packets through the network at the current simulation time.
+
+        Args:
+            packets (list or np.ndarray): The packets.
+            deliver (callable): Called with the packets arriving together, in submission order (a slice of an array
+                when ``packets`` is an array).
+
+        Returns:
+            int: The number of packets accepted into the queue.
+        """
+        if self.env is None:
+            raise ValueError(f"{self.name} is not attached to a SimPy environment")
+        n = len(packets)
+        if not n:
+            return 0
+        now = self.env.now
+        self.packets_sent += n
+        kept = np.flatnonzero(self.rng.random(n) <= self.reliability)
+        self.packets_lost += n - len(kept)
+
+        if self.bandwidth is None:
+            departures = np.full(len(kept), float(now))
+        else:
+            # Packets still queued at this time, from the time the server needs to clear them
+            backlog = int(np.ceil(round((self.busy_until - now) * self.bandwidth, 9))) if self.busy_until > now else 0
+            if self.queue_capacity is not None:
+                room = max(self.queue_capacity - backlog, 0)
+                self.packets_dropped += max(len(kept) - room, 0)
+                kept = kept[:room]
+            departures = max(now, self.busy_until) + np.arange(1, len(kept) + 1) / self.bandwidth
+            if len(kept):
+                self.busy_until = departures[-1]
+            self.backlog = backlog + len(kept)
+
+        arrivals = departures + self.latency
+        if self.resolution is not None:
+            arrivals = np.ceil(np.round(arrivals / self.resolution, 9)) * self.resolution
+        if len(kept):
+            kept_packets = packets[kept] if isinstance(packets, np.ndarray) else [packets[i] for i in kept]
+            self.env.process(self._deliver(now, arrivals, kept_packets, deliver))
+        return len(kept)
+
+    def _deliver(self, sent, arrivals, packets, deliver):
+        i = 0
+        while i < len(packets):
+            j = int(np.searchsorted(arrivals, arrivals[i], side='right'))
+            if arrivals[i] > self.env.now:
+                yield self.env.timeout(arrivals[i] - self.env.now)
+            deliver(packets[i:j])
+            self.packets_delivered += j - i
+            self.total_delay += float(np.sum(arrivals[i:j] - sent))
+            i = j
+
+    @property
+    def mean_delay(self):
+        """
+        Get the mean time from submission to delivery.
+
+        Returns:
+            float: The mean delay of the delivered packets, or 0 before the first delivery.
+        """
+        return self.total_delay / self.packets_delivered if self.packets_delivered else 0.0
@@ -0,0 +1,36 @@
+import numpy as np
+
+# One meter reading of a reporting interval. The quantities are those of SmartMeter.measure: the totals
+# of the prosumer so far, its net power before receiving from the grid and its stored energy, in W.
+READING_DTYPE = np.dtype([
+    ('meter_id', np.int64),
+    ('timestep', np.int64),
+    ('consumption', np.float64),
+    ('production', np.float64),
+    ('net', np.float64),
+    ('stored', np.float64),
+])
+
+
+def read_meters(meters, meter_ids, timestep):
+    """
+    Read a list of smart meters into one record batch.
+
+    Args:
+        meters (list): The smart meters.
+        meter_ids (np.ndarray): The ID of every meter in the batch, e.g. its position in the grid's meter list.
+        timestep (int): The current timestep in the simulation.
+
+    Returns:
+        np.ndarray: One READING_DTYPE record per meter.
+    """
+    n = len(meters)
+    prosumers = [meter.prosumer for meter in meters]
+    batch = np.empty(n, dtype=READING_DTYPE)
+    batch['meter_id'] = meter_ids
+    batch['timestep'] = timestep
+    batch['consumption'] = np.fromiter((prosumer.total_consumption for prosumer in prosumers), dtype=float, count=n)
+    batch['production'] = np.fromiter((prosumer.total_production for prosumer in prosumers), dtype=float, count=n)
+    batch['net'] = np.fromiter((prosumer.net_power_before for prosumer in prosumers), dtype=float, count=n)
+    batch['stored'] = np.fromiter((prosumer.stored_energy for prosumer in prosumers), dtype=float, count=n)
+    return batch
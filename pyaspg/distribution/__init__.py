@@ -1,3 +1,3 @@
-from pyaspg.distribution.transmitter import Transmitter
-from pyaspg.distribution.distributor import Distributor
-from pyaspg.distribution.substation import Substation
+from pyaspg.distribution.transmitter import Transmitter, CompactTransmitter
+from pyaspg.distribution.distributor import Distributor, CompactDistributor
+from pyaspg.distribution.substation import Substation, CompactSubstation
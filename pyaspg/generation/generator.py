@@ -11,8 +11,13 @@ class Generator:
         current (float): The current in amperes (A).
         output (float): The current electricity output in watts (W).
         std_dev (float): The standard deviation for output variation.
+        log_fields (tuple): The ratings and output logged for the generator at each timestep.
+        static_fields (tuple): The nominal capacity, voltage and standard deviation, which a delta log stores once.
     """
 
+    log_fields = ('name', 'nominal_capacity', 'voltage', 'current', 'output', 'std_dev')
+    static_fields = ('nominal_capacity', 'voltage', 'std_dev')
+
     def __init__(self, name, nominal_capacity, voltage, std_dev=0.1):
         """
         Initialize a Generator instance.
@@ -8,8 +8,13 @@ class PowerPlant(Generator):
     Attributes:
         fuel_capacity (float): The total fuel available in liters or kilograms.
         consumption_rate (float): The fuel consumption rate per hour of operation.
+        log_fields (tuple): The generator columns followed by the remaining fuel and the consumption rate.
+        static_fields (tuple): The generator ratings and the consumption rate; the fuel capacity changes as fuel is burned.
     """
 
+    log_fields = Generator.log_fields + ('fuel_capacity', 'consumption_rate')
+    static_fields = Generator.static_fields + ('consumption_rate',)
+
     def __init__(self, name, nominal_capacity, voltage, fuel_capacity, consumption_rate, std_dev=0.1):
         """
         Initialize a PowerPlant instance.
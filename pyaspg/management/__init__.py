@@ -1,3 +1,3 @@
 from pyaspg.management.control_system import ControlSystem
-from pyaspg.management.net_aggregator import NetAggregator
+from pyaspg.management.net_aggregator import NetAggregator, CompactNetAggregator
 from pyaspg.management.utility_company import UtilityCompany
@@ -10,8 +10,11 @@ class ControlSystem:
     Attributes:
         name (str): The name of the control system.
         grid_data (dict): The data from various parts of the grid.
+        log_fields (tuple): The name and the grid data logged for the control system.
     """
 
+    log_fields = ('name', 'grid_data')
+
     def __init__(self, name):
         """
         Initialize a ControlSystem instance.
@@ -8,8 +8,11 @@ class UtilityCompany:
     Attributes:
         name (str): The name of the utility company.
         received_data (list): The list of aggregated data packets received from net aggregators.
+        log_fields (tuple): The name and the aggregated data received, logged at each timestep.
     """
 
+    log_fields = ('name', 'received_data')
+
     def __init__(self, name):
         """
         Initialize a UtilityCompany instance.
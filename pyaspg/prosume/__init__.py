@@ -1 +1,2 @@
-from .prosumer import Prosumer
+from .prosumer import Prosumer, CompactProsumer
+from .commands import Command, ReduceConsumption, ScaleConsumption, CapProduction
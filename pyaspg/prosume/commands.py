@@ -0,0 +1,157 @@
+class Command:
+    """
+    Class representing a typed command sent to prosumers, which adjusts their behaviour until it expires.
+
+    A command is issued once, at the step it is sent, and is active from that step for ``ttl`` steps. The
+    same instance is shared by all the prosumers it is sent to. The base command leaves the consumption and
+    production unchanged; subclasses override ``adjust_consumption`` and ``adjust_production``.
+
+    Attributes:
+        ttl (int): The number of steps the command stays active, or None for no expiry.
+        issued (int): The step the command was issued at, or None before it is sent.
+        expires (int): The first step the command is no longer active at, or None for no expiry.
+    """
+
+    __slots__ = ('ttl', 'issued', 'expires')
+
+    def __init__(self, ttl=None):
+        """
+        Initialize a Command instance.
+
+        Args:
+            ttl (int): The number of steps the command stays active. Default is no expiry.
+        """
+        if ttl is not None and ttl < 1:
+            raise ValueError("The time to live must be at least 1 step")
+
+        self.ttl = ttl
+        self.issued = None
+        self.expires = None
+
+    def issue(self, timestep):
+        """
+        Start the lifetime of the command.
+
+        Args:
+            timestep (int): The step the command is issued at.
+        """
+        self.issued = timestep
+        self.expires = timestep + self.ttl if self.ttl is not None else None
+
+    def expired(self, timestep):
+        """
+        Check whether the command expired.
+
+        Args:
+            timestep (int): The current step.
+
+        Returns:
+            bool: True if the command is no longer active at this step, False otherwise.
+        """
+        return self.expires is not None and timestep >= self.expires
+
+    def adjust_consumption(self, power):
+        """
+        Adjust the consumption of a prosumer.
+
+        Args:
+            power (float): The power consumption in watts (W).
+
+        Returns:
+            float: The adjusted power consumption in watts (W).
+        """
+        return power
+
+    def adjust_production(self, power):
+        """
+        Adjust the production of a prosumer.
+
+        Args:
+            power (float): The power production in watts (W).
+
+        Returns:
+            float: The adjusted power production in watts (W).
+        """
+        return power
+
+    def __repr__(self):
+        """Return a representation of the command."""
+        fields = [f"{name}={getattr(self, name)!r}" for name in type(self).__slots__ if name not in Command.__slots__]
+        return f"{type(self).__name__}({', '.join(fields + [f'ttl={self.ttl!r}'])})"
+
+
+class ReduceConsumption(Command):
+    """
+    Class representing a demand response command reducing the consumption of prosumers by a fixed power.
+
+    Attributes:
+        amount (float): The power reduction in watts (W).
+    """
+
+    __slots__ = ('amount',)
+
+    def __init__(self, amount, ttl=None):
+        """
+        Initialize a ReduceConsumption instance.
+
+        Args:
+            amount (float): The power reduction in watts (W).
+            ttl (int): The number of steps the command stays active. Default is no expiry.
+        """
+        super().__init__(ttl)
+        self.amount = amount
+
+    def adjust_consumption(self, power):
+        return max(power - self.amount, 0)
+
+
+class ScaleConsumption(Command):
+    """
+    Class representing a demand response command scaling the consumption of prosumers.
+
+    Attributes:
+        factor (float): The factor the consumption is multiplied by.
+    """
+
+    __slots__ = ('factor',)
+
+    def __init__(self, factor, ttl=None):
+        """
+        Initialize a ScaleConsumption instance.
+
+        Args:
+            factor (float): The factor the consumption is multiplied by.
+            ttl (int): The number of steps the command stays active. Default is no expiry.
+        """
+        if factor < 0:
+            raise ValueError("The scaling factor cannot be negative")
+        super().__init__(ttl)
+        self.factor = factor
+
+    def adjust_consumption(self, power):
+        return power * self.factor
+
+
+class CapProduction(Command):
+    """
+    Class representing a curtailment command capping the production of prosumers.
+
+    Attributes:
+        limit (float): The maximum power production in watts (W).
+    """
+
+    __slots__ = ('limit',)
+
+    def __init__(self, limit, ttl=None):
+        """
+        Initialize a CapProduction instance.
+
+        Args:
+            limit (float): The maximum power production in watts (W).
+            ttl (int): The number of steps the command stays active. Default is no expiry.
+        """
+        super().__init__(ttl)
+        self.limit = limit
+
+    def adjust_production(self, power):
+        return min(power, self.limit)
@@ -1,4 +1,17 @@
 from pyaspg.simulation.grid_creator import PyASPGCreator
 from pyaspg.simulation.grid_simulator import GridSimulator
-from pyaspg.simulation.data_log import DataLog
+from pyaspg.simulation.data_log import DataLog, read_delta_log
+from pyaspg.simulation.topology import GridTopology, LayerMatrix
+from pyaspg.simulation.live_feed import LiveFeed, LiveFeedReader, LiveFeedSpec
+from pyaspg.simulation.rollup import RollupWindow
+from pyaspg.simulation.logging_spec import LoggingSpec, OutputSpec
+from pyaspg.simulation.progress import ProgressMonitor, ProgressSpec
+from pyaspg.simulation.grid_file import load_grid
+from pyaspg.simulation.recorder import MemoryRecorder, SimulationResults
+from pyaspg.simulation.stepping import StepSnapshot
+from pyaspg.simulation.results_store import ResultsStore, ResultsStoreWriter
+from pyaspg.simulation.incremental import SimulationCache
+from pyaspg.simulation.pacing import StepPacer
+from pyaspg.simulation.metrics import MetricsExporter
+from pyaspg.simulation.memory import MemoryProfiler
 from pyaspg.simulation.connection_handler import GeneratorToTransmitterHandler, TransmitterToSubstationHandler
@@ -6,3 +6,4 @@ from .distributor_to_prosumer import DistributorToProsumerHandler
 from .prosumer_to_smart_meter import ProsumerToSmartMeterHandler
 from .smart_meter_to_aggregator import SmartMeterToAggregatorHandler
 from .aggregator_to_utility import AggregatorToUtilityHandler
+from .message_bus import MessageBusHandler
@@ -8,3 +8,28 @@ class BaseHandler(ABC):
     @abstractmethod
     def handle_connection(self, source, target, parameters, timestep):
         pass
+
+    def handle_layer(self, connections, layer, timestep):
+        """
+        Handle every connection of a layer for one timestep.
+
+        Args:
+            connections (list): The (source, target, params) tuples of the layer.
+            layer (LayerMatrix): The sparse topology of the layer.
+            timestep (int): The current timestep in the simulation.
+        """
+        for source, target, params in connections:
+            self.handle_connection(source, target, params, timestep)
+
+    def feed_targets(self, layer, source_outputs):
+        """
+        Sum the source outputs over the edges of a layer (a grouped segment-sum) and feed each connected target once.
+
+        Args:
+            layer (LayerMatrix): The sparse topology of the layer.
+            source_outputs (np.ndarray): The output power of every source in watts (W).
+        """
+        totals = layer.rollup(source_outputs)
+        targets = layer.targets
+        for target_id in layer.connected_targets:
+            targets[target_id].receive(totals[target_id])
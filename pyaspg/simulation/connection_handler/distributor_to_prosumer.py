@@ -13,17 +13,24 @@ class DistributorToProsumerHandler(BaseHandler):
             params (dict): Additional parameters for the connection.
             timestep (int): The current timestep in the simulation.
         """
+        # Active commands adjust the consumption and production of the timestep
+        target.expire_commands(timestep)
         # Generate power consumption, production and update the net
         # print("\nNew timestep", "#"*50)
         random_consumption = target.generate_consumption()
         # print("Net power after consumption:", target.net_power)
         random_generation = target.generate_production()
-        # Determine how much power the prosumer needs
-        power_needed = target.net_power
         # print("Net power after generation:", target.net_power)
-        # Prosumer first uses stored energy
-        # target.consume(power_needed)
+        self.deliver(source, target)
 
+    def deliver(self, source, target):
+        """
+        Supply the net power a prosumer still needs from the power left on a distributor.
+
+        Args:
+            source (Distributor): The source distributor.
+            target (Prosumer): The target prosumer, after its consumption and production of the timestep.
+        """
         # Any remaining power needed is pulled from the distributor
         remaining_power_needed = target.net_power
         if remaining_power_needed > 0 and source.available_power > 0:
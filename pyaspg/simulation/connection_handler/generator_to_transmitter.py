@@ -1,3 +1,4 @@
+import numpy as np
 from pyaspg.simulation.connection_handler import BaseHandler
 from pyaspg.generation import WindTurbine, SolarPanel, PowerPlant
 from pyaspg.utils import log_me
@@ -6,6 +7,37 @@ from pyaspg.utils import log_me
 @log_me
 class GeneratorToTransmitterHandler(BaseHandler):
     def handle_connection(self, source, target, params, timestep):
+        output_power = self.generate(source, params, timestep)
+        target.receive(output_power)
+
+    def handle_layer(self, connections, layer, timestep):
+        """
+        Generate once per generator and feed the summed output of all its generators to every transmitter.
+
+        Args:
+            connections (list): The (source, target, params) tuples of the layer.
+            layer (LayerMatrix): The sparse topology of the layer.
+            timestep (int): The current timestep in the simulation.
+        """
+        output_power = np.zeros(layer.shape[0])
+        for source_id in layer.connected_sources:
+            # The first connection of a generator provides its resource series
+            params = connections[layer.edge_order[layer.indptr[source_id]]][2]
+            output_power[source_id] = self.generate(layer.sources[source_id], params, timestep)
+        self.feed_targets(layer, output_power)
+
+    def generate(self, source, params, timestep):
+        """
+        Generate the output power of a generator for a timestep.
+
+        Args:
+            source (Generator): The generator.
+            params (dict): The parameters of the connection holding the resource series.
+            timestep (int): The current timestep in the simulation.
+
+        Returns:
+            float: The output power in watts (W).
+        """
         if isinstance(source, WindTurbine):
             wind_speed = params.get('wind_speed', [])[timestep]
             output_power = source.generate(wind_speed)
@@ -14,6 +46,4 @@ class GeneratorToTransmitterHandler(BaseHandler):
             output_power = source.generate(sunlight)
         elif isinstance(source, PowerPlant):
             output_power = source.generate()
-        
-        target.receive(output_power)
-
+        return output_power
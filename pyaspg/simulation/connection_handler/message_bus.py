@@ -0,0 +1,88 @@
+import numpy as np
+from pyaspg.communication.message_bus import read_meters
+from pyaspg.simulation.connection_handler import BaseHandler
+from pyaspg.utils import log_me
+
+@log_me
+class MessageBusHandler(BaseHandler):
+    """
+    Class handling the smart meter to aggregator layer as a message bus that delivers one record batch per aggregator.
+
+    Every step, all meters of the layer are read into one READING_DTYPE array and the losses of each
+    communication network are drawn at once. Each aggregator then receives the readings that got through as
+    one batch through ``collect_batch``, and sums them with NumPy. Readings sent over an event-driven network
+    (see EventCommunicationNetwork) are delivered in batches when they arrive.
+
+    Attributes:
+        creator (PyASPGCreator): The grid, whose topology gives the ID of every meter.
+    """
+
+    def __init__(self, creator):
+        """
+        Initialize a MessageBusHandler instance.
+
+        Args:
+            creator (PyASPGCreator): The grid, whose topology gives the ID of every meter.
+        """
+        self.creator = creator
+
+    def handle_connection(self, source, target, params, timestep):
+        """
+        Handle the connection between a smart meter and a net aggregator, as a batch of one reading.
+
+        Args:
+            source (SmartMeter): The source smart meter.
+            target (NetAggregator): The target net aggregator.
+            params (dict): Additional parameters for the connection.
+            timestep (int): The current timestep in the simulation.
+        """
+        if np.random.random() <= source.communication_network.reliability:
+            target.collect_batch(read_meters([source], [self.creator.topology.id_of(source)], timestep))
+
+    def handle_layer(self, connections, layer, timestep):
+        """
+        Read every meter of the layer once per edge and deliver the readings to the aggregators in batches.
+
+        Args:
+            connections (list): The (source, target, params) tuples of the layer.
+            layer (LayerMatrix): The sparse topology of the layer.
+            timestep (int): The current timestep in the simulation.
+        """
+        if not connections:
+            return
+        meters = [source for source, _, _ in connections]
+        readings = read_meters(meters, layer.edge_sources, timestep)
+
+        networks = {}
+        for edge, meter in enumerate(meters):
+            networks.setdefault(meter.communication_network, []).append(edge)
+
+        def deliver(edges):
+            self.dispatch(readings, edges, layer)
+
+        for network, edges in networks.items():
+            edges = np.array(edges, dtype=np.intp)
+            if getattr(network, 'event_driven', False):
+                network.submit(edges, deliver)
+            else:
+                delivered = edges[np.random.random(len(edges)) <= network.reliability]
+                network.packets_sent += len(edges)
+                network.packets_lost += len(edges) - len(delivered)
+                deliver(delivered)
+
+    def dispatch(self, readings, edges, layer):
+        """
+        Hand the readings of some edges to their aggregators, one batch per aggregator.
+
+        Args:
+            readings (np.ndarray): The readings of every edge of the layer.
+            edges (np.ndarray): The edges whose readings got through.
+            layer (LayerMatrix): The sparse topology of the layer.
+        """
+        targets = layer.edge_targets[edges]
+        order = np.argsort(targets, kind='stable')
+        edges, targets = edges[order], targets[order]
+        bounds = np.flatnonzero(np.diff(targets)) + 1
+        for group in np.split(np.arange(len(edges)), bounds):
+            if len(group):
+                layer.targets[targets[group[0]]].collect_batch(readings[edges[group]])
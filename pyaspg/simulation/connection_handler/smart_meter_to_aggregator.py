@@ -16,3 +16,28 @@ class SmartMeterToAggregatorHandler(BaseHandler):
         # Collect data from the smart meter and send it to the aggregator
         if source.send_data():
             target.collect_data(source, timestep)
+
+    def handle_layer(self, connections, layer, timestep):
+        """
+        Handle every connection of a layer for one timestep, sending the readings of meters on an event-driven
+        network (see EventCommunicationNetwork) as one batch per network.
+
+        Args:
+            connections (list): The (source, target, params) tuples of the layer.
+            layer (LayerMatrix): The sparse topology of the layer.
+            timestep (int): The current timestep in the simulation.
+        """
+        batches = {}
+        for source, target, params in connections:
+            network = source.communication_network
+            if getattr(network, 'event_driven', False):
+                batches.setdefault(network, []).append((source, target, source.measure()))
+            else:
+                self.handle_connection(source, target, params, timestep)
+
+        def deliver(packets):
+            for source, target, data in packets:
+                target.collect_data(source, timestep, data)
+
+        for network, packets in batches.items():
+            network.submit(packets, deliver)
@@ -1,3 +1,4 @@
+import numpy as np
 from pyaspg.simulation.connection_handler import BaseHandler
 from pyaspg.utils import log_me
 
@@ -16,3 +17,17 @@ class SubstationToDistributorHandler(BaseHandler):
         # Get the output power from the substation and pass it to the distributor
         output_power = source.transform()
         target.receive(output_power)
+
+    def handle_layer(self, connections, layer, timestep):
+        """
+        Compute each substation output once and feed the summed outputs to every distributor.
+
+        Args:
+            connections (list): The (source, target, params) tuples of the layer.
+            layer (LayerMatrix): The sparse topology of the layer.
+            timestep (int): The current timestep in the simulation.
+        """
+        output_power = np.zeros(layer.shape[0])
+        for source_id in layer.connected_sources:
+            output_power[source_id] = layer.sources[source_id].transform()
+        self.feed_targets(layer, output_power)
@@ -1,3 +1,4 @@
+import numpy as np
 from pyaspg.simulation.connection_handler import BaseHandler
 from pyaspg.utils import log_me
 
@@ -17,3 +18,17 @@ class TransmitterToSubstationHandler(BaseHandler):
         # Get the input power from the transmitter and pass it to the substation
         input_power = source.transmit()
         target.receive(input_power)
+
+    def handle_layer(self, connections, layer, timestep):
+        """
+        Compute each transmitter output once and feed the summed outputs to every substation.
+
+        Args:
+            connections (list): The (source, target, params) tuples of the layer.
+            layer (LayerMatrix): The sparse topology of the layer.
+            timestep (int): The current timestep in the simulation.
+        """
+        output_power = np.zeros(layer.shape[0])
+        for source_id in layer.connected_sources:
+            output_power[source_id] = layer.sources[source_id].transmit()
+        self.feed_targets(layer, output_power)
@@ -1,30 +1,111 @@
 import os
+import io
 import csv
+import gzip
+import json
+from operator import attrgetter
+import numbers
+import numpy as np
+import pandas as pd
 from pyaspg.generation import WindTurbine, SolarPanel
 from pyaspg.utils import log_me
+from .results_store import ResultsStoreWriter
 
 @log_me
 class DataLog:
-    def __init__(self, output_dir):
+    # File suffix of every compression
+    suffixes = {None: '', 'gzip': '.gz', 'zstd': '.zst', 'lz4': '.lz4'}
+    # Fast levels by default, since the files are compressed while the simulation waits on them
+    default_levels = {'gzip': 1, 'zstd': 3, 'lz4': 0}
+
+    def __init__(self, output_dir, delta=False, tolerance=0.0, rollups=(), full_resolution=True, spec=None,
+                 compression=None, compression_level=None, buffer_size=1 << 20, float_precision=None,
+                 store=None, store_chunk_steps=1024, timestep=1):
+        """
+        Initialize a DataLog instance.
+
+        Args:
+            output_dir (str): The directory the CSV files are written to.
+            delta (bool): Only write a component's row when a logged field changed since its last written row.
+            tolerance (float): The absolute change below which numeric fields count as unchanged in delta mode.
+            rollups (list): The RollupWindow instances maintained during the run, each written to its own file.
+            full_resolution (bool): Write a row per component and timestep. Turn off to only write the rollups.
+            spec (LoggingSpec): The component types, components and columns logged. Default is everything.
+            compression (str): Compress the CSV files while they are written with 'gzip', 'zstd' or 'lz4'.
+                'zstd' and 'lz4' need the ``zstandard`` and ``lz4`` packages.
+            compression_level (int): The compression level. Default is a fast level (see ``default_levels``).
+            buffer_size (int): The size in bytes of the write buffer of every file.
+            float_precision (int): Write floats with this number of significant digits instead of their full repr.
+            store (str): The directory of a chunked results store written alongside the CSV files (see ResultsStore).
+            store_chunk_steps (int): The number of steps per chunk of the results store.
+            timestep (float): The length of a simulation step, which the energy of the rollups is integrated over.
+        """
+        if compression not in self.suffixes:
+            raise ValueError(f"Invalid compression: {compression}")
         self.output_dir = output_dir
+        self.delta = delta
+        self.tolerance = tolerance
+        self.rollups = list(rollups)
+        self.full_resolution = full_resolution
+        self.spec = spec
+        self.compression = compression
+        self.compression_level = compression_level
+        self.buffer_size = buffer_size
+        self.float_precision = float_precision
+        self.store = store
+        self.store_chunk_steps = store_chunk_steps
+        self.timestep = timestep
+        self.store_writer = None
         self.files = {}
         self.writers = {}
         self.params = {}
+        self.topology = None
+        self.fields = {}
+        self.getters = {}
+        self.last_rows = {}
+        self.timestep_file = None
+        self.selected = {}
+        self.positions = {}
 
-    def initialize_files(self, components, connections):
+    def initialize_files(self, components, connections, topology=None):
+        self.topology = topology
+        for rollup in self.rollups:
+            if components.get(rollup.component_type):
+                rollup_file = self._open(rollup.file_name)
+                self.files[rollup.file_name] = rollup_file
+                rollup.start(components[rollup.component_type], self._writer(rollup_file), self.timestep)
+        if self.store is not None:
+            logged = {component_type: component_list for component_type, component_list in components.items()
+                      if self.spec is None or self.spec.logs(component_type)}
+            self.store_writer = ResultsStoreWriter(self.store, logged, self.store_chunk_steps, topology)
+        if not self.full_resolution:
+            return
+        if self.delta:
+            # The full time axis lets readers forward-fill steps where nothing changed
+            self.timestep_file = self._open("timesteps.csv")
+            self.timestep_file.write("timestep\n")
+        metadata = {}
         for component_type, component_list in components.items():
-            if component_list:
-                file_path = os.path.join(self.output_dir, f"{component_type}.csv")
-                self.files[component_type] = open(file_path, 'w', newline='')
-                self.writers[component_type] = csv.writer(self.files[component_type])
+            selected = self.spec.select(component_type, component_list) if self.spec else list(enumerate(component_list))
+            if selected:
+                self.selected[component_type] = selected
+                self.files[component_type] = self._open(f"{component_type}.csv")
+                self.writers[component_type] = self._writer(self.files[component_type])
                 
                 # Define headers
-                if component_type == 'prosumers':
-                    header = ['timestep', 'name', 'stored_energy_before', 'net_power_before', 'received_power', 'stored_energy', 'net_power', 'distributor_name']
-                elif component_type == 'smart_meters':
+                if component_type == 'smart_meters':
                     header = ['timestep', 'prosumer_name', 'total_consumption', 'total_production', 'net_read', 'is_sent', 'consumption', 'production']
                 else:
-                    header = ['timestep'] + [attr for attr in vars(component_list[0]).keys() if attr != 'env']
+                    fields = self.fields_of(component_list[0])
+                    if self.spec:
+                        static = self.spec.static_fields(component_list[0])
+                        if static:
+                            metadata[component_type] = {component.name: {field: getattr(component, field) for field in static}
+                                                        for _, component in selected}
+                        fields = self.spec.select_columns(component_type, [field for field in fields if field not in static])
+                    self.fields[component_type] = tuple(fields)
+                    self.getters[component_type] = attrgetter(*fields) if fields else None
+                    header = ['timestep'] + list(self.fields[component_type])
 
                 # Add wind_speed or sunlight to the header if applicable
                 if component_type == 'generators':
@@ -41,58 +122,223 @@ class DataLog:
                 # Remove duplicate columns
                 header = list(dict.fromkeys(header))
 
+                # Columns other than the component fields are dropped from the full row
+                if self.spec and component_type in self.spec.columns:
+                    kept = self.spec.select_columns(component_type, header)
+                    positions = [header.index(column) for column in kept]
+                    if len(positions) < len(header):
+                        self.positions[component_type] = positions
+                    header = kept
+
                 self.writers[component_type].writerow(header)
                 
                 # Save params for later use
                 if component_type == 'generators':
                     self.params[component_type] = params
 
+        if self.spec:
+            with open(os.path.join(self.output_dir, "metadata.json"), 'w') as metadata_file:
+                json.dump(metadata, metadata_file, indent=2, default=str)
+
     def log_data(self, timestep, components, connections):
-        for component_type, component_list in components.items():
-            if component_list:
-                writer = self.writers[component_type]
-                for i, component in enumerate(component_list):
-                    data = [timestep]
-                    if component_type == 'prosumers':
-                        data.extend([
-                            component.name,
-                            component.stored_energy_before,
-                            component.net_power_before,
-                            component.received_power,
-                            component.stored_energy,
-                            component.net_power,
-                            component.distributor_name
-                        ])
-                    elif component_type == 'smart_meters':
-                        is_sent = 1 if component.communication_network.transmit_data(component.data) else 0
-                        data.extend([
-                            component.prosumer.name,
-                            component.prosumer.total_consumption,
-                            component.prosumer.total_production,
-                            component.prosumer.net_power_before,
-                            is_sent,
-                            component.prosumer.last_generated_consumption,
-                            component.prosumer.last_generated_production
-                        ])
-                    else:
-                        data += [getattr(component, attr) for attr in vars(component) if attr != 'env']
-
-                    # Add wind_speed or sunlight to the data if applicable
-                    if component_type == 'generators':
-                        for source, target, params in connections['generator_to_transmitter']:
-                            if source == component:
-                                if 'wind_speed' in params:
-                                    data.append(params['wind_speed'][timestep // 10])
-                                elif 'sunlight' in params:
-                                    data.append(params['sunlight'][timestep // 10])
-
-                    # Add specific data for distributors
-                    if component_type == 'distributors':
-                        power_to_prosumers = sum([target.received_power for _, target, _ in connections['distributor_to_prosumer'] if _ == component])
-                        data.append(power_to_prosumers)
-
-                    writer.writerow(data)
+        for rollup in self.rollups:
+            if rollup.writer is not None:
+                rollup.update(timestep, components[rollup.component_type])
+        if self.store_writer is not None:
+            self.store_writer.append(timestep, components)
+        if not self.full_resolution:
+            return
+        if self.timestep_file is not None:
+            self.timestep_file.write(f"{timestep}\n")
+        power_to_prosumers = self._power_to_prosumers(components, connections) if 'distributors' in self.selected else None
+        for component_type, selected in self.selected.items():
+            writer = self.writers[component_type]
+            last_rows = self.last_rows.setdefault(component_type, {}) if self.delta else None
+            getter = self.getters.get(component_type)
+            n_fields = len(self.fields.get(component_type, ()))
+            positions = self.positions.get(component_type)
+            for i, component in selected:
+                data = [timestep]
+                if component_type == 'smart_meters':
+                    is_sent = 1 if component.communication_network.transmit_data(component.data) else 0
+                    data.extend([
+                        component.prosumer.name,
+                        component.prosumer.total_consumption,
+                        component.prosumer.total_production,
+                        component.prosumer.net_power_before,
+                        is_sent,
+                        component.prosumer.last_generated_consumption,
+                        component.prosumer.last_generated_production
+                    ])
+                elif n_fields == 1:
+                    data.append(getter(component))
+                elif n_fields:
+                    data.extend(getter(component))
+
+                # Add wind_speed or sunlight to the data if applicable
+                if component_type == 'generators':
+                    for source, target, params in connections['generator_to_transmitter']:
+                        if source == component:
+                            if 'wind_speed' in params:
+                                data.append(params['wind_speed'][timestep // 10])
+                            elif 'sunlight' in params:
+                                data.append(params['sunlight'][timestep // 10])
+
+                # Add specific data for distributors
+                if component_type == 'distributors':
+                    data.append(power_to_prosumers[i])
+
+                if positions is not None:
+                    data = [data[position] for position in positions]
+
+                if last_rows is not None:
+                    # Containers are kept as their written text, since one changed in place would equal itself
+                    row = [value if isinstance(value, (numbers.Number, str)) else str(value) for value in data]
+                    if not self._changed(last_rows.get(i), row):
+                        continue
+                    last_rows[i] = row
+                writer.writerow(data)
+
+    def _open(self, file_name):
+        path = os.path.join(self.output_dir, file_name + self.suffixes[self.compression])
+        if self.compression is None:
+            return open(path, 'w', newline='', buffering=self.buffer_size)
+        level = self.default_levels[self.compression] if self.compression_level is None else self.compression_level
+        if self.compression == 'gzip':
+            binary = gzip.GzipFile(path, 'wb', compresslevel=level)
+        elif self.compression == 'zstd':
+            import zstandard
+
+            binary = zstandard.ZstdCompressor(level=level).stream_writer(open(path, 'wb'), closefd=True)
+        else:
+            import lz4.frame
+
+            binary = lz4.frame.LZ4FrameFile(path, 'wb', compression_level=level)
+        # Rows reach the compressor in large chunks rather than one call per row
+        return io.TextIOWrapper(io.BufferedWriter(binary, self.buffer_size), encoding='utf-8', newline='')
+
+    def _writer(self, file):
+        if self.float_precision is None:
+            return csv.writer(file)
+        return FloatFormattingWriter(file, self.float_precision)
+
+    def _changed(self, previous, row):
+        if previous is None:
+            return True
+        # Index 0 is the timestep, which always differs
+        for old, new in zip(previous[1:], row[1:]):
+            if isinstance(new, numbers.Number) and isinstance(old, numbers.Number):
+                if abs(new - old) > self.tolerance:
+                    return True
+            elif old != new:
+                return True
+        return False
+
+    def fields_of(self, component):
+        """
+        Get the attributes logged for a component.
+
+        Components declare them in a ``log_fields`` class attribute, which also works for slotted classes;
+        components without the declaration fall back to their instance attributes.
+
+        Args:
+            component: A component of the grid.
+
+        Returns:
+            tuple: The names of the logged attributes.
+        """
+        fields = getattr(component, 'log_fields', None)
+        if fields is None:
+            fields = tuple(attr for attr in vars(component) if attr != 'env')
+        return tuple(fields)
+
+    def _power_to_prosumers(self, components, connections):
+        if not components['distributors']:
+            return None
+        if self.topology is not None:
+            received = np.fromiter((p.received_power for p in components['prosumers']), dtype=float, count=len(components['prosumers']))
+            return self.topology.layers['distributor_to_prosumer'].gather(received)
+        index = {distributor: i for i, distributor in enumerate(components['distributors'])}
+        totals = [0] * len(index)
+        for source, target, _ in connections['distributor_to_prosumer']:
+            totals[index[source]] += target.received_power
+        return totals
 
     def close_files(self):
+        # The last window is written even if the simulation ended before it closed
+        for rollup in self.rollups:
+            if rollup.writer is not None:
+                rollup.flush()
+        if self.store_writer is not None:
+            self.store_writer.close()
         for f in self.files.values():
             f.close()
+        if self.timestep_file is not None:
+            self.timestep_file.close()
+
+
+class FloatFormattingWriter:
+    """
+    Class wrapping a CSV writer to write floats with a fixed number of significant digits.
+
+    Attributes:
+        writer (csv.writer): The wrapped writer.
+        precision (int): The number of significant digits.
+    """
+
+    def __init__(self, file, precision):
+        """
+        Initialize a FloatFormattingWriter instance.
+
+        Args:
+            file (file object): The file the rows are written to.
+            precision (int): The number of significant digits.
+        """
+        self.writer = csv.writer(file)
+        self.precision = precision
+        self._format = f"{{:.{precision}g}}".format
+
+    def writerow(self, row):
+        """
+        Write a row, formatting its floats.
+
+        Args:
+            row (list): The values of the row.
+        """
+        self.writer.writerow([self._format(value) if isinstance(value, float) else value for value in row])
+
+
+def read_delta_log(file_path, timesteps=None):
+    """
+    Read a CSV file written in delta mode and forward-fill it back to a dense time series.
+
+    Args:
+        file_path (str): The path to the component CSV file.
+        timesteps (array-like): The timesteps of the dense series. Default is the ``timesteps.csv`` file (with the same
+            compression suffix) next to the component file, or the timesteps present in the file if there is none.
+
+    Returns:
+        pd.DataFrame: One row per timestep and component, in the order a dense DataLog writes them.
+    """
+    frame = pd.read_csv(file_path)
+    key = 'name' if 'name' in frame.columns else 'prosumer_name'
+
+    if timesteps is None:
+        extension = file_path.rfind('.csv')
+        if extension == -1:
+            raise ValueError(f"The file {file_path} is not a CSV file.")
+        suffix = file_path[extension:]
+        timestep_path = os.path.join(os.path.dirname(file_path), "timesteps" + suffix)
+        if os.path.exists(timestep_path):
+            timesteps = pd.read_csv(timestep_path)['timestep'].to_numpy()
+        else:
+            timesteps = np.sort(frame['timestep'].unique())
+
+    # Forward-fill row positions rather than values, so genuinely empty fields stay empty
+    positions = pd.Series(np.arange(len(frame)), index=pd.MultiIndex.from_frame(frame[['timestep', key]]))
+    index = pd.MultiIndex.from_product([timesteps, frame[key].unique()], names=['timestep', key])
+    positions = positions.reindex(index).groupby(level=key, sort=False).ffill().dropna()
+
+    dense = frame.iloc[positions.to_numpy(dtype=np.intp)].reset_index(drop=True)
+    dense['timestep'] = positions.index.get_level_values('timestep')
+    return dense
@@ -1,17 +1,28 @@
 from pyaspg.management.control_system import ControlSystem
-from pyaspg.management.net_aggregator import NetAggregator
+from pyaspg.management.net_aggregator import BaseNetAggregator
 from pyaspg.management.utility_company import UtilityCompany
-from pyaspg.communication.smart_meter import SmartMeter
-from pyaspg.communication.communication_network import CommunicationNetwork
-from pyaspg.prosume import Prosumer
-from pyaspg.generation.power_plant import PowerPlant
-from pyaspg.generation.solar_panel import SolarPanel
-from pyaspg.generation.wind_turbine import WindTurbine
-from pyaspg.distribution.transmitter import Transmitter
-from pyaspg.distribution.distributor import Distributor
-from pyaspg.distribution.substation import Substation
+from pyaspg.communication.smart_meter import BaseSmartMeter
+from pyaspg.prosume.prosumer import BaseProsumer
+from pyaspg.generation.generator import Generator
+from pyaspg.distribution.transmitter import BaseTransmitter
+from pyaspg.distribution.distributor import BaseDistributor
+from pyaspg.distribution.substation import BaseSubstation
+from pyaspg.simulation.topology import GridTopology
 from pyaspg.utils import log_me
 
+# The class every component of a type derives from, so full and compact variants can be mixed
+COMPONENT_BASES = {
+    "generators": Generator,
+    "transmitters": BaseTransmitter,
+    "substations": BaseSubstation,
+    "distributors": BaseDistributor,
+    "prosumers": BaseProsumer,
+    "smart_meters": BaseSmartMeter,
+    "aggregators": BaseNetAggregator,
+    "utility_companies": UtilityCompany,
+    "control_systems": ControlSystem,
+}
+
 
 @log_me
 class PyASPGCreator:
@@ -21,6 +32,7 @@ class PyASPGCreator:
     Attributes:
         components (dict): A dictionary to store the components of the smart grid.
         connections (dict): A dictionary to store the connections between components.
+        topology (GridTopology): The sparse per-layer representation of the connections, kept in sync by define_connections.
     """
 
     def __init__(self):
@@ -59,6 +71,36 @@ class PyASPGCreator:
             "aggregator_to_utility": ("aggregators", "utility_companies"),
             "utility_to_control": ("utility_companies", "control_systems"),
         }
+        self._topology = None
+
+    @classmethod
+    def from_file(cls, path, cache_dir=None, use_cache=True):
+        """
+        Create a smart grid from a JSON, YAML or TOML grid file (see load_grid).
+
+        Args:
+            path (str): The path to the grid file.
+            cache_dir (str): The directory of the cached grids. Default is ``.pyaspg_cache`` next to the grid file.
+            use_cache (bool): Reuse the grid cached for the same file contents and inputs.
+
+        Returns:
+            PyASPGCreator: The grid with its connections defined.
+        """
+        from pyaspg.simulation.grid_file import load_grid
+
+        return load_grid(path, cache_dir, use_cache)
+
+    @property
+    def topology(self):
+        """
+        Get the sparse topology of the grid, rebuilding it if the connections changed.
+
+        Returns:
+            GridTopology: The topology with integer component IDs and one CSR matrix per layer.
+        """
+        if self._topology is None:
+            self._topology = GridTopology(self.components, self.connections, self.connection_rules)
+        return self._topology
 
     def define_connections(self, **kwargs):
         """
@@ -74,14 +116,7 @@ class PyASPGCreator:
                     source, target = connection[:2]
                     params = connection[2] if len(connection) > 2 else {}
 
-                    if not self.components[source_type] or not self.components[target_type]:
-                        valid_source_type = type(source)
-                        valid_target_type = type(target)
-                    else:
-                        valid_source_type = type(self.components[source_type][0])
-                        valid_target_type = type(self.components[target_type][0])
-
-                    if not isinstance(source, valid_source_type) or not isinstance(target, valid_target_type):
+                    if not isinstance(source, COMPONENT_BASES[source_type]) or not isinstance(target, COMPONENT_BASES[target_type]):
                         raise ValueError(f"Invalid connection: {source} -> {target} for {connection_type}")
 
                     if source not in self.components[source_type]:
@@ -90,6 +125,7 @@ class PyASPGCreator:
                         self.components[target_type].append(target)
                     
                     self.connections[connection_type].append((source, target, params))
+                self._topology = None
             else:
                 raise ValueError(f"Invalid connection type: {connection_type}")
 
@@ -0,0 +1,322 @@
+import os
+import glob
+import json
+import pickle
+import hashlib
+from fnmatch import fnmatchcase
+import numpy as np
+import pandas as pd
+from pyaspg.communication import CommunicationNetwork, EventCommunicationNetwork, SmartMeter, CompactSmartMeter
+from pyaspg.distribution import Transmitter, Distributor, Substation, CompactTransmitter, CompactDistributor, CompactSubstation
+from pyaspg.generation import WindTurbine, SolarPanel, PowerPlant
+from pyaspg.management import NetAggregator, UtilityCompany, ControlSystem, CompactNetAggregator
+from pyaspg.prosume import Prosumer, CompactProsumer
+from pyaspg.simulation.grid_creator import PyASPGCreator
+from pyaspg.utils import consumption_files
+
+# Classes a component entry can name in its "type" key; the first one is the default
+COMPONENT_CLASSES = {
+    'generators': {'WindTurbine': WindTurbine, 'SolarPanel': SolarPanel, 'PowerPlant': PowerPlant},
+    'transmitters': {'Transmitter': Transmitter, 'CompactTransmitter': CompactTransmitter},
+    'substations': {'Substation': Substation, 'CompactSubstation': CompactSubstation},
+    'distributors': {'Distributor': Distributor, 'CompactDistributor': CompactDistributor},
+    'prosumers': {'Prosumer': Prosumer, 'CompactProsumer': CompactProsumer},
+    'communication_networks': {'CommunicationNetwork': CommunicationNetwork, 'EventCommunicationNetwork': EventCommunicationNetwork},
+    'smart_meters': {'SmartMeter': SmartMeter, 'CompactSmartMeter': CompactSmartMeter},
+    'aggregators': {'NetAggregator': NetAggregator, 'CompactNetAggregator': CompactNetAggregator},
+    'utility_companies': {'UtilityCompany': UtilityCompany},
+    'control_systems': {'ControlSystem': ControlSystem},
+}
+
+CONNECTION_RULES = ('all', 'pair', 'round_robin', 'random')
+
+# Bump when the layout of the cached grid changes
+CACHE_VERSION = 1
+
+
+def read_grid_file(path):
+    """
+    Read a grid definition from a JSON, YAML or TOML file.
+
+    Args:
+        path (str): The path to the grid file.
+
+    Returns:
+        dict: The grid definition.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.json':
+        with open(path) as grid_file:
+            return json.load(grid_file)
+    if extension in ('.yaml', '.yml'):
+        import yaml
+
+        with open(path) as grid_file:
+            return yaml.safe_load(grid_file)
+    if extension == '.toml':
+        import tomllib
+
+        with open(path, 'rb') as grid_file:
+            return tomllib.load(grid_file)
+    raise ValueError(f"Unsupported grid file format: {extension}")
+
+
+def expand_entry(entry):
+    """
+    Expand a component entry into the keyword arguments of every component it describes.
+
+    An entry with ``count: N`` describes N components. ``{i}`` in string values is replaced by the
+    1-based index of the component, and the lists under ``vary`` give one value per component.
+
+    Args:
+        entry (dict): The component entry.
+
+    Returns:
+        list: The keyword arguments of every component.
+    """
+    entry = dict(entry)
+    entry.pop('type', None)
+    count = entry.pop('count', None)
+    vary = entry.pop('vary', {})
+    if count is None:
+        return [dict(entry, **{key: values[0] for key, values in vary.items()})]
+
+    for key, values in vary.items():
+        if len(values) != count:
+            raise ValueError(f"'vary' lists must have one value per component, got {len(values)} for {key} with count {count}")
+    expanded = []
+    for i in range(1, count + 1):
+        kwargs = {key: value.format(i=i) if isinstance(value, str) else value for key, value in entry.items()}
+        kwargs.update({key: values[i - 1] for key, values in vary.items()})
+        expanded.append(kwargs)
+    return expanded
+
+
+def grid_hash(path, definition):
+    """
+    Hash a grid file together with every input file it references, so the cache follows edits of either.
+
+    Args:
+        path (str): The path to the grid file.
+        definition (dict): The grid definition read from the file.
+
+    Returns:
+        str: The hexadecimal SHA-256 digest.
+    """
+    digest = hashlib.sha256(f"pyaspg-grid-{CACHE_VERSION}".encode())
+    with open(path, 'rb') as grid_file:
+        digest.update(grid_file.read())
+
+    base_dir = os.path.dirname(os.path.abspath(path))
+    referenced = []
+    for entries in definition.get('components', {}).values():
+        for entry in entries:
+            referenced += [kwargs['consumption_file'] for kwargs in expand_entry(entry) if kwargs.get('consumption_file')]
+    for entries in definition.get('connections', {}).values():
+        for entry in entries:
+            referenced += [value['file'] for value in entry.get('params', {}).values() if isinstance(value, dict) and 'file' in value]
+
+    for file_path in referenced:
+        digest.update(file_path.encode())
+        resolved = resolve_path(file_path, base_dir)
+        input_paths = [resolved]
+        # Directories and glob patterns stream several dated files
+        if os.path.isdir(resolved) or glob.has_magic(resolved):
+            input_paths = consumption_files(resolved)
+            if not input_paths:
+                raise FileNotFoundError(f"No consumption files match {resolved}.")
+        for input_path in input_paths:
+            digest.update(os.path.basename(input_path).encode())
+            with open(input_path, 'rb') as input_file:
+                for chunk in iter(lambda: input_file.read(1 << 20), b''):
+                    digest.update(chunk)
+    return digest.hexdigest()
+
+
+def draws_unseeded(definition):
+    """
+    Check whether building a grid draws random values without a seed, so that every build differs.
+
+    Args:
+        definition (dict): The grid definition read from the file.
+
+    Returns:
+        bool: True if a ``random`` param or connection rule is used and the definition has no ``seed``.
+    """
+    if definition.get('seed') is not None:
+        return False
+    for entries in definition.get('connections', {}).values():
+        for entry in entries:
+            if entry.get('rule') == 'random':
+                return True
+            if any(isinstance(value, dict) and 'random' in value for value in entry.get('params', {}).values()):
+                return True
+    return False
+
+
+def resolve_path(file_path, base_dir):
+    """
+    Resolve a path of a grid file, relative to the grid file if it exists there and to the working directory otherwise.
+
+    Args:
+        file_path (str): The path as written in the grid file.
+        base_dir (str): The directory of the grid file.
+
+    Returns:
+        str: The resolved path.
+    """
+    candidate = os.path.join(base_dir, file_path)
+    return candidate if os.path.exists(candidate) or glob.glob(candidate) else file_path
+
+
+def _match(patterns, registry, component_type, connection_type):
+    if isinstance(patterns, str):
+        patterns = [patterns]
+    names = registry[component_type]
+    matched = []
+    for pattern in patterns:
+        found = [component for name, component in names.items() if fnmatchcase(name, pattern)]
+        if not found:
+            raise ValueError(f"No {component_type} match '{pattern}' in {connection_type}")
+        matched += [component for component in found if component not in matched]
+    return matched
+
+
+def _params(params, base_dir, rng):
+    values = {}
+    for key, value in params.items():
+        if isinstance(value, dict) and 'random' in value:
+            values[key] = rng.random(value['random'])
+        elif isinstance(value, dict) and 'file' in value:
+            frame = pd.read_csv(resolve_path(value['file'], base_dir))
+            values[key] = frame[value.get('column', frame.columns[0])].to_numpy(dtype=float)
+        elif isinstance(value, list):
+            values[key] = np.asarray(value, dtype=float)
+        else:
+            values[key] = value
+    return values
+
+
+def build_grid(definition, base_dir='.'):
+    """
+    Build a grid from a grid definition.
+
+    Components are listed per component type and referenced by name (smart meters by the name of their
+    prosumer). A connection entry matches its ``source`` and ``target`` names or glob patterns and connects
+    them by its ``rule``: ``all`` connects every source to every target, ``pair`` the i-th source to the
+    i-th target, and ``round_robin`` and ``random`` give every component of the longer side one partner
+    from the shorter side.
+
+    Args:
+        definition (dict): The grid definition, with ``components``, ``connections`` and an optional ``seed``.
+        base_dir (str): The directory relative paths are resolved against.
+
+    Returns:
+        PyASPGCreator: The grid with its connections defined.
+    """
+    unknown = set(definition) - {'components', 'connections', 'seed'}
+    if unknown:
+        raise ValueError(f"Unknown grid file sections: {sorted(unknown)}")
+    rng = np.random.default_rng(definition.get('seed'))
+    creator = PyASPGCreator()
+    registry = {component_type: {} for component_type in COMPONENT_CLASSES}
+
+    # Smart meters reference prosumers and networks, so they are built after every other type
+    component_types = definition.get('components', {})
+    for component_type in sorted(component_types, key=lambda component_type: component_type == 'smart_meters'):
+        if component_type not in COMPONENT_CLASSES:
+            raise ValueError(f"Invalid component type: {component_type}")
+        classes = COMPONENT_CLASSES[component_type]
+        for entry in component_types[component_type]:
+            class_name = entry.get('type', next(iter(classes)))
+            if class_name not in classes:
+                raise ValueError(f"Invalid {component_type} type: {class_name}")
+            cls = classes[class_name]
+
+            if component_type == 'smart_meters':
+                network = registry['communication_networks'].get(entry['communication_network'])
+                if network is None:
+                    raise ValueError(f"Unknown communication network: {entry['communication_network']}")
+                for prosumer in _match(entry['prosumers'], registry, 'prosumers', component_type):
+                    registry[component_type][prosumer.name] = cls(prosumer, network)
+                continue
+
+            for kwargs in expand_entry(entry):
+                if kwargs.get('consumption_file'):
+                    kwargs['consumption_file'] = resolve_path(kwargs['consumption_file'], base_dir)
+                if kwargs['name'] in registry[component_type]:
+                    raise ValueError(f"Duplicate {component_type} name: {kwargs['name']}")
+                registry[component_type][kwargs['name']] = cls(**kwargs)
+
+    connections = {}
+    for connection_type, entries in definition.get('connections', {}).items():
+        if connection_type not in creator.connection_rules:
+            raise ValueError(f"Invalid connection type: {connection_type}")
+        source_type, target_type = creator.connection_rules[connection_type]
+        connection_list = connections.setdefault(connection_type, [])
+        for entry in entries:
+            sources = _match(entry['source'], registry, source_type, connection_type)
+            targets = _match(entry['target'], registry, target_type, connection_type)
+            params = _params(entry.get('params', {}), base_dir, rng)
+            rule = entry.get('rule', 'all')
+            if rule == 'all':
+                pairs = [(source, target) for source in sources for target in targets]
+            elif rule == 'pair':
+                if len(sources) != len(targets):
+                    raise ValueError(f"The 'pair' rule needs as many sources as targets in {connection_type}")
+                pairs = list(zip(sources, targets))
+            elif rule in ('round_robin', 'random'):
+                # Every component of the longer side gets one partner from the shorter side
+                many, few = (sources, targets) if len(sources) >= len(targets) else (targets, sources)
+                if rule == 'round_robin':
+                    partners = [few[i % len(few)] for i in range(len(many))]
+                else:
+                    partners = [few[i] for i in rng.integers(len(few), size=len(many))]
+                pairs = list(zip(many, partners)) if many is sources else list(zip(partners, many))
+            else:
+                raise ValueError(f"Invalid connection rule: {rule}, expected one of {CONNECTION_RULES}")
+            connection_list += [(source, target, params) for source, target in pairs]
+
+    # Connections are defined upstream first, like in the example scripts
+    creator.define_connections(**{connection_type: connections[connection_type]
+                                  for connection_type in creator.connection_rules if connection_type in connections})
+    return creator
+
+
+def load_grid(path, cache_dir=None, use_cache=True):
+    """
+    Load a grid from a grid file, reusing the cached grid if neither the file nor its inputs changed.
+
+    The cached grid is a pickle of the built PyASPGCreator, including its compiled topology and the
+    consumption data loaded by its prosumers, stored under the content hash of the grid file and its inputs.
+    A grid that draws random values without a ``seed`` is built anew every time and never cached, since
+    the cache would freeze its draws.
+
+    Args:
+        path (str): The path to the JSON, YAML or TOML grid file.
+        cache_dir (str): The directory of the cached grids. Default is ``.pyaspg_cache`` next to the grid file.
+        use_cache (bool): Read and write the cache.
+
+    Returns:
+        PyASPGCreator: The grid with its connections defined.
+    """
+    definition = read_grid_file(path)
+    base_dir = os.path.dirname(os.path.abspath(path))
+    if not use_cache or draws_unseeded(definition):
+        return build_grid(definition, base_dir)
+
+    cache_dir = cache_dir or os.path.join(base_dir, '.pyaspg_cache')
+    cache_path = os.path.join(cache_dir, f"{grid_hash(path, definition)}.pkl")
+    if os.path.exists(cache_path):
+        with open(cache_path, 'rb') as cache_file:
+            return pickle.load(cache_file)
+
+    creator = build_grid(definition, base_dir)
+    _ = creator.topology  # Compile the topology so it is cached too
+    os.makedirs(cache_dir, exist_ok=True)
+    temporary_path = f"{cache_path}.{os.getpid()}.tmp"
+    with open(temporary_path, 'wb') as cache_file:
+        pickle.dump(creator, cache_file, protocol=pickle.HIGHEST_PROTOCOL)
+    # Concurrent workers may build the same grid; the rename keeps the cache file whole
+    os.replace(temporary_path, cache_path)
+    return creator
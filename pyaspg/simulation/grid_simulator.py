@@ -1,9 +1,12 @@
 # grid_simulator.py
 import os
 import csv
+import math
+import time
 from datetime import datetime
 
 import simpy
+import simpy.rt
 from pyaspg.management import ControlSystem, NetAggregator, UtilityCompany
 from pyaspg.communication import SmartMeter, CommunicationNetwork
 from pyaspg.prosume import Prosumer
@@ -12,6 +15,14 @@ from pyaspg.distribution import Transmitter, Distributor, Substation
 from pyaspg.utils import log_me
 from .grid_creator import PyASPGCreator
 from .data_log import DataLog
+from .supply_chain import SupplyPrecomputer
+from .logging_spec import OutputSpec
+from .live_feed import GridFeedPublisher
+from .progress import ProgressMonitor
+from .recorder import MemoryRecorder
+from .stepping import StepSnapshot
+from .incremental import POWER_TYPES, SimulationCache, Resimulation
+from .pacing import StepPacer
 
 from .connection_handler import (
     GeneratorToTransmitterHandler,
@@ -21,65 +32,320 @@ from .connection_handler import (
     ProsumerToSmartMeterHandler,
     SmartMeterToAggregatorHandler,
     AggregatorToUtilityHandler,
+    MessageBusHandler,
 )
 
 
 @log_me
 class GridSimulator:
-    def __init__(self, creator: PyASPGCreator):
+    # Connection types whose flow is fully determined by the generator inputs
+    supply_connections = ('generator_to_transmitter', 'transmitter_to_substation', 'substation_to_distributor')
+    # Component types whose input bus accumulates power within a step
+    bus_components = ('transmitters', 'substations', 'distributors')
+
+    def __init__(self, creator: PyASPGCreator, message_bus=False):
+        """
+        Initialize a GridSimulator instance.
+
+        Args:
+            creator (PyASPGCreator): The grid to simulate.
+            message_bus (bool): Deliver the meter readings to each aggregator as one record batch per step
+                (see MessageBusHandler) instead of one reading per connection.
+        """
         self.creator = creator
         self.data_log = None        
+        self.processes = []
+        self.pacer = None
         self.connection_handlers = {
             'generator_to_transmitter': GeneratorToTransmitterHandler(),
             'transmitter_to_substation': TransmitterToSubstationHandler(),
             'substation_to_distributor': SubstationToDistributorHandler(),
             'distributor_to_prosumer': DistributorToProsumerHandler(),
             'prosumer_to_smart_meter': ProsumerToSmartMeterHandler(),
-            'smart_meter_to_aggregator': SmartMeterToAggregatorHandler(),
+            'smart_meter_to_aggregator': MessageBusHandler(creator) if message_bus else SmartMeterToAggregatorHandler(),
             'aggregator_to_utility': AggregatorToUtilityHandler()
             # Add other connection handlers here...
         }
 
-    def run_simulation(self, duration, timestep, output_dir):
-        self.data_log = DataLog(output_dir)
-        env = simpy.Environment()
-        
-        if not os.path.exists(output_dir):
-            os.makedirs(output_dir)
+    def run_simulation(self, duration, timestep, output_dir, precompute_supply=False, supply_block=None, output=None,
+                       logging_spec=None, rollups=(), live_feed=None, progress=None, mode='auto', in_memory=False,
+                       realtime_factor=1.0, metrics=None, memory_profile=None):
+        """
+        Run the simulation and write the results to the output directory, or record them in memory.
 
+        Args:
+            duration (float): The duration of the simulation.
+            timestep (float): The length of a simulation step.
+            output_dir (str): The directory the CSV files and the simulation log are written to. None records the results in memory.
+            precompute_supply (bool): Precompute the generator-to-distributor chain with NumPy instead of running its handlers every step.
+            supply_block (int): The number of steps precomputed at once. Default is the whole horizon.
+            output (OutputSpec): How the files are written: change-only rows, compression, buffering, float precision
+                and a results store. Default is plain, dense CSV files.
+            logging_spec (LoggingSpec): The component types, components and columns written to the per-timestep CSV files.
+            rollups (list): RollupWindow instances whose per-window statistics are written while the simulation runs.
+            live_feed (LiveFeedSpec): The memory-mapped ring file receiving grid aggregates while the simulation runs.
+            progress (ProgressSpec): Where and how often the progress, throughput and ETA are reported.
+            mode (str): 'fixed' drives the steps with a plain loop, 'simpy' with a SimPy process, and 'auto' (the default)
+                uses SimPy only when processes were added with add_process or a communication network is event-driven
+                (see EventCommunicationNetwork). 'realtime' paces the SimPy steps to the wall clock and records the
+                compute time, slack and deadline misses of every step in ``self.pacer`` (see StepPacer), whose
+                summary and histogram are written to simlog.txt.
+            in_memory (bool): Record the results in preallocated arrays (see MemoryRecorder) instead of writing any file.
+                The output options and the progress log are then ignored.
+            realtime_factor (float): The wall-clock seconds per unit of simulation time in 'realtime' mode.
+            metrics (MetricsExporter): Count the steps, step latencies, handler times, packets and unserved energy
+                on a local HTTP endpoint while the simulation runs. It is started if needed and left running for
+                the caller to close.
+            memory_profile (MemoryProfiler): Sample the memory and the growing containers every few steps and write
+                the timeline and the top growing modules and lines to simlog.txt (see MemoryProfiler).
+
+        Returns:
+            SimulationResults: The recorded results in memory mode, None otherwise.
+        """
+        in_memory = in_memory or output_dir is None
+        n_steps = math.ceil(duration / timestep)
+        output = output or OutputSpec()
+        if in_memory:
+            self.data_log = None
+        else:
+            self.data_log = DataLog(output_dir, delta=output.changes_only, tolerance=output.change_tolerance,
+                                    rollups=rollups, full_resolution=output.full_resolution, spec=logging_spec,
+                                    compression=output.compression, compression_level=output.compression_level,
+                                    buffer_size=output.buffer_size, float_precision=output.float_precision,
+                                    store=output.results_store, store_chunk_steps=output.store_chunk_steps,
+                                    timestep=timestep)
+        if mode not in ('auto', 'fixed', 'simpy', 'realtime'):
+            raise ValueError(f"Invalid mode: {mode}")
+        networks = self._networks()
+        event_networks = [network for network in networks if getattr(network, 'event_driven', False)]
+        if mode == 'fixed' and (self.processes or event_networks):
+            raise ValueError("Processes added with add_process and event-driven networks need the 'simpy' or 'auto' mode")
+        
         components = self.creator.components
         connections = self.creator.connections
-
-        self._initialize_simlog(output_dir, components)
         start_time = datetime.now()
 
-        # Create a CSV file for each component type
-        self.data_log.initialize_files(components, connections)
+        recorder = None
+        if in_memory:
+            recorder = MemoryRecorder(components, n_steps, self.creator.topology)
+        else:
+            if not os.path.exists(output_dir):
+                os.makedirs(output_dir)
+            self._initialize_simlog(output_dir, components)
+
+            # Create a CSV file for each component type
+            self.data_log.initialize_files(components, connections, self.creator.topology)
+
+        supply = None
+        skipped = ()
+        if precompute_supply:
+            supply = SupplyPrecomputer(self.creator, n_steps, supply_block)
+            skipped = self.supply_connections
+
+        publisher = None
+        if live_feed is not None:
+            publisher = GridFeedPublisher(self.creator, live_feed.path, live_feed.every, live_feed.capacity)
+        monitor = None
+        if progress is not None:
+            monitor = ProgressMonitor(n_steps, None if in_memory else output_dir, progress.callback,
+                                      self.simlog_path if progress.log and not in_memory else None, progress.every)
+        if metrics is not None:
+            metrics.bind(connections, networks, None if in_memory else output_dir)
+            metrics.start()
 
         def log_and_handle(t):
-            for connection_type, connection_list in connections.items():
-                handler = self.connection_handlers.get(connection_type)
-                if handler:
-                    for source, target, params in connection_list:
-                        # print(t // timestep, "\nHandle connection\n", source, "\n", target, "\n", params)
-                        handler.handle_connection(source, target, params, t // timestep)
+            started = time.perf_counter() if metrics is not None else None
+            self._step(t, timestep, supply, skipped, metrics=metrics)
 
-            self.data_log.log_data(t, components, connections)
+            if recorder is not None:
+                recorder.record(t, components)
+            else:
+                self.data_log.log_data(t, components, connections)
+            if publisher is not None:
+                publisher.publish(t, int(t // timestep))
+            if monitor is not None:
+                monitor.update(int(t // timestep) + 1)
+            if metrics is not None:
+                metrics.observe_step(t, time.perf_counter() - started, components['prosumers'], timestep)
+            if memory_profile is not None:
+                memory_profile.update(int(t // timestep) + 1)
 
         def run_simulation_step(env):
             while True:                
                 log_and_handle(env.now)
                 yield env.timeout(timestep)
-        
-        env.process(run_simulation_step(env))
-        env.run(until=duration)
+
+        def run_paced_step(env):
+            while True:
+                started = time.monotonic()
+                log_and_handle(env.now)
+                finished = time.monotonic()
+                # The deadline of a step is the scheduled start of the next one
+                deadline = env.real_start + (env.now - env.env_start + timestep) * realtime_factor
+                self.pacer.record(finished - started, deadline - finished)
+                yield env.timeout(timestep)
+
+        self.pacer = None
+        if memory_profile is not None:
+            memory_profile.start(components, networks, self.data_log)
+        try:
+            if mode in ('simpy', 'realtime') or self.processes or event_networks:
+                if mode == 'realtime':
+                    env = simpy.rt.RealtimeEnvironment(factor=realtime_factor, strict=False)
+                    self.pacer = StepPacer(timestep * realtime_factor, n_steps)
+                else:
+                    env = simpy.Environment()
+                for network in event_networks:
+                    network.attach(env)
+                env.process(run_paced_step(env) if self.pacer is not None else run_simulation_step(env))
+                for process in self.processes:
+                    env.process(process(env))
+                if self.pacer is not None:
+                    env.sync()  # The setup time does not count against the first step
+                env.run(until=duration)
+            else:
+                # Same step times as the SimPy process, without its event bookkeeping
+                t = 0
+                while t < duration:
+                    log_and_handle(t)
+                    t += timestep
+        finally:
+            # Also on errors, so the feed is closed, tracing stops and compressed files get their trailers
+            if publisher is not None:
+                publisher.close()
+            if memory_profile is not None:
+                memory_profile.stop()
+            if self.data_log is not None:
+                self.data_log.close_files()
         end_time = datetime.now()
 
-        # Close CSV files
-        self.data_log.close_files()
+        if recorder is not None:
+            return recorder.results()
 
+        if self.pacer is not None:
+            self.pacer.write(self.simlog_path)
+        if memory_profile is not None:
+            memory_profile.write(self.simlog_path)
         self._finalize_simlog(output_dir, start_time, end_time, components)
 
+    def iter_steps(self, duration, timestep, precompute_supply=False, supply_block=None):
+        """
+        Advance the simulation one step at a time, without logging, yielding the grid state after every step.
+
+        The same StepSnapshot is yielded at every step; inputs set on it between steps are applied during the
+        next step. Closing the generator early simply stops the simulation.
+
+        Args:
+            duration (float): The duration of the simulation.
+            timestep (float): The length of a simulation step.
+            precompute_supply (bool): Precompute the generator-to-distributor chain with NumPy (see SupplyPrecomputer).
+            supply_block (int): The number of steps precomputed at once. Default is the whole horizon.
+
+        Yields:
+            StepSnapshot: The handle on the grid state after each step.
+        """
+        supply = None
+        skipped = ()
+        if precompute_supply:
+            supply = SupplyPrecomputer(self.creator, math.ceil(duration / timestep), supply_block)
+            skipped = self.supply_connections
+
+        snapshot = StepSnapshot(self.creator, supply)
+        t = 0
+        while t < duration:
+            self._step(t, timestep, supply, skipped, snapshot)
+            snapshot.step += 1
+            snapshot.time = t
+            yield snapshot
+            t += timestep
+
+    def run_baseline(self, duration, timestep, precompute_supply=False, supply_block=None):
+        """
+        Run the simulation without logging and cache the outputs of the power flow for later reruns (see resimulate).
+
+        Args:
+            duration (float): The duration of the simulation.
+            timestep (float): The length of a simulation step.
+            precompute_supply (bool): Precompute the generator-to-distributor chain with NumPy (see SupplyPrecomputer).
+            supply_block (int): The number of steps precomputed at once. Default is the whole horizon.
+
+        Returns:
+            SimulationCache: The baseline run.
+        """
+        components = self.creator.components
+        cache = SimulationCache(self.creator, duration, timestep)
+        recorder = MemoryRecorder({component_type: components[component_type] for component_type in POWER_TYPES},
+                                  cache.n_steps, self.creator.topology)
+        for snapshot in self.iter_steps(duration, timestep, precompute_supply, supply_block):
+            recorder.record(snapshot.time, components)
+            cache.record_draws(snapshot.step, components['prosumers'])
+        cache.results = recorder.results()
+        return cache
+
+    def resimulate(self, cache):
+        """
+        Rerun only the components of a modified grid that changed since a baseline run, and their descendants.
+
+        Components are matched with the baseline by name. The grid may be the baseline grid modified in place
+        or a new one. The outputs of the unchanged components are spliced from the cache. Communication and
+        management components are not part of the cache and are not rerun.
+
+        Args:
+            cache (SimulationCache): The baseline run of run_baseline.
+
+        Returns:
+            SimulationResults: The outputs of the generators, transmitters, substations, distributors and prosumers.
+        """
+        return Resimulation(self.creator, cache, self.connection_handlers['distributor_to_prosumer']).run()
+
+    def _step(self, t, timestep, supply, skipped, snapshot=None, metrics=None):
+        components = self.creator.components
+        connections = self.creator.connections
+        layers = self.creator.topology.layers
+        if supply is not None:
+            supply.apply(int(t // timestep))
+        else:
+            for component_type in self.bus_components:
+                for component in components[component_type]:
+                    component.reset()
+
+        for connection_type in self.supply_connections:
+            connection_list = connections[connection_type]
+            if connection_type not in skipped and connection_list:
+                self._handle(self.connection_handlers[connection_type], connection_type, connection_list, layers[connection_type],
+                             t // timestep, metrics)
+        if snapshot is not None and snapshot.overrides:
+            snapshot.apply_overrides()
+
+        for connection_type, connection_list in connections.items():
+            if connection_type in self.supply_connections:
+                continue
+            handler = self.connection_handlers.get(connection_type)
+            if handler and connection_list:
+                self._handle(handler, connection_type, connection_list, layers[connection_type], t // timestep, metrics)
+
+    def _handle(self, handler, connection_type, connection_list, layer, timestep, metrics):
+        if metrics is None:
+            handler.handle_layer(connection_list, layer, timestep)
+            return
+        started = time.perf_counter()
+        handler.handle_layer(connection_list, layer, timestep)
+        metrics.handler_seconds[connection_type] += time.perf_counter() - started
+
+    def _networks(self):
+        # Networks are reached through the meters, since no connection type lists them
+        networks = self.creator.components['communication_networks'] + [meter.communication_network for meter in self.creator.components['smart_meters']]
+        return list(dict.fromkeys(networks))
+
+    def add_process(self, process):
+        """
+        Add an event-driven process to run alongside the simulation steps, which switches the simulation to SimPy.
+
+        Args:
+            process (callable): A function taking the ``simpy.Environment`` and returning a SimPy process generator.
+        """
+        self.processes.append(process)
+
     def _initialize_simlog(self, output_dir, components):
         self.simlog_path = os.path.join(output_dir, 'simlog.txt')
         with open(self.simlog_path, 'w') as log_file:
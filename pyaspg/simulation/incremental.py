@@ -0,0 +1,386 @@
+import math
+import pickle
+import hashlib
+import numpy as np
+from pyaspg.utils import log_me
+from .recorder import MemoryRecorder
+from .supply_chain import generate_series, transmitter_losses, distributor_losses
+
+# Component types of the power flow, in upstream-to-downstream order
+POWER_TYPES = ('generators', 'transmitters', 'substations', 'distributors', 'prosumers')
+# Prosumer attributes carried from one step to the next, restored before a prosumer is rerun
+PROSUMER_STATE = ('total_consumption', 'total_production', 'stored_energy', '_net_power', 'received_power',
+                  'net_power_before', 'stored_energy_before', 'last_generated_consumption',
+                  'last_generated_production', 'distributor_name')
+# Generator attributes a run uses up, restored before a generator is recomputed
+GENERATOR_STATE = ('fuel_capacity',)
+
+
+def fingerprint(component, params=None):
+    """
+    Summarize the parameters of a component, so a changed component can be told from an unchanged one.
+
+    Args:
+        component: A component of the grid.
+        params (dict): The parameters of its connection, e.g. the resource series of a generator.
+
+    Returns:
+        str: The fingerprint.
+    """
+    digest = hashlib.sha1(type(component).__name__.encode())
+    for field in getattr(component, 'static_fields', ()):
+        digest.update(repr(getattr(component, field)).encode())
+    for key, value in sorted((params or {}).items()):
+        digest.update(key.encode())
+        digest.update(np.asarray(value).tobytes())
+    return digest.hexdigest()
+
+
+def draw_key(prosumer):
+    """
+    Summarize the sources of the consumption and production of a prosumer.
+
+    Prosumers whose key is unchanged replay the values drawn in the baseline run.
+
+    Args:
+        prosumer (Prosumer): The prosumer.
+
+    Returns:
+        str: The key.
+    """
+    parser = prosumer.consumption_pattern_parser
+    # Views of a shared stream read the files of the stream
+    reader = getattr(parser, 'stream', parser)
+    source = None
+    for attr in ('file_path', 'files', 'prosumer_id'):
+        if hasattr(reader, attr):
+            source = getattr(reader, attr)
+            break
+    return repr((tuple(prosumer.production_pattern), type(parser).__name__, getattr(parser, 'bias', None), source))
+
+
+def grid_fingerprints(creator):
+    """
+    Fingerprint every component of the power flow and its wiring.
+
+    A node's wiring is the list of its sources, and for distributors also the ordered list of their prosumers,
+    since the prosumers share the power left on the distributor in connection order. The fingerprint of a
+    prosumer also covers its draw key, so a changed consumption or production source makes it dirty.
+
+    Args:
+        creator (PyASPGCreator): The grid.
+
+    Returns:
+        dict: The fingerprint per component type and component name.
+    """
+    components = creator.components
+    connections = creator.connections
+    generator_params = {}
+    for generator, _, params in connections['generator_to_transmitter']:
+        generator_params.setdefault(generator, params)
+
+    sources, feeders = {}, {}
+    for connection_type in ('generator_to_transmitter', 'transmitter_to_substation', 'substation_to_distributor', 'distributor_to_prosumer'):
+        for source, target, _ in connections[connection_type]:
+            sources.setdefault(target, []).append(source.name)
+            if connection_type == 'distributor_to_prosumer':
+                feeders.setdefault(source, []).append(target.name)
+
+    fingerprints = {component_type: {component.name: fingerprint(component, generator_params.get(component))
+                                     + repr((sources.get(component, []), feeders.get(component, [])))
+                                     for component in components[component_type]}
+                    for component_type in POWER_TYPES}
+    for prosumer in components['prosumers']:
+        fingerprints['prosumers'][prosumer.name] += draw_key(prosumer)
+    return fingerprints
+
+
+@log_me
+class SimulationCache:
+    """
+    Class holding the per-component output series of a baseline run, for GridSimulator.resimulate.
+
+    Besides the outputs of the power flow (generators to prosumers), the cache keeps the fingerprint of
+    every component, the consumption and production drawn for every prosumer at every step, and the
+    state of the prosumers and generators before the run, so a rerun feeder starts from the same state and
+    the same draws and a recomputed power plant from the same fuel.
+
+    Attributes:
+        duration (float): The duration of the baseline run.
+        timestep (float): The length of a simulation step.
+        n_steps (int): The number of steps.
+        fingerprints (dict): The fingerprint per component type and component name.
+        draw_keys (dict): The draw key of every prosumer.
+        initial_states (dict): The PROSUMER_STATE values of every prosumer before the run.
+        initial_positions (dict): The position of the consumption parser of every prosumer before the run.
+        initial_generator_states (dict): The GENERATOR_STATE values of every generator before the run, per attribute.
+        columns (dict): The column of every prosumer in the draw arrays.
+        consumption (np.ndarray): The consumption drawn per step and prosumer.
+        production (np.ndarray): The production drawn per step and prosumer.
+        results (SimulationResults): The outputs of the power flow components.
+    """
+
+    def __init__(self, creator, duration, timestep):
+        """
+        Initialize a SimulationCache instance, before the baseline run starts.
+
+        Args:
+            creator (PyASPGCreator): The baseline grid.
+            duration (float): The duration of the baseline run.
+            timestep (float): The length of a simulation step.
+        """
+        prosumers = creator.components['prosumers']
+        self.duration = duration
+        self.timestep = timestep
+        self.n_steps = math.ceil(duration / timestep)
+        self.fingerprints = grid_fingerprints(creator)
+        self.draw_keys = {prosumer.name: draw_key(prosumer) for prosumer in prosumers}
+        self.initial_states = {prosumer.name: tuple(getattr(prosumer, attr) for attr in PROSUMER_STATE) for prosumer in prosumers}
+        self.initial_positions = {prosumer.name: prosumer.consumption_pattern_parser.timestep for prosumer in prosumers
+                                  if prosumer.consumption_pattern_parser is not None}
+        self.initial_generator_states = {generator.name: {attr: getattr(generator, attr) for attr in GENERATOR_STATE
+                                                          if hasattr(generator, attr)}
+                                         for generator in creator.components['generators']}
+        self.columns = {prosumer.name: i for i, prosumer in enumerate(prosumers)}
+        self.consumption = np.zeros((self.n_steps, len(prosumers)))
+        self.production = np.zeros((self.n_steps, len(prosumers)))
+        self.results = None
+
+    def record_draws(self, step, prosumers):
+        """
+        Record the consumption and production drawn by every prosumer at a step.
+
+        Args:
+            step (int): The step.
+            prosumers (list): The prosumers, in baseline order.
+        """
+        self.consumption[step] = [prosumer.last_generated_consumption for prosumer in prosumers]
+        self.production[step] = [prosumer.last_generated_production for prosumer in prosumers]
+
+    def save(self, path):
+        """
+        Write the cache to a file.
+
+        Args:
+            path (str): The file path.
+        """
+        with open(path, 'wb') as cache_file:
+            pickle.dump(self, cache_file)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Read a cache written by save.
+
+        Args:
+            path (str): The file path.
+
+        Returns:
+            SimulationCache: The cache.
+        """
+        with open(path, 'rb') as cache_file:
+            return pickle.load(cache_file)
+
+
+@log_me
+class Resimulation:
+    """
+    Class rerunning the part of a modified grid that differs from a cached baseline run.
+
+    A component is dirty when it is new, when its parameters or wiring changed, or when it is downstream of a
+    dirty component. A distributor is also dirty when one of its prosumers is, since its prosumers share the
+    power left on it. Dirty supply components are recomputed with NumPy over the whole horizon from the cached
+    outputs of their clean sources; dirty distributors and their prosumers are stepped through the run, with the
+    prosumers replaying their baseline draws unless their consumption or production source changed. Everything
+    else is copied from the cache.
+
+    Attributes:
+        creator (PyASPGCreator): The modified grid.
+        cache (SimulationCache): The baseline run.
+        handler (DistributorToProsumerHandler): The handler delivering the power of a distributor to its prosumers.
+        dirty (dict): A boolean mask of the dirty components per component type.
+    """
+
+    def __init__(self, creator, cache, handler):
+        """
+        Initialize a Resimulation instance and find the dirty components.
+
+        Args:
+            creator (PyASPGCreator): The modified grid.
+            cache (SimulationCache): The baseline run.
+            handler (DistributorToProsumerHandler): The handler delivering the power of a distributor to its prosumers.
+        """
+        if cache.results is None:
+            raise ValueError("The cache holds no baseline run")
+
+        self.creator = creator
+        self.cache = cache
+        self.handler = handler
+        components = creator.components
+        layers = creator.topology.layers
+
+        fingerprints = grid_fingerprints(creator)
+        self.dirty = {}
+        for component_type in POWER_TYPES:
+            cached = cache.fingerprints.get(component_type, {})
+            self.dirty[component_type] = np.array([cached.get(name) != value for name, value in fingerprints[component_type].items()],
+                                                  dtype=bool).reshape(len(components[component_type]))
+
+        for connection_type, (source_type, target_type) in (('generator_to_transmitter', ('generators', 'transmitters')),
+                                                            ('transmitter_to_substation', ('transmitters', 'substations')),
+                                                            ('substation_to_distributor', ('substations', 'distributors'))):
+            self.dirty[target_type] |= layers[connection_type].reach(self.dirty[source_type])
+
+        feeders = layers['distributor_to_prosumer']
+        self.dirty['distributors'][feeders.edge_sources[self.dirty['prosumers'][feeders.edge_targets]]] = True
+        self.dirty['prosumers'] = feeders.reach(self.dirty['distributors'])
+
+        parents = np.bincount(feeders.edge_targets, minlength=feeders.shape[1])
+        if np.any(self.dirty['prosumers'] & (parents > 1)):
+            raise ValueError("Prosumers connected to several distributors cannot be resimulated, run the whole grid instead")
+
+    def run(self):
+        """
+        Rerun the dirty components and splice the clean ones from the cache.
+
+        Returns:
+            SimulationResults: The outputs of the power flow components of the modified grid.
+        """
+        components = {component_type: self.creator.components[component_type] for component_type in POWER_TYPES}
+        self.recorder = MemoryRecorder(components, self.cache.n_steps, self.creator.topology)
+        self.recorder.n_steps = self.cache.n_steps
+        self.recorder.times = np.array(self.cache.results.times)
+
+        for component_type, arrays in self.recorder.arrays.items():
+            # Dirty components start from their current values, which holds the parameters they log
+            dirty = np.flatnonzero(self.dirty[component_type])
+            for field, getter in self.recorder.getters[component_type].items():
+                arrays[field][:, dirty] = [getter(components[component_type][i]) for i in dirty]
+
+            cached_names = self.cache.results.names.get(component_type, [])
+            cached_columns = {name: i for i, name in enumerate(cached_names)}
+            columns = [(i, cached_columns[name]) for i, name in enumerate(self.recorder.names[component_type])
+                       if name in cached_columns and not self.dirty[component_type][i]]
+            if not columns:
+                continue
+            new, old = map(list, zip(*columns))
+            for field, array in arrays.items():
+                if field in self.cache.results.arrays[component_type]:
+                    array[:, new] = self.cache.results.arrays[component_type][field][:, old]
+
+        distributor_output = self._supply()
+        self._feeders(distributor_output)
+        return self.recorder.results()
+
+    def _splice(self, component_type, field, values):
+        # Dirty columns take the recomputed values, clean ones keep the cached values
+        array = self.recorder.arrays[component_type][field]
+        dirty = self.dirty[component_type]
+        array[:, dirty] = values[:, dirty]
+        return array
+
+    def _supply(self):
+        components = self.creator.components
+        layers = self.creator.topology.layers
+        arrays = self.recorder.arrays
+        n_steps = self.cache.n_steps
+        if not components['distributors']:
+            return np.zeros((n_steps, 0))
+
+        generators = components['generators']
+        generator_params = {}
+        for generator, _, params in self.creator.connections['generator_to_transmitter']:
+            generator_params.setdefault(generator, params)
+        if generators:
+            output = np.zeros((n_steps, len(generators)))
+            for i in np.flatnonzero(self.dirty['generators']):
+                generator = generators[i]
+                # A baseline run on this grid has used up the fuel, so recompute from the fuel it started with
+                for attr, value in self.cache.initial_generator_states.get(generator.name, {}).items():
+                    setattr(generator, attr, value)
+                output[:, i], fuel_after = generate_series(generator, generator_params.get(generator) or {}, np.arange(n_steps))
+                if fuel_after is not None:
+                    # Only recorded when the first generator is a power plant too
+                    if 'fuel_capacity' in arrays['generators']:
+                        arrays['generators']['fuel_capacity'][:, i] = fuel_after
+                    if n_steps:
+                        # Left with the fuel of the last step, as after a full run
+                        generator.fuel_capacity = fuel_after[-1]
+                arrays['generators']['current'][:, i] = output[:, i] / generator.voltage if generator.voltage > 0 else 0
+            generator_output = self._splice('generators', 'output', output)
+        else:
+            generator_output = np.zeros((n_steps, 0))
+
+        # Every node's input bus is the sum of its sources' outputs
+        transmitter_input = layers['generator_to_transmitter'].rollup(generator_output.T).T
+        transmitter_output = np.maximum(transmitter_input * (1 - transmitter_losses(components['transmitters'])), 0)
+        if components['transmitters']:
+            self._splice('transmitters', 'input_power', transmitter_input)
+            transmitter_output = self._splice('transmitters', 'output_power', transmitter_output)
+
+        substation_input = layers['transmitter_to_substation'].rollup(transmitter_output.T).T
+        substation_output = substation_input * np.array([s.efficiency for s in components['substations']], dtype=float)
+        if components['substations']:
+            voltage = np.array([s.output_voltage for s in components['substations']], dtype=float)
+            current = np.divide(substation_output, voltage, out=np.zeros_like(substation_output), where=voltage > 0)
+            self._splice('substations', 'input_power', substation_input)
+            self._splice('substations', 'output_current', current)
+            substation_output = self._splice('substations', 'output_power', substation_output)
+
+        distributor_input = layers['substation_to_distributor'].rollup(substation_output.T).T
+        distributor_output = np.maximum(distributor_input * (1 - distributor_losses(components['distributors'])), 0)
+        self._splice('distributors', 'input_power', distributor_input)
+        return self._splice('distributors', 'output_power', distributor_output)
+
+    def _feeders(self, distributor_output):
+        components = self.creator.components
+        layer = self.creator.topology.layers['distributor_to_prosumer']
+        distributors = components['distributors']
+        prosumers = components['prosumers']
+        cache = self.cache
+        distributor_ids = np.flatnonzero(self.dirty['distributors'])
+        prosumer_ids = np.flatnonzero(self.dirty['prosumers'])
+        if not len(distributor_ids) or not len(prosumer_ids):
+            return
+
+        # Rerun prosumers start from their state before the baseline run and replay its draws where possible
+        columns = {}
+        for i in prosumer_ids:
+            prosumer = prosumers[i]
+            if prosumer.name in cache.initial_states:
+                for attr, value in zip(PROSUMER_STATE, cache.initial_states[prosumer.name]):
+                    setattr(prosumer, attr, value)
+                if cache.draw_keys[prosumer.name] == draw_key(prosumer):
+                    columns[i] = cache.columns[prosumer.name]
+                elif prosumer.name in cache.initial_positions:
+                    # New draws read the consumption from where the baseline run started reading it
+                    prosumer.consumption_pattern_parser.timestep = cache.initial_positions[prosumer.name]
+
+        # The edges of the dirty feeders, in connection order
+        edge_mask = self.dirty['distributors'][layer.edge_sources]
+        edges = [(source, target, columns.get(target_id)) for (source, target, _), target_id, rerun
+                 in zip(self.creator.connections['distributor_to_prosumer'], layer.edge_targets, edge_mask) if rerun]
+        edge_positions = np.searchsorted(distributor_ids, layer.edge_sources[edge_mask])
+        getters = self.recorder.getters['prosumers']
+        prosumer_arrays = self.recorder.arrays['prosumers']
+        distributor_arrays = self.recorder.arrays['distributors']
+        rerun_prosumers = [prosumers[i] for i in prosumer_ids]
+
+        for step in range(cache.n_steps):
+            for i in distributor_ids:
+                distributors[i].available_power = distributor_output[step, i]
+            for source, target, column in edges:
+                if column is None:
+                    target.expire_commands(step)
+                    target.generate_consumption()
+                    target.generate_production()
+                else:
+                    target.apply_generation(cache.consumption[step, column], cache.production[step, column])
+                self.handler.deliver(source, target)
+
+            for field, getter in getters.items():
+                prosumer_arrays[field][step, prosumer_ids] = [getter(prosumer) for prosumer in rerun_prosumers]
+            distributor_arrays['available_power'][step, distributor_ids] = [distributors[i].available_power for i in distributor_ids]
+            delivered = np.zeros(len(distributor_ids))
+            np.add.at(delivered, edge_positions, [target.received_power for _, target, _ in edges])
+            distributor_arrays['power_to_prosumers'][step, distributor_ids] = delivered
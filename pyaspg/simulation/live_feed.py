@@ -0,0 +1,251 @@
+import json
+import numpy as np
+import pandas as pd
+from pyaspg.utils import log_me
+
+# Header slots of the ring file, stored as int64 before the records
+MAGIC = 0x50594153504746  # "PYASPGF"
+HEADER_SLOTS = 5
+_MAGIC, _N_COLUMNS, _CAPACITY, _COUNT, _FINISHED = range(HEADER_SLOTS)
+
+
+@log_me
+class LiveFeed:
+    """
+    Class representing an append-only ring of float64 records in a memory-mapped file.
+
+    The file starts with an int64 header (magic, number of columns, capacity, number of records written
+    and a finished flag) followed by ``capacity`` records. The column names are stored in a JSON file
+    next to it. The record count is only advanced after a record is complete, so readers can tail the
+    file while it is being written.
+
+    Attributes:
+        path (str): The path to the ring file.
+        columns (list): The names of the record columns.
+        capacity (int): The number of records kept before the oldest ones are overwritten.
+        count (int): The number of records written so far.
+    """
+
+    def __init__(self, path, columns, capacity=4096):
+        """
+        Initialize a LiveFeed instance and create its files.
+
+        Args:
+            path (str): The path to the ring file.
+            columns (list): The names of the record columns.
+            capacity (int): The number of records kept before the oldest ones are overwritten.
+        """
+        if capacity < 1:
+            raise ValueError("Capacity must be at least 1")
+
+        self.path = path
+        self.columns = list(columns)
+        self.capacity = capacity
+        self.count = 0
+
+        with open(f"{path}.json", 'w') as column_file:
+            json.dump(self.columns, column_file)
+
+        n_columns = len(self.columns)
+        size = (HEADER_SLOTS + capacity * n_columns) * 8
+        self._map = np.memmap(path, dtype=np.int64, mode='w+', shape=(size // 8,))
+        self._header = self._map[:HEADER_SLOTS]
+        self._records = self._map[HEADER_SLOTS:].view(np.float64).reshape(capacity, n_columns)
+        self._header[_MAGIC] = MAGIC
+        self._header[_N_COLUMNS] = n_columns
+        self._header[_CAPACITY] = capacity
+
+    def append(self, record):
+        """
+        Append a record, overwriting the oldest one once the ring is full.
+
+        Args:
+            record (array-like): One value per column.
+        """
+        self._records[self.count % self.capacity] = record
+        self.count += 1
+        self._header[_COUNT] = self.count
+
+    def close(self):
+        """
+        Mark the feed as finished and flush it to disk.
+        """
+        self._header[_FINISHED] = 1
+        self._map.flush()
+
+
+class LiveFeedReader:
+    """
+    Class tailing a LiveFeed file, reading only the records written since the previous read.
+
+    Attributes:
+        path (str): The path to the ring file.
+        columns (list): The names of the record columns.
+        position (int): The number of records written when the feed was last read.
+        skipped (int): The number of records overwritten before they could be read.
+    """
+
+    def __init__(self, path):
+        """
+        Initialize a LiveFeedReader instance.
+
+        Args:
+            path (str): The path to the ring file.
+        """
+        with open(f"{path}.json") as column_file:
+            self.columns = json.load(column_file)
+
+        self.path = path
+        self._map = np.memmap(path, dtype=np.int64, mode='r')
+        if self._map[_MAGIC] != MAGIC:
+            raise ValueError(f"The file {path} is not a live feed.")
+        self._header = self._map[:HEADER_SLOTS]
+        self.capacity = int(self._header[_CAPACITY])
+        self._records = self._map[HEADER_SLOTS:].view(np.float64).reshape(self.capacity, len(self.columns))
+        self.position = 0
+        self.skipped = 0
+
+    @property
+    def finished(self):
+        """
+        Check whether the simulation writing the feed has ended.
+
+        Returns:
+            bool: True once the writer closed the feed.
+        """
+        return bool(self._header[_FINISHED])
+
+    def read_new(self):
+        """
+        Read the records appended since the previous call.
+
+        While the feed is being written, the oldest record of a full ring is skipped, since the writer may be
+        overwriting it.
+
+        Returns:
+            pd.DataFrame: The new records, oldest first.
+        """
+        # A closed feed has no writer left, so even its oldest slot is safe to read
+        writing = not self.finished
+        count = int(self._header[_COUNT])
+        start = max(self.position, count - self.capacity)
+        rows = np.arange(start, count) % self.capacity
+        records = self._records[rows].copy()
+
+        # Records overwritten while copying are dropped. The writer fills slot ``count % capacity``, which holds
+        # the oldest record of a full ring, before it advances the count, so that record may be half-written too.
+        lapped = min(int(self._header[_COUNT]) + writing - self.capacity - start, len(records))
+        if lapped > 0:
+            records = records[lapped:]
+            start += lapped
+        self.skipped += start - self.position
+        self.position = count
+        return pd.DataFrame(records, columns=self.columns)
+
+
+@log_me
+class LiveFeedSpec:
+    """
+    Class representing the live feed a simulation publishes to (see GridFeedPublisher).
+
+    Attributes:
+        path (str): The path of the memory-mapped ring file (see LiveFeedReader).
+        every (int): The number of steps between records.
+        capacity (int): The number of records kept in the ring.
+    """
+
+    def __init__(self, path, every=1, capacity=4096):
+        """
+        Initialize a LiveFeedSpec instance.
+
+        Args:
+            path (str): The path of the ring file.
+            every (int): The number of steps between records.
+            capacity (int): The number of records kept in the ring.
+        """
+        self.path = path
+        self.every = every
+        self.capacity = capacity
+
+
+@log_me
+class GridFeedPublisher:
+    """
+    Class publishing downsampled grid aggregates of a running simulation to a LiveFeed.
+
+    Every ``every`` steps one record is published with the grid totals, the available and delivered
+    power of every distributor and the aggregated data of every net aggregator. Aggregates are only
+    computed on published steps.
+
+    Attributes:
+        feed (LiveFeed): The feed the records are appended to.
+        every (int): The number of steps between published records.
+    """
+
+    def __init__(self, creator, path, every=1, capacity=4096):
+        """
+        Initialize a GridFeedPublisher instance.
+
+        Args:
+            creator (PyASPGCreator): The grid being simulated.
+            path (str): The path to the ring file.
+            every (int): The number of steps between published records.
+            capacity (int): The number of records kept in the ring.
+        """
+        if every < 1:
+            raise ValueError("The publishing interval must be at least 1 step")
+
+        self.components = creator.components
+        self.layer = creator.topology.layers['distributor_to_prosumer']
+        self.every = every
+
+        columns = ['time', 'step', 'generation', 'consumption', 'production', 'delivered', 'unserved']
+        for distributor in self.components['distributors']:
+            columns += [f"{distributor.name}.available_power", f"{distributor.name}.delivered"]
+        for aggregator in self.components['aggregators']:
+            columns += [f"{aggregator.name}.total_consumption", f"{aggregator.name}.total_production"]
+        self.feed = LiveFeed(path, columns, capacity)
+        self._record = np.zeros(len(columns))
+
+    def publish(self, time, step):
+        """
+        Publish the aggregates of a step if it falls on the publishing interval.
+
+        Args:
+            time (float): The simulation time.
+            step (int): The step number.
+        """
+        if step % self.every:
+            return
+
+        prosumers = self.components['prosumers']
+        n = len(prosumers)
+        received = np.fromiter((p.received_power for p in prosumers), dtype=float, count=n)
+        net_power = np.fromiter((p.net_power for p in prosumers), dtype=float, count=n)
+        delivered = self.layer.gather(received)
+
+        record = self._record
+        record[0] = time
+        record[1] = step
+        record[2] = sum(g.output for g in self.components['generators'])
+        record[3] = sum(p.last_generated_consumption for p in prosumers)
+        record[4] = sum(p.last_generated_production for p in prosumers)
+        record[5] = received.sum()
+        record[6] = np.maximum(net_power, 0).sum()
+
+        i = 7
+        for distributor_id, distributor in enumerate(self.components['distributors']):
+            record[i] = distributor.available_power
+            record[i + 1] = delivered[distributor_id]
+            i += 2
+        for aggregator in self.components['aggregators']:
+            record[i] = aggregator.utility_data.get('total_consumption', 0)
+            record[i + 1] = aggregator.utility_data.get('total_production', 0)
+            i += 2
+        self.feed.append(record)
+
+    def close(self):
+        """
+        Mark the feed as finished.
+        """
+        self.feed.close()
@@ -0,0 +1,171 @@
+import random
+from pyaspg.utils import log_me
+
+
+@log_me
+class LoggingSpec:
+    """
+    Class representing which components and columns a DataLog records.
+
+    Component types left out of ``component_types`` get no CSV file. Within a logged type, the components can be
+    restricted to a list of names or to a random sample, and the columns to a list of fields. The attributes a
+    component class declares in ``static_fields`` are left out of the per-timestep rows and written once to
+    ``metadata.json`` instead.
+
+    Attributes:
+        component_types (set): The component types logged, or None for every type.
+        names (dict): The names of the components logged per component type.
+        sample (dict): The number of components (int) or the fraction of components (float) logged per component type.
+        columns (dict): The columns logged per component type, including extra columns such as ``power_to_prosumers``.
+        static_metadata (bool): Write static fields to the metadata file instead of every row.
+        seed (int): The seed of the random samples.
+    """
+
+    def __init__(self, component_types=None, names=None, sample=None, columns=None, static_metadata=True, seed=None):
+        """
+        Initialize a LoggingSpec instance.
+
+        Args:
+            component_types (iterable): The component types logged. Default is every type.
+            names (dict): The names of the components logged per component type. Default is every component.
+            sample (dict): The number or fraction of components logged per component type, e.g. ``{'prosumers': 0.01}``.
+            columns (dict): The columns logged per component type. Default is every non-static field.
+            static_metadata (bool): Write static fields to the metadata file instead of every row.
+            seed (int): The seed of the random samples.
+        """
+        self.component_types = set(component_types) if component_types is not None else None
+        self.names = {component_type: set(selected) for component_type, selected in (names or {}).items()}
+        self.sample = dict(sample or {})
+        self.columns = {component_type: tuple(selected) for component_type, selected in (columns or {}).items()}
+        self.static_metadata = static_metadata
+        self.seed = seed
+
+    def logs(self, component_type):
+        """
+        Check whether a component type is logged.
+
+        Args:
+            component_type (str): The component type.
+
+        Returns:
+            bool: True if the component type gets a CSV file.
+        """
+        return self.component_types is None or component_type in self.component_types
+
+    def select(self, component_type, component_list):
+        """
+        Select the components of a type that are logged.
+
+        Args:
+            component_type (str): The component type.
+            component_list (list): The components of the type.
+
+        Returns:
+            list: The ``(index, component)`` pairs of the logged components, in component order.
+        """
+        if not self.logs(component_type):
+            return []
+        selected = list(enumerate(component_list))
+        if component_type in self.names:
+            wanted = self.names[component_type]
+            selected = [(i, component) for i, component in selected if self.name_of(component) in wanted]
+        if component_type in self.sample:
+            size = self.sample[component_type]
+            if isinstance(size, float):
+                size = round(size * len(selected))
+            size = min(max(size, 0), len(selected))
+            chosen = set(random.Random(self.seed).sample(range(len(selected)), size))
+            selected = [pair for k, pair in enumerate(selected) if k in chosen]
+        return selected
+
+    def name_of(self, component):
+        """
+        Get the name a component is selected by; smart meters are selected by the name of their prosumer.
+
+        Args:
+            component: A component of the grid.
+
+        Returns:
+            str: The component name.
+        """
+        if hasattr(component, 'name'):
+            return component.name
+        return component.prosumer.name
+
+    def static_fields(self, component):
+        """
+        Get the static fields of a component written to the metadata file.
+
+        Args:
+            component: A component of the grid.
+
+        Returns:
+            tuple: The names of the static attributes.
+        """
+        if not self.static_metadata:
+            return ()
+        return tuple(getattr(component, 'static_fields', ()))
+
+    def select_columns(self, component_type, fields):
+        """
+        Select the columns logged for a component type. The timestep and name columns identifying a row are always kept.
+
+        Args:
+            component_type (str): The component type.
+            fields (iterable): The available columns, in file order.
+
+        Returns:
+            list: The logged columns, in file order.
+        """
+        if component_type not in self.columns:
+            return list(fields)
+        wanted = set(self.columns[component_type]) | {'timestep', 'name', 'prosumer_name'}
+        return [field for field in fields if field in wanted]
+
+
+@log_me
+class OutputSpec:
+    """
+    Class representing how a DataLog writes its files.
+
+    It groups the options of the written output: change-only rows, the per-timestep files, compression,
+    buffering, float formatting and an optional results store next to the CSV files.
+
+    Attributes:
+        changes_only (bool): Only log a component's row when one of its fields changed (see read_delta_log).
+        change_tolerance (float): The absolute change below which numeric fields count as unchanged.
+        full_resolution (bool): Write the per-timestep CSV files. Turn off to only write the rollups.
+        compression (str): Compress the CSV files while they are written with 'gzip', 'zstd' or 'lz4'.
+        compression_level (int): The compression level, or None for a fast level (see DataLog.default_levels).
+        buffer_size (int): The size in bytes of the write buffer of every CSV file.
+        float_precision (int): Write floats with this number of significant digits.
+        results_store (str): The directory of a chunked results store for fast time-range queries (see ResultsStore).
+        store_chunk_steps (int): The number of steps per chunk of the results store.
+    """
+
+    def __init__(self, changes_only=False, change_tolerance=0.0, full_resolution=True, compression=None,
+                 compression_level=None, buffer_size=1 << 20, float_precision=None, results_store=None,
+                 store_chunk_steps=1024):
+        """
+        Initialize an OutputSpec instance.
+
+        Args:
+            changes_only (bool): Only log a component's row when one of its fields changed.
+            change_tolerance (float): The absolute change below which numeric fields count as unchanged.
+            full_resolution (bool): Write the per-timestep CSV files.
+            compression (str): 'gzip', 'zstd', 'lz4' or None for plain CSV files.
+            compression_level (int): The compression level. Default is a fast level.
+            buffer_size (int): The size in bytes of the write buffer of every CSV file.
+            float_precision (int): The significant digits of the written floats. Default is full precision.
+            results_store (str): The directory of a results store. Default is no store.
+            store_chunk_steps (int): The number of steps per chunk of the results store.
+        """
+        self.changes_only = changes_only
+        self.change_tolerance = change_tolerance
+        self.full_resolution = full_resolution
+        self.compression = compression
+        self.compression_level = compression_level
+        self.buffer_size = buffer_size
+        self.float_precision = float_precision
+        self.results_store = results_store
+        self.store_chunk_steps = store_chunk_steps
@@ -0,0 +1,283 @@
+import os
+import sys
+import sysconfig
+import tracemalloc
+from collections import deque
+import numpy as np
+import pandas as pd
+from pyaspg.utils import log_me
+from .progress import resident_memory
+
+# The containers of the components that grow with the number of steps, by component type
+CONTAINERS = (
+    ('communication_networks', 'transmitted_data'),
+    ('communication_networks', 'received_data'),
+    ('prosumers', '_received_commands'),
+    ('aggregators', 'commands'),
+    ('aggregators', 'data_collected'),
+    ('utility_companies', 'received_data'),
+)
+PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STDLIB_DIR = os.path.abspath(sysconfig.get_paths()['stdlib'])
+
+
+def deep_size(obj, seen=None):
+    """
+    Get the size of a container, its items and the items of its nested lists, tuples, sets, deques and dictionaries.
+
+    Args:
+        obj (object): The container.
+        seen (set): The IDs of the objects already counted.
+
+    Returns:
+        int: The size in bytes.
+    """
+    if seen is None:
+        seen = set()
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(deep_size(key, seen) + deep_size(value, seen) for key, value in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset, deque)):
+        size += sum(deep_size(item, seen) for item in obj)
+    return size
+
+
+def source_label(filename):
+    """
+    Get the module of the package, or the third-party package, an allocation was made in.
+
+    Args:
+        filename (str): The file of the allocating frame.
+
+    Returns:
+        str: The module path relative to the package or the standard library, e.g. ``prosume/prosumer.py`` or
+        ``logging/__init__.py``, or the top-level name of a third-party package.
+    """
+    if filename.startswith('<'):
+        return filename
+    path = os.path.abspath(filename)
+    if path.startswith(PACKAGE_DIR + os.sep):
+        return os.path.relpath(path, PACKAGE_DIR)
+    parts = path.split(os.sep)
+    if 'site-packages' in parts:
+        return parts[parts.index('site-packages') + 1]
+    if path.startswith(STDLIB_DIR + os.sep):
+        return os.path.relpath(path, STDLIB_DIR)
+    return filename
+
+
+def consumption_data_size(prosumers):
+    """
+    Get the size of the consumption patterns of the prosumers, counting a parser shared by several prosumers once.
+
+    Args:
+        prosumers (list): The prosumers.
+
+    Returns:
+        tuple: The number of patterns and their size in bytes, DataFrames included.
+    """
+    parsers = {id(parser): parser for parser in (getattr(prosumer, 'consumption_pattern_parser', None) for prosumer in prosumers)
+               if parser is not None}
+    size = 0
+    for parser in parsers.values():
+        frame = getattr(parser, 'consumption_data', None)
+        if isinstance(frame, pd.DataFrame):
+            size += int(frame.memory_usage(deep=True).sum())
+        totals = getattr(parser, '_totals', None)
+        if isinstance(totals, np.ndarray) and getattr(totals, 'shm', None) is None:
+            size += totals.nbytes
+    return len(parsers), size
+
+
+@log_me
+class MemoryProfiler:
+    """
+    Class sampling the memory of a running simulation and attributing its growth to containers and modules.
+
+    Every ``every`` steps the profiler records the resident memory, the memory traced by ``tracemalloc``,
+    and the number of items and size in bytes of the containers that grow with the steps: the packets of
+    the communication networks, the commands of the prosumers and aggregators, the data collected by the
+    aggregators and utilities and the consumption DataFrames of the prosumers, along with the configured
+    capacity of the write buffers of the CSV files, which are not exposed by Python's writers. At the end of the run the growth of the traced memory since the first sample is grouped by
+    module and by source line. Tracing slows the simulation down, so the profiler is opt-in.
+
+    Attributes:
+        every (int): The number of steps between samples.
+        top (int): The number of source lines and modules reported as top growers.
+        frames (int): The number of frames stored per traced allocation.
+        timeline (list): One dictionary per sample with the step, the memory and the containers.
+        growers (list): The ``(source line, growth in bytes, growth in blocks)`` of the top growing lines.
+        modules (list): The ``(module, growth in bytes)`` of the top growing modules.
+        steps_done (int): The number of steps completed so far.
+    """
+
+    def __init__(self, every=100, top=10, frames=1):
+        """
+        Initialize a MemoryProfiler instance.
+
+        Args:
+            every (int): The number of steps between samples.
+            top (int): The number of source lines and modules reported as top growers.
+            frames (int): The number of frames stored per traced allocation.
+        """
+        if every < 1:
+            raise ValueError("The sampling interval must be at least 1 step")
+
+        self.every = every
+        self.top = top
+        self.frames = frames
+        self.timeline = []
+        self.growers = []
+        self.modules = []
+        self.components = {}
+        self.networks = []
+        self.data_log = None
+        self.baseline = None
+        self.started_tracing = False
+        self.steps_done = 0
+
+    def start(self, components, networks=(), data_log=None):
+        """
+        Start tracing allocations and take the first sample, before the first step.
+
+        Args:
+            components (dict): The component lists by type.
+            networks (list): The communication networks, which are reached through the smart meters.
+            data_log (DataLog): The CSV log whose write buffer capacity is reported, or None.
+        """
+        self.components = components
+        self.networks = list(networks)
+        self.data_log = data_log
+        self.timeline = []
+        self.steps_done = 0
+        self.started_tracing = not tracemalloc.is_tracing()
+        if self.started_tracing:
+            tracemalloc.start(self.frames)
+        self.baseline = self._snapshot()
+        self.sample(0)
+
+    def update(self, steps_done):
+        """
+        Take a sample if a sampling interval was completed.
+
+        Args:
+            steps_done (int): The number of steps completed.
+        """
+        self.steps_done = steps_done
+        if steps_done % self.every == 0:
+            self.sample(steps_done)
+
+    def sample(self, steps_done):
+        """
+        Record the memory and the size of the growing containers.
+
+        Args:
+            steps_done (int): The number of steps completed.
+
+        Returns:
+            dict: The sample.
+        """
+        traced, peak = tracemalloc.get_traced_memory()
+        containers = {}
+        for component_type, attribute in CONTAINERS:
+            component_list = self.networks if component_type == 'communication_networks' else self.components.get(component_type, ())
+            items, size, seen = 0, 0, set()
+            for component in component_list:
+                container = getattr(component, attribute, None)
+                if container is not None:
+                    items += len(container)
+                    size += deep_size(container, seen)
+            containers[f"{component_type}.{attribute.lstrip('_')}"] = (items, size)
+        containers['prosumers.consumption_data'] = consumption_data_size(self.components.get('prosumers', ()))
+        if self.data_log is not None:
+            # The bytes held by the buffered writers are not exposed, so this is their configured capacity
+            containers['data_log.buffer_capacity'] = (len(self.data_log.files), len(self.data_log.files) * self.data_log.buffer_size)
+
+        sample = {'step': steps_done, 'rss': resident_memory(), 'traced': traced, 'peak': peak, 'containers': containers}
+        self.timeline.append(sample)
+        return sample
+
+    def stop(self):
+        """
+        Take the last sample, find the top growers since the first sample and stop tracing.
+        """
+        if self.baseline is None:
+            return
+        if self.timeline[-1]['step'] != self.steps_done:
+            self.sample(self.steps_done)
+        snapshot = self._snapshot()
+        growth = snapshot.compare_to(self.baseline, 'lineno')
+        by_file = snapshot.compare_to(self.baseline, 'filename')
+        self.baseline = None
+        if self.started_tracing:
+            tracemalloc.stop()
+
+        self.growers = [(f"{source_label(stat.traceback[0].filename)}:{stat.traceback[0].lineno}", stat.size_diff, stat.count_diff)
+                        for stat in growth[:self.top] if stat.size_diff > 0]
+        modules = {}
+        for stat in by_file:
+            label = source_label(stat.traceback[0].filename)
+            modules[label] = modules.get(label, 0) + stat.size_diff
+        self.modules = sorted(((label, size) for label, size in modules.items() if size > 0), key=lambda item: -item[1])[:self.top]
+
+    def summary(self):
+        """
+        Summarize the growth between the first and the last sample, e.g. to fail a benchmark on a leak.
+
+        Returns:
+            dict: The steps sampled, the growth of the resident and traced memory in bytes, and the growth
+            of every container in items and bytes per step.
+        """
+        if len(self.timeline) < 2:
+            return {'steps': 0}
+        first, last = self.timeline[0], self.timeline[-1]
+        steps = max(last['step'] - first['step'], 1)
+        return {
+            'steps': last['step'] - first['step'],
+            'rss_growth': last['rss'] - first['rss'] if last['rss'] is not None and first['rss'] is not None else None,
+            'traced_growth': last['traced'] - first['traced'],
+            'traced_peak': max(sample['peak'] for sample in self.timeline),
+            'containers': {name: ((items - first['containers'][name][0]) / steps, (size - first['containers'][name][1]) / steps)
+                           for name, (items, size) in last['containers'].items()},
+        }
+
+    def write(self, simlog_path):
+        """
+        Append the memory timeline and the top growers to the simulation log.
+
+        Args:
+            simlog_path (str): The simulation log.
+        """
+        mb = 2 ** 20
+        names = list(self.timeline[0]['containers']) if self.timeline else []
+        lines = ["Memory timeline (step, RSS MB, traced MB, peak MB, then items/MB per container):",
+                 "  step,rss,traced,peak," + ",".join(names)]
+        for sample in self.timeline:
+            rss = f"{sample['rss'] / mb:.2f}" if sample['rss'] is not None else "unknown"
+            containers = ",".join(f"{items}/{size / mb:.3f}" for items, size in sample['containers'].values())
+            lines.append(f"  {sample['step']},{rss},{sample['traced'] / mb:.2f},{sample['peak'] / mb:.2f},{containers}")
+
+        summary = self.summary()
+        if summary['steps']:
+            lines.append("Container growth per step (items, bytes):")
+            for name, (items, size) in summary['containers'].items():
+                lines.append(f"  {name}: {items:g}, {size:g}")
+        lines.append("Top growing modules (KB):")
+        lines.extend(f"  {label}: {size / 1024:.1f}" for label, size in self.modules)
+        lines.append("Top growing lines (KB, blocks):")
+        lines.extend(f"  {line}: {size / 1024:.1f}, {count}" for line, size, count in self.growers)
+
+        with open(simlog_path, 'a') as log_file:
+            log_file.write("\n".join(lines) + "\n")
+            log_file.write("-----------------------------\n")
+
+    def _snapshot(self):
+        return tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            tracemalloc.Filter(False, "<unknown>"),
+        ))
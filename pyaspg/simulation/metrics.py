@@ -0,0 +1,216 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import numpy as np
+from .progress import resident_memory, directory_size
+
+
+def escape_label(value):
+    """
+    Escape a label value of the text exposition format.
+
+    Args:
+        value (str): The label value.
+
+    Returns:
+        str: The escaped value.
+    """
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class MetricsExporter:
+    """
+    Class serving the counters and gauges of a running simulation on a local HTTP endpoint, in the text exposition format.
+
+    The simulation loop only adds to plain counters and NumPy bucket counts, which the HTTP thread reads when
+    it is scraped. No lock is shared between them, so a scrape never stalls a step; a scrape taken in the
+    middle of a step may see the counters of that step partially updated. The packet counters of the
+    communication networks, the resident memory and the size of the output directory are read at scrape time.
+    For the same reason its methods are not logged, which would share the lock of the log file with the HTTP thread.
+
+    Served at ``/metrics``:
+        pyaspg_steps_total, pyaspg_simulation_time, pyaspg_step_seconds (histogram),
+        pyaspg_handler_seconds_total (per connection type), pyaspg_packets_sent_total, pyaspg_packets_lost_total
+        and pyaspg_packets_dropped_total (per network), pyaspg_unserved_energy_total, pyaspg_unserved_power,
+        process_resident_memory_bytes and pyaspg_output_bytes.
+
+    Attributes:
+        host (str): The address the endpoint listens on.
+        port (int): The port the endpoint listens on, chosen by the system when 0 is requested.
+        buckets (tuple): The upper edges of the step latency histogram, in seconds.
+        steps (int): The steps completed.
+        sim_time (float): The simulation time of the last step.
+        step_seconds (float): The summed compute time of the steps.
+        step_buckets (np.ndarray): The number of steps per latency bucket, the last one above the last edge.
+        handler_seconds (dict): The summed time spent in the handler of each connection type.
+        unserved_energy (float): The summed demand of the prosumers left unmet after each step, times the timestep.
+        unserved_power (float): The demand of the prosumers left unmet after the last step, in W.
+        networks (list): The communication networks whose packet counters are exported.
+        output_dir (str): The directory whose size is exported, or None.
+    """
+
+    def __init__(self, port=0, host='127.0.0.1', buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0)):
+        """
+        Initialize a MetricsExporter instance.
+
+        Args:
+            port (int): The port to listen on. Default lets the system pick a free one.
+            host (str): The address to listen on. Default is only reachable from the local machine.
+            buckets (tuple): The upper edges of the step latency histogram, in seconds.
+        """
+        self.host = host
+        self.port = port
+        self.buckets = tuple(sorted(buckets))
+        self.steps = 0
+        self.sim_time = 0.0
+        self.step_seconds = 0.0
+        self.step_buckets = np.zeros(len(self.buckets) + 1, dtype=np.int64)
+        self.handler_seconds = {}
+        self.unserved_energy = 0.0
+        self.unserved_power = 0.0
+        self.networks = []
+        self.output_dir = None
+        self.server = None
+        self.thread = None
+
+    def bind(self, connection_types, networks, output_dir):
+        """
+        Set what a simulation exports, before its first step.
+
+        Args:
+            connection_types (iterable): The connection types whose handlers are timed.
+            networks (list): The communication networks whose packet counters are exported.
+            output_dir (str): The directory whose size is exported, or None.
+        """
+        # Every key exists before the run, so a scrape never iterates a dictionary that changes size
+        for connection_type in connection_types:
+            self.handler_seconds.setdefault(connection_type, 0.0)
+        self.networks = list(networks)
+        self.output_dir = output_dir
+
+    def start(self):
+        """
+        Start serving the endpoint in a daemon thread. Does nothing if it is already running.
+        """
+        if self.server is not None:
+            return
+        exporter = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] != '/metrics':
+                    self.send_error(404)
+                    return
+                body = exporter.render().encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self.server.daemon_threads = True
+        self.port = self.server.server_address[1]
+        self.thread = threading.Thread(target=self.server.serve_forever, name='pyaspg-metrics', daemon=True)
+        self.thread.start()
+
+    def close(self):
+        """
+        Stop serving the endpoint.
+        """
+        if self.server is None:
+            return
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join()
+        self.server = None
+        self.thread = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @property
+    def url(self):
+        """
+        Get the URL of the endpoint.
+
+        Returns:
+            str: The URL of ``/metrics``.
+        """
+        return f"http://{self.host}:{self.port}/metrics"
+
+    def observe_step(self, t, seconds, prosumers, timestep):
+        """
+        Count a completed step.
+
+        Args:
+            t (float): The simulation time of the step.
+            seconds (float): The compute time of the step.
+            prosumers (list): The prosumers of the grid.
+            timestep (float): The length of a simulation step.
+        """
+        self.step_buckets[np.searchsorted(self.buckets, seconds)] += 1
+        self.step_seconds += seconds
+        if prosumers:
+            unserved = np.fromiter((prosumer.net_power for prosumer in prosumers), dtype=float, count=len(prosumers))
+            self.unserved_power = float(np.maximum(unserved, 0).sum())
+            self.unserved_energy += self.unserved_power * timestep
+        self.sim_time = t
+        self.steps += 1
+
+    def render(self):
+        """
+        Render the metrics in the text exposition format.
+
+        Returns:
+            str: The exposition.
+        """
+        lines = []
+
+        def metric(name, kind, help_text, samples):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for suffix, labels, value in samples:
+                label_text = ",".join(f'{key}="{escape_label(val)}"' for key, val in labels)
+                lines.append(f"{name}{suffix}{{{label_text}}} {value!r}" if labels else f"{name}{suffix} {value!r}")
+
+        metric('pyaspg_steps_total', 'counter', "Simulation steps completed.", [('', (), self.steps)])
+        metric('pyaspg_simulation_time', 'gauge', "Simulation time of the last step.", [('', (), float(self.sim_time))])
+
+        counts = np.cumsum(self.step_buckets)
+        samples = [('_bucket', (('le', f"{edge:g}"),), int(count)) for edge, count in zip(self.buckets, counts)]
+        samples.append(('_bucket', (('le', '+Inf'),), int(counts[-1])))
+        samples.append(('_sum', (), self.step_seconds))
+        samples.append(('_count', (), int(counts[-1])))
+        metric('pyaspg_step_seconds', 'histogram', "Compute time of a simulation step in seconds.", samples)
+
+        metric('pyaspg_handler_seconds_total', 'counter', "Time spent in the handler of each connection type in seconds.",
+               [('', (('connection_type', connection_type),), seconds)
+                for connection_type, seconds in list(self.handler_seconds.items())])
+        for attribute, help_text in (('packets_sent', "Packets sent through each communication network."),
+                                     ('packets_lost', "Packets lost by each communication network."),
+                                     ('packets_dropped', "Packets dropped by a full queue of each communication network.")):
+            metric(f'pyaspg_{attribute}_total', 'counter', help_text,
+                   [('', (('network', network.name),), getattr(network, attribute, 0)) for network in self.networks])
+
+        metric('pyaspg_unserved_energy_total', 'counter', "Demand of the prosumers left unmet, summed over the steps times the timestep.",
+               [('', (), self.unserved_energy)])
+        metric('pyaspg_unserved_power', 'gauge', "Demand of the prosumers left unmet after the last step in W.",
+               [('', (), self.unserved_power)])
+        rss = resident_memory()
+        if rss is not None:
+            metric('process_resident_memory_bytes', 'gauge', "Resident memory size in bytes.", [('', (), rss)])
+        if self.output_dir is not None:
+            try:
+                size = directory_size(self.output_dir)
+            except OSError:
+                size = None
+            if size is not None:
+                metric('pyaspg_output_bytes', 'gauge', "Bytes written to the output directory.", [('', (), size)])
+        return "\n".join(lines) + "\n"
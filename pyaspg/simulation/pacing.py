@@ -0,0 +1,125 @@
+import numpy as np
+from pyaspg.utils import log_me
+
+
+@log_me
+class StepPacer:
+    """
+    Class accounting for the wall-clock budget of the steps of a simulation run at real-time pace.
+
+    Every step is scheduled to start at ``timestep * factor`` seconds of wall-clock time per simulation
+    step, and its deadline is the scheduled start of the next step. The pacer records how long each step
+    took to compute and its slack, the time left before its deadline when it finished. A step with negative
+    slack missed its deadline, whether because it was slow or because an earlier step made it start late.
+
+    Attributes:
+        budget (float): The wall-clock seconds per step.
+        bins (tuple): The upper edges of the latency histogram, as fractions of the budget.
+        n_steps (int): The number of steps recorded.
+        latencies (np.ndarray): The compute time of every step in seconds.
+        slacks (np.ndarray): The slack of every step in seconds.
+    """
+
+    def __init__(self, budget, n_steps, bins=(0.1, 0.25, 0.5, 0.75, 1.0, 1.5, 2.0)):
+        """
+        Initialize a StepPacer instance.
+
+        Args:
+            budget (float): The wall-clock seconds per step.
+            n_steps (int): The number of steps of the simulation.
+            bins (tuple): The upper edges of the latency histogram, as fractions of the budget.
+        """
+        if budget <= 0:
+            raise ValueError("The step budget must be positive")
+
+        self.budget = budget
+        self.bins = tuple(bins)
+        self.n_steps = 0
+        self.latencies = np.zeros(max(n_steps, 1))
+        self.slacks = np.zeros(max(n_steps, 1))
+
+    def record(self, latency, slack):
+        """
+        Record a step.
+
+        Args:
+            latency (float): The compute time of the step in seconds.
+            slack (float): The seconds left before the deadline of the step when it finished.
+        """
+        if self.n_steps == len(self.latencies):
+            self.latencies = np.resize(self.latencies, 2 * self.n_steps)
+            self.slacks = np.resize(self.slacks, 2 * self.n_steps)
+        self.latencies[self.n_steps] = latency
+        self.slacks[self.n_steps] = slack
+        self.n_steps += 1
+
+    @property
+    def misses(self):
+        """
+        Get the number of steps that missed their deadline.
+
+        Returns:
+            int: The number of steps with negative slack.
+        """
+        return int(np.count_nonzero(self.slacks[:self.n_steps] < 0))
+
+    def histogram(self):
+        """
+        Count the steps per latency bin, the last bin holding the steps above the last edge.
+
+        Returns:
+            np.ndarray: The number of steps in every bin.
+        """
+        edges = np.concatenate(([0.0], self.bins, [np.inf])) * self.budget
+        counts, _ = np.histogram(self.latencies[:self.n_steps], bins=edges)
+        return counts
+
+    def summary(self):
+        """
+        Summarize the recorded steps.
+
+        Returns:
+            dict: The number of steps, misses, miss rate, the latency mean, percentiles and maximum, and the minimum slack, in seconds.
+        """
+        latencies = self.latencies[:self.n_steps]
+        if not self.n_steps:
+            return {'steps': 0, 'misses': 0, 'miss_rate': 0.0}
+        p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+        return {
+            'steps': self.n_steps,
+            'misses': self.misses,
+            'miss_rate': self.misses / self.n_steps,
+            'latency_mean': float(latencies.mean()),
+            'latency_p50': float(p50),
+            'latency_p95': float(p95),
+            'latency_p99': float(p99),
+            'latency_max': float(latencies.max()),
+            'slack_min': float(self.slacks[:self.n_steps].min()),
+        }
+
+    def write(self, simlog_path):
+        """
+        Append the summary and the latency histogram to the simulation log.
+
+        Args:
+            simlog_path (str): The simulation log.
+        """
+        summary = self.summary()
+        lines = ["Real-time pacing:",
+                 f"Step budget: {self.budget * 1000:.3f} ms",
+                 f"Deadline misses: {summary['misses']}/{summary['steps']} ({100 * summary['miss_rate']:.2f}%)"]
+        if self.n_steps:
+            lines.append(f"Step latency: mean {summary['latency_mean'] * 1000:.3f} ms, p50 {summary['latency_p50'] * 1000:.3f} ms, "
+                         f"p95 {summary['latency_p95'] * 1000:.3f} ms, p99 {summary['latency_p99'] * 1000:.3f} ms, "
+                         f"max {summary['latency_max'] * 1000:.3f} ms")
+            lines.append(f"Minimum slack: {summary['slack_min'] * 1000:.3f} ms")
+        lines.append("Latency histogram (fraction of the budget: steps):")
+        lower = 0.0
+        for upper, count in zip(self.bins + (np.inf,), self.histogram()):
+            label = f"{lower:g}-{upper:g}" if upper != np.inf else f">{lower:g}"
+            lines.append(f"  {label}: {count} {'#' * int(round(40 * count / max(self.n_steps, 1)))}")
+            lower = upper
+
+        with open(simlog_path, 'a') as log_file:
+            log_file.write("\n".join(lines) + "\n")
+            log_file.write("-----------------------------\n")
@@ -0,0 +1,165 @@
+import os
+import time
+from collections import deque
+from datetime import timedelta
+from pyaspg.utils import log_me
+
+
+def resident_memory():
+    """
+    Get the resident set size of the current process.
+
+    Returns:
+        int: The resident memory in bytes, or None where ``/proc/self/statm`` is not available.
+    """
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def directory_size(path):
+    """
+    Get the total size of the files in a directory.
+
+    Args:
+        path (str): The directory.
+
+    Returns:
+        int: The size in bytes.
+    """
+    return sum(entry.stat().st_size for entry in os.scandir(path) if entry.is_file())
+
+
+@log_me
+class ProgressSpec:
+    """
+    Class representing where and how often a simulation reports its progress (see ProgressMonitor).
+
+    Attributes:
+        callback (callable): Called with a progress report dictionary on every report.
+        every (int): The number of steps between reports.
+        log (bool): Append every report as a line to simlog.txt.
+    """
+
+    def __init__(self, callback=None, every=100, log=False):
+        """
+        Initialize a ProgressSpec instance.
+
+        Args:
+            callback (callable): Called with every progress report.
+            every (int): The number of steps between reports.
+            log (bool): Append every report as a line to simlog.txt.
+        """
+        if callback is None and not log:
+            raise ValueError("Progress needs a callback, the simulation log or both")
+
+        self.callback = callback
+        self.every = every
+        self.log = log
+
+
+@log_me
+class ProgressMonitor:
+    """
+    Class reporting the progress and throughput of a running simulation every few steps.
+
+    Each report is a dictionary with the steps completed, the total number of steps, the elapsed seconds,
+    the steps per second over a sliding window of recent reports, the estimated seconds remaining, the
+    resident memory and the bytes written to the output directory so far. Reports are passed to a callback,
+    written as a line to the simulation log, or both.
+
+    Attributes:
+        total_steps (int): The number of steps of the simulation.
+        output_dir (str): The directory whose size is reported, or None when nothing is written.
+        callback (callable): Called with every report.
+        simlog_path (str): The simulation log the reports are appended to.
+        every (int): The number of steps between reports.
+        window (deque): The ``(step, time)`` pairs of the recent reports the throughput is measured over.
+    """
+
+    def __init__(self, total_steps, output_dir, callback=None, simlog_path=None, every=100, window=10):
+        """
+        Initialize a ProgressMonitor instance.
+
+        Args:
+            total_steps (int): The number of steps of the simulation.
+            output_dir (str): The directory whose size is reported, or None when nothing is written.
+            callback (callable): Called with every report.
+            simlog_path (str): The simulation log the reports are appended to.
+            every (int): The number of steps between reports.
+            window (int): The number of recent reports the throughput is measured over.
+        """
+        if every < 1:
+            raise ValueError("The reporting interval must be at least 1 step")
+
+        self.total_steps = total_steps
+        self.output_dir = output_dir
+        self.callback = callback
+        self.simlog_path = simlog_path
+        self.every = every
+        self.start_time = time.perf_counter()
+        self.window = deque([(0, self.start_time)], maxlen=window + 1)
+
+    def update(self, steps_done):
+        """
+        Report the progress if a reporting interval was completed.
+
+        Args:
+            steps_done (int): The number of steps completed.
+        """
+        if steps_done % self.every and steps_done != self.total_steps:
+            return
+        self.report(steps_done)
+
+    def report(self, steps_done):
+        """
+        Build a report and pass it to the callback and the simulation log.
+
+        Args:
+            steps_done (int): The number of steps completed.
+
+        Returns:
+            dict: The report.
+        """
+        now = time.perf_counter()
+        self.window.append((steps_done, now))
+        first_step, first_time = self.window[0]
+        rate = (steps_done - first_step) / (now - first_time) if now > first_time else 0.0
+        remaining = self.total_steps - steps_done
+
+        report = {
+            'step': steps_done,
+            'total_steps': self.total_steps,
+            'elapsed': now - self.start_time,
+            'steps_per_second': rate,
+            'eta': remaining / rate if rate > 0 else None,
+            'rss': resident_memory(),
+            'output_bytes': directory_size(self.output_dir) if self.output_dir else None,
+        }
+        if self.callback is not None:
+            self.callback(report)
+        if self.simlog_path is not None:
+            with open(self.simlog_path, 'a') as log_file:
+                log_file.write(format_report(report) + "\n")
+        return report
+
+
+def format_report(report):
+    """
+    Format a progress report as a simulation log line.
+
+    Args:
+        report (dict): A report of ProgressMonitor.
+
+    Returns:
+        str: The log line.
+    """
+    total = report['total_steps']
+    percent = 100 * report['step'] / total if total else 100.0
+    eta = str(timedelta(seconds=round(report['eta']))) if report['eta'] is not None else "unknown"
+    rss = f"{report['rss'] / 2 ** 20:.1f} MB" if report['rss'] is not None else "unknown"
+    output = f"{report['output_bytes'] / 2 ** 20:.1f} MB" if report['output_bytes'] is not None else "none"
+    return (f"Progress: step {report['step']}/{total} ({percent:.1f}%), {report['steps_per_second']:.1f} steps/s, "
+            f"ETA {eta}, RSS {rss}, output {output}")
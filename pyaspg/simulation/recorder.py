@@ -0,0 +1,181 @@
+import os
+import numbers
+from operator import attrgetter
+import numpy as np
+import pandas as pd
+from pyaspg.utils import log_me
+
+# Smart meter quantities, read from the prosumer of each meter
+SMART_METER_FIELDS = {
+    'total_consumption': lambda meter: meter.prosumer.total_consumption,
+    'total_production': lambda meter: meter.prosumer.total_production,
+    'net_read': lambda meter: meter.prosumer.net_power_before,
+    'consumption': lambda meter: meter.prosumer.last_generated_consumption,
+    'production': lambda meter: meter.prosumer.last_generated_production,
+}
+
+
+@log_me
+class MemoryRecorder:
+    """
+    Class recording the numeric quantities a DataLog writes into preallocated arrays instead of CSV files.
+
+    Every numeric logged field of a component type gets a ``(timesteps, components)`` float64 array, plus
+    ``power_to_prosumers`` for distributors. Fields holding names, lists or dictionaries are not recorded.
+    The arrays grow by doubling if the simulation runs more steps than preallocated.
+
+    Attributes:
+        n_steps (int): The number of steps recorded so far.
+        times (np.ndarray): The simulation time of every step.
+        names (dict): The component names per component type, in column order.
+        arrays (dict): The arrays per component type and field.
+    """
+
+    def __init__(self, components, n_steps, topology=None):
+        """
+        Initialize a MemoryRecorder instance.
+
+        Args:
+            components (dict): The component lists per component type.
+            n_steps (int): The number of steps to preallocate.
+            topology (GridTopology): The grid topology, used to sum the power delivered by each distributor.
+        """
+        self.topology = topology
+        self.n_steps = 0
+        capacity = max(n_steps, 1)
+        self.times = np.zeros(capacity)
+        self.names = {}
+        self.arrays = {}
+        self.getters = {}
+
+        for component_type, component_list in components.items():
+            if not component_list:
+                continue
+            first = component_list[0]
+            if component_type == 'smart_meters':
+                getters = dict(SMART_METER_FIELDS)
+                self.names[component_type] = [meter.prosumer.name for meter in component_list]
+            else:
+                fields = getattr(first, 'log_fields', None) or [attr for attr in vars(first) if attr != 'env']
+                getters = {field: attrgetter(field) for field in fields
+                           if isinstance(getattr(first, field), numbers.Number)}
+                self.names[component_type] = [component.name for component in component_list]
+            self.getters[component_type] = getters
+            self.arrays[component_type] = {field: np.zeros((capacity, len(component_list))) for field in getters}
+            if component_type == 'distributors':
+                self.arrays[component_type]['power_to_prosumers'] = np.zeros((capacity, len(component_list)))
+
+    def _grow(self):
+        capacity = 2 * len(self.times)
+        self.times = np.resize(self.times, capacity)
+        for arrays in self.arrays.values():
+            for field, array in arrays.items():
+                grown = np.zeros((capacity, array.shape[1]))
+                grown[:len(array)] = array
+                arrays[field] = grown
+
+    def record(self, timestep, components):
+        """
+        Record the quantities of every component at the current step.
+
+        Args:
+            timestep (float): The current simulation time.
+            components (dict): The component lists per component type.
+        """
+        if self.n_steps == len(self.times):
+            self._grow()
+        step = self.n_steps
+        self.times[step] = timestep
+        for component_type, getters in self.getters.items():
+            component_list = components[component_type]
+            arrays = self.arrays[component_type]
+            for field, getter in getters.items():
+                arrays[field][step] = [getter(component) for component in component_list]
+
+        if 'distributors' in self.arrays:
+            received = [prosumer.received_power for prosumer in components['prosumers']]
+            if self.topology is not None:
+                delivered = self.topology.layers['distributor_to_prosumer'].gather(received)
+            else:
+                delivered = np.zeros(len(components['distributors']))
+            self.arrays['distributors']['power_to_prosumers'][step] = delivered
+        self.n_steps += 1
+
+    def results(self):
+        """
+        Get the recorded results, trimmed to the steps that ran.
+
+        Returns:
+            SimulationResults: The recorded arrays.
+        """
+        arrays = {component_type: {field: array[:self.n_steps] for field, array in fields.items()}
+                  for component_type, fields in self.arrays.items()}
+        return SimulationResults(self.times[:self.n_steps], self.names, arrays)
+
+
+class SimulationResults:
+    """
+    Class representing the results of a simulation recorded in memory.
+
+    Attributes:
+        times (np.ndarray): The simulation time of every step.
+        names (dict): The component names per component type, in column order.
+        arrays (dict): The ``(timesteps, components)`` arrays per component type and field.
+    """
+
+    def __init__(self, times, names, arrays):
+        """
+        Initialize a SimulationResults instance.
+
+        Args:
+            times (np.ndarray): The simulation time of every step.
+            names (dict): The component names per component type, in column order.
+            arrays (dict): The ``(timesteps, components)`` arrays per component type and field.
+        """
+        self.times = times
+        self.names = names
+        self.arrays = arrays
+
+    def __getitem__(self, key):
+        """
+        Get the array of a component type and field, e.g. ``results['prosumers', 'net_power']``.
+
+        Args:
+            key (tuple): The component type and field.
+
+        Returns:
+            np.ndarray: The ``(timesteps, components)`` array.
+        """
+        component_type, field = key
+        return self.arrays[component_type][field]
+
+    def frame(self, component_type):
+        """
+        Get the results of a component type in the long format of the DataLog CSV files.
+
+        Args:
+            component_type (str): The component type.
+
+        Returns:
+            pd.DataFrame: One row per timestep and component.
+        """
+        names = self.names[component_type]
+        key = 'prosumer_name' if component_type == 'smart_meters' else 'name'
+        frame = pd.DataFrame({
+            'timestep': np.repeat(self.times, len(names)),
+            key: np.tile(names, len(self.times)),
+        })
+        for field, array in self.arrays[component_type].items():
+            frame[field] = array.ravel()
+        return frame
+
+    def to_csv(self, output_dir):
+        """
+        Export the results to one CSV file per component type.
+
+        Args:
+            output_dir (str): The directory the CSV files are written to.
+        """
+        os.makedirs(output_dir, exist_ok=True)
+        for component_type in self.arrays:
+            self.frame(component_type).to_csv(os.path.join(output_dir, f"{component_type}.csv"), index=False)
@@ -0,0 +1,238 @@
+import os
+import json
+import numpy as np
+import pandas as pd
+from pyaspg.utils import log_me
+from .recorder import MemoryRecorder
+
+
+@log_me
+class ResultsStoreWriter:
+    """
+    Class writing simulation results to a chunked, time-indexed store on disk.
+
+    The steps are gathered by a MemoryRecorder of ``chunk_steps`` steps and written as one ``.npy`` file per
+    chunk and field, shaped (steps, components), next to the simulation times of the chunk. ``index.json``
+    lists the chunks with their step and time ranges, and the components and fields of every component type.
+    It is rewritten after every chunk, so a store can be read while the simulation runs.
+
+    Attributes:
+        path (str): The directory of the store.
+        chunk_steps (int): The number of steps per chunk.
+        recorder (MemoryRecorder): The buffer of the current chunk.
+        index (dict): The index of the store.
+    """
+
+    def __init__(self, path, components, chunk_steps=1024, topology=None):
+        """
+        Initialize a ResultsStoreWriter instance and create the store.
+
+        Args:
+            path (str): The directory of the store.
+            components (dict): The component lists per component type.
+            chunk_steps (int): The number of steps per chunk.
+            topology (GridTopology): The grid topology, used to sum the power delivered by each distributor.
+        """
+        if chunk_steps < 1:
+            raise ValueError("Chunks must hold at least 1 step")
+
+        self.path = path
+        self.chunk_steps = chunk_steps
+        self.recorder = MemoryRecorder(components, chunk_steps, topology)
+        self.n_steps = 0
+        self.index = {
+            'chunk_steps': chunk_steps,
+            'chunks': [],
+            'types': {component_type: {'names': self.recorder.names[component_type], 'fields': list(arrays)}
+                      for component_type, arrays in self.recorder.arrays.items()},
+        }
+        for component_type in self.recorder.arrays:
+            os.makedirs(os.path.join(path, component_type), exist_ok=True)
+        self._write_index()
+
+    def append(self, timestep, components):
+        """
+        Add the state of the components at a step, writing the chunk once it is full.
+
+        Args:
+            timestep (float): The current simulation time.
+            components (dict): The component lists per component type.
+        """
+        self.recorder.record(timestep, components)
+        if self.recorder.n_steps == self.chunk_steps:
+            self.flush()
+
+    def flush(self):
+        """
+        Write the steps gathered since the last chunk as a new chunk.
+        """
+        n = self.recorder.n_steps
+        if not n:
+            return
+        chunk = len(self.index['chunks'])
+        np.save(os.path.join(self.path, f"times_{chunk:05d}.npy"), self.recorder.times[:n])
+        for component_type, arrays in self.recorder.arrays.items():
+            for field, array in arrays.items():
+                np.save(os.path.join(self.path, component_type, f"{field}_{chunk:05d}.npy"), array[:n])
+
+        times = self.recorder.times
+        self.index['chunks'].append({'start': self.n_steps, 'n_steps': n, 't_first': float(times[0]), 't_last': float(times[n - 1])})
+        self.n_steps += n
+        # The buffers are reused for the next chunk
+        self.recorder.n_steps = 0
+        self._write_index()
+
+    def _write_index(self):
+        temporary_path = os.path.join(self.path, "index.json.tmp")
+        with open(temporary_path, 'w') as index_file:
+            json.dump(self.index, index_file)
+        os.replace(temporary_path, os.path.join(self.path, "index.json"))
+
+    def close(self):
+        """
+        Write the last partial chunk.
+        """
+        self.flush()
+
+
+class ResultsStore:
+    """
+    Class reading a results store written by ResultsStoreWriter.
+
+    Queries select chunks from the index by time range and open only those, memory-mapped, so a query reads
+    the rows and files it needs rather than the whole run. Time ranges are inclusive at both ends.
+
+    Attributes:
+        path (str): The directory of the store.
+        index (dict): The index of the store.
+    """
+
+    def __init__(self, path):
+        """
+        Initialize a ResultsStore instance.
+
+        Args:
+            path (str): The directory of the store.
+        """
+        self.path = path
+        with open(os.path.join(path, "index.json")) as index_file:
+            self.index = json.load(index_file)
+        self._columns = {component_type: {name: i for i, name in enumerate(info['names'])}
+                         for component_type, info in self.index['types'].items()}
+
+    def names(self, component_type):
+        """
+        Get the component names of a component type, in column order.
+
+        Args:
+            component_type (str): The component type.
+
+        Returns:
+            list: The component names.
+        """
+        return self.index['types'][component_type]['names']
+
+    def fields(self, component_type):
+        """
+        Get the fields stored for a component type.
+
+        Args:
+            component_type (str): The component type.
+
+        Returns:
+            list: The field names.
+        """
+        return self.index['types'][component_type]['fields']
+
+    def _chunks(self, start, end):
+        for chunk, info in enumerate(self.index['chunks']):
+            if (start is None or info['t_last'] >= start) and (end is None or info['t_first'] <= end):
+                yield chunk
+
+    def _load(self, file_name):
+        return np.load(os.path.join(self.path, file_name), mmap_mode='r')
+
+    def _column_ids(self, component_type, names):
+        if names is None:
+            return None
+        if isinstance(names, str):
+            names = [names]
+        columns = self._columns[component_type]
+        missing = [name for name in names if name not in columns]
+        if missing:
+            raise KeyError(f"Unknown {component_type}: {missing}")
+        return np.array([columns[name] for name in names], dtype=np.intp)
+
+    def select(self, component_type, field, names=None, start=None, end=None):
+        """
+        Read a field of a component type over a time range.
+
+        Args:
+            component_type (str): The component type.
+            field (str): The field.
+            names (list): The component names. Default is every component of the type.
+            start (float): The first simulation time. Default is the start of the run.
+            end (float): The last simulation time. Default is the end of the run.
+
+        Returns:
+            tuple: The simulation times (np.ndarray) and the values, shaped (times, components).
+        """
+        if field not in self.fields(component_type):
+            raise KeyError(f"No field {field} stored for {component_type}")
+        columns = self._column_ids(component_type, names)
+        times, values = [], []
+        for chunk in self._chunks(start, end):
+            chunk_times = self._load(f"times_{chunk:05d}.npy")
+            first = 0 if start is None else np.searchsorted(chunk_times, start, side='left')
+            last = len(chunk_times) if end is None else np.searchsorted(chunk_times, end, side='right')
+            array = self._load(os.path.join(component_type, f"{field}_{chunk:05d}.npy"))[first:last]
+            times.append(np.array(chunk_times[first:last]))
+            values.append(np.array(array if columns is None else array[:, columns]))
+
+        n_columns = len(self.names(component_type)) if columns is None else len(columns)
+        if not times:
+            return np.empty(0), np.empty((0, n_columns))
+        return np.concatenate(times), np.concatenate(values)
+
+    def frame(self, component_type, fields=None, names=None, start=None, end=None):
+        """
+        Read a component type over a time range in the long format of the DataLog CSV files.
+
+        Args:
+            component_type (str): The component type.
+            fields (list): The fields. Default is every stored field.
+            names (list): The component names. Default is every component of the type.
+            start (float): The first simulation time. Default is the start of the run.
+            end (float): The last simulation time. Default is the end of the run.
+
+        Returns:
+            pd.DataFrame: One row per timestep and component.
+        """
+        fields = fields or self.fields(component_type)
+        if isinstance(names, str):
+            names = [names]
+        selected = names if names is not None else self.names(component_type)
+        key = 'prosumer_name' if component_type == 'smart_meters' else 'name'
+
+        frame = None
+        for field in fields:
+            times, values = self.select(component_type, field, names, start, end)
+            if frame is None:
+                frame = pd.DataFrame({'timestep': np.repeat(times, len(selected)), key: np.tile(selected, len(times))})
+            frame[field] = values.ravel()
+        return frame
+
+    def at(self, component_type, timestep, fields=None, names=None):
+        """
+        Read the components of a type at one simulation time, e.g. all meters at step 900.
+
+        Args:
+            component_type (str): The component type.
+            timestep (float): The simulation time.
+            fields (list): The fields. Default is every stored field.
+            names (list): The component names. Default is every component of the type.
+
+        Returns:
+            pd.DataFrame: One row per component.
+        """
+        return self.frame(component_type, fields, names, timestep, timestep)
@@ -0,0 +1,148 @@
+import numpy as np
+from operator import attrgetter
+from pyaspg.utils import log_me
+
+
+@log_me
+class RollupWindow:
+    """
+    Class accumulating statistics of component fields over fixed windows of simulation time.
+
+    The sums, minima, maxima and sample counts of the current window are kept in preallocated arrays
+    with one row per component, and one row per component is written when the window closes. A field
+    may name an attribute (``"net_power"``) or a key of a dictionary attribute (``"utility_data.total_consumption"``).
+
+    The ``sum`` statistic is the plain sum of the samples of the window. The ``energy`` statistic integrates
+    a power field over the window: the sum times the timestep, in W times the simulation time unit (e.g.
+    Wmin for one-minute steps).
+
+    Attributes:
+        component_type (str): The component type rolled up (e.g. ``"prosumers"``).
+        window (float): The window length in simulation time units (e.g. 15 or 60 minutes).
+        fields (tuple): The fields rolled up.
+        statistics (tuple): The statistics written per field, among sum, mean, min, max and energy.
+        timestep (float): The length of a simulation step, the time between two samples.
+    """
+
+    # Fields rolled up when none are given
+    default_fields = {
+        'prosumers': ('received_power', 'net_power', 'stored_energy', 'last_generated_consumption', 'last_generated_production'),
+        'aggregators': ('utility_data.total_consumption', 'utility_data.total_production', 'utility_data.total_stored_energy'),
+    }
+
+    def __init__(self, component_type, window, fields=None, statistics=('sum', 'mean', 'min', 'max', 'energy')):
+        """
+        Initialize a RollupWindow instance.
+
+        Args:
+            component_type (str): The component type rolled up.
+            window (float): The window length in simulation time units.
+            fields (tuple): The fields rolled up. Default is a per-type selection, or every numeric logged field.
+            statistics (tuple): The statistics written per field, among sum, mean, min, max and energy.
+        """
+        if window <= 0:
+            raise ValueError("Window must be positive")
+        invalid = set(statistics) - {'sum', 'mean', 'min', 'max', 'energy'}
+        if invalid:
+            raise ValueError(f"Invalid rollup statistics: {sorted(invalid)}")
+
+        self.component_type = component_type
+        self.window = window
+        self.fields = tuple(fields) if fields else self.default_fields.get(component_type)
+        self.statistics = tuple(statistics)
+        self.writer = None
+        self.names = []
+        self.window_index = None
+        self.timestep = 1
+
+    @property
+    def file_name(self):
+        """
+        Get the name of the CSV file of the rollup.
+
+        Returns:
+            str: The file name, e.g. ``"prosumers_15.csv"``.
+        """
+        return f"{self.component_type}_{self.window:g}.csv"
+
+    def _getter(self, field):
+        if '.' not in field:
+            return attrgetter(field)
+        attribute, key = field.split('.', 1)
+        return lambda component: getattr(component, attribute).get(key, 0)
+
+    def start(self, component_list, writer, timestep=1):
+        """
+        Allocate the accumulators and write the header.
+
+        Args:
+            component_list (list): The components rolled up.
+            writer (csv.writer): The writer of the rollup file.
+            timestep (float): The length of a simulation step, the time between two samples.
+        """
+        self.timestep = timestep
+        if self.fields is None:
+            first = component_list[0]
+            self.fields = tuple(field for field in first.log_fields if isinstance(getattr(first, field), (int, float)))
+        self.writer = writer
+        self.names = [component.name for component in component_list]
+
+        if all('.' not in field for field in self.fields):
+            getter = attrgetter(*self.fields)
+            self._row = getter if len(self.fields) > 1 else lambda component: (getter(component),)
+        else:
+            getters = [self._getter(field) for field in self.fields]
+            self._row = lambda component: tuple(get(component) for get in getters)
+
+        shape = (len(component_list), len(self.fields))
+        self.sums = np.zeros(shape)
+        self.minimums = np.full(shape, np.inf)
+        self.maximums = np.full(shape, -np.inf)
+        self.count = 0
+
+        header = ['window_start', 'window_end', 'name']
+        header += [f"{field}_{statistic}" for field in self.fields for statistic in self.statistics]
+        writer.writerow(header)
+
+    def update(self, timestep, component_list):
+        """
+        Add the current values of the components, writing the previous window first if it closed.
+
+        Args:
+            timestep (float): The current simulation time.
+            component_list (list): The components rolled up.
+        """
+        window_index = int(timestep // self.window)
+        if self.window_index is not None and window_index != self.window_index:
+            self.flush()
+        self.window_index = window_index
+
+        values = np.array([self._row(component) for component in component_list], dtype=float)
+        self.sums += values
+        np.minimum(self.minimums, values, out=self.minimums)
+        np.maximum(self.maximums, values, out=self.maximums)
+        self.count += 1
+
+    def flush(self):
+        """
+        Write the rows of the current window and reset the accumulators.
+        """
+        if not self.count:
+            return
+        statistics = {
+            'sum': self.sums,
+            'mean': self.sums / self.count,
+            'min': self.minimums,
+            'max': self.maximums,
+            'energy': self.sums * self.timestep,
+        }
+        # Interleave the statistics field by field, matching the header
+        columns = np.stack([statistics[statistic] for statistic in self.statistics], axis=2).reshape(len(self.names), -1)
+        start = self.window_index * self.window
+        for name, row in zip(self.names, columns.tolist()):
+            self.writer.writerow([start, start + self.window, name] + row)
+
+        self.sums.fill(0)
+        self.minimums.fill(np.inf)
+        self.maximums.fill(-np.inf)
+        self.count = 0
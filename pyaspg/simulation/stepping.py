@@ -0,0 +1,120 @@
+import numpy as np
+from pyaspg.utils import log_me
+
+
+@log_me
+class StepSnapshot:
+    """
+    Class representing the state of a grid between two steps of GridSimulator.iter_steps.
+
+    The snapshot is a handle on the live components, not a copy: the same instance is yielded at every
+    step with its step and time updated. Inputs set on it are applied once, during the next step, after
+    the supply layers (generator to distributor) and before the prosumer layers.
+
+    Attributes:
+        step (int): The number of the step that just ran.
+        time (float): The simulation time of the step that just ran.
+        components (dict): The live component lists per component type.
+        topology (GridTopology): The topology of the grid.
+        overrides (list): The ``(component, attribute, value)`` inputs applied during the next step.
+        supply (SupplyPrecomputer): The precomputed supply chain, or None if it runs step by step.
+    """
+
+    def __init__(self, creator, supply=None):
+        """
+        Initialize a StepSnapshot instance.
+
+        Args:
+            creator (PyASPGCreator): The grid being simulated.
+            supply (SupplyPrecomputer): The precomputed supply chain, or None if it runs step by step.
+        """
+        self.step = -1
+        self.time = None
+        self.components = creator.components
+        self.topology = creator.topology
+        self.overrides = []
+        self.supply = supply
+        self.copied_params = set()
+
+        # Generators read their resources from their first connection
+        self.generator_params = {}
+        for generator, _, params in creator.connections['generator_to_transmitter']:
+            self.generator_params.setdefault(generator, params)
+
+    def set(self, component, attribute, value):
+        """
+        Set an attribute of a component during the next step, e.g. the ``available_power`` of a distributor.
+
+        Args:
+            component: A component of the grid.
+            attribute (str): The attribute to set.
+            value: The value.
+        """
+        self.overrides.append((component, attribute, value))
+
+    def set_param(self, generator, key, value):
+        """
+        Set the resource of a generator (e.g. ``wind_speed``) for the next step in its parameter series.
+
+        The series is copied on the first change, so the array passed to the connection is left untouched
+        and the connection refers to the copy from then on. If the supply is precomputed, it is recomputed
+        from the next step.
+
+        Args:
+            generator (Generator): A generator of the grid.
+            key (str): The parameter key.
+            value (float): The value for the next step.
+
+        Raises:
+            ValueError: If the series has no value for the next step, e.g. after the last step of the horizon.
+        """
+        params = self.generator_params[generator]
+        next_step = self.step + 1
+        if next_step >= len(params[key]):
+            raise ValueError(f"The {key} series of {generator.name} has no value for step {next_step}")
+        if (generator, key) not in self.copied_params:
+            params[key] = np.array(params[key], dtype=float)
+            self.copied_params.add((generator, key))
+        params[key][next_step] = value
+
+        supply = self.supply
+        if supply is not None and supply.block_start is not None and supply.block_start <= next_step < supply.block_end:
+            supply.compute_block(next_step)
+
+    def broadcast(self, aggregator, command):
+        """
+        Issue a typed command from an aggregator to every prosumer it meters, active from the next step.
+
+        Args:
+            aggregator (NetAggregator): An aggregator of the grid.
+            command (Command): The command, e.g. a ReduceConsumption.
+
+        Returns:
+            int: The number of prosumers the command was sent to.
+        """
+        layer = self.topology.layers['smart_meter_to_aggregator']
+        meters = layer.parents(self.topology.id_of(aggregator))
+        prosumers = list(dict.fromkeys(layer.sources[meter_id].prosumer for meter_id in meters))
+        return aggregator.broadcast(command, prosumers, self.step + 1)
+
+    def values(self, component_type, field):
+        """
+        Collect the current value of a field over all components of a type.
+
+        Args:
+            component_type (str): The component type.
+            field (str): The attribute name.
+
+        Returns:
+            np.ndarray: One value per component, in component order.
+        """
+        component_list = self.components[component_type]
+        return np.fromiter((getattr(component, field) for component in component_list), dtype=float, count=len(component_list))
+
+    def apply_overrides(self):
+        """
+        Apply the inputs set since the previous step and forget them.
+        """
+        for component, attribute, value in self.overrides:
+            setattr(component, attribute, value)
+        self.overrides.clear()
@@ -0,0 +1,193 @@
+import numpy as np
+from pyaspg.generation import WindTurbine, SolarPanel, PowerPlant
+from pyaspg.utils import log_me
+
+
+def generate_series(generator, params, steps):
+    """
+    Compute the output of a generator over a range of timesteps at once.
+
+    Args:
+        generator (Generator): The generator.
+        params (dict): The parameters of its first generator_to_transmitter connection.
+        steps (np.ndarray): The timesteps.
+
+    Returns:
+        tuple: The output in watts (W) at every step, and the fuel left after every step (None unless the generator is a PowerPlant).
+    """
+    n = len(steps)
+    if isinstance(generator, PowerPlant):
+        fuel = np.maximum(generator.fuel_capacity - np.arange(n) * generator.consumption_rate, 0)
+        nominal = np.where(fuel > 0, generator.nominal_capacity, 0.0)
+        fuel_after = np.maximum(fuel - generator.consumption_rate, 0)
+    elif isinstance(generator, (WindTurbine, SolarPanel)):
+        resource = 'wind_speed' if isinstance(generator, WindTurbine) else 'sunlight'
+        factors = np.asarray(params.get(resource, []), dtype=float)[steps]
+        if np.any((factors < 0) | (factors > 1)):
+            label = "Wind speed" if resource == 'wind_speed' else "Sunlight"
+            raise ValueError(f"{label} must be a value between 0 and 1")
+        nominal = generator.nominal_capacity * factors
+        fuel_after = None
+    else:
+        raise ValueError(f"Cannot precompute the output of {generator.name} ({type(generator).__name__})")
+
+    output = np.minimum(nominal + generator.std_dev * nominal * np.random.standard_normal(n), nominal)
+    return output, fuel_after
+
+
+def transmitter_losses(transmitters):
+    """
+    Compute the loss factor of every transmitter, as in Transmitter.transmit.
+
+    Args:
+        transmitters (list): The transmitters.
+
+    Returns:
+        np.ndarray: The loss factors.
+    """
+    return np.array([min((1 - t.efficiency) * t.distance / 100, 1) for t in transmitters])
+
+
+def distributor_losses(distributors):
+    """
+    Compute the loss factor of every distributor, as in Distributor.distribute.
+
+    Args:
+        distributors (list): The distributors.
+
+    Returns:
+        np.ndarray: The loss factors.
+    """
+    return np.array([min((1 - d.efficiency) * d.distance / 10, 1) for d in distributors])
+
+
+@log_me
+class SupplyPrecomputer:
+    """
+    Class precomputing the generator -> transmitter -> substation -> distributor chain over the time axis.
+
+    The chain has no feedback from prosumers, so the supply of every distributor can be computed for a
+    block of timesteps at once with NumPy and then fed to the components step by step. Each generator
+    produces once per timestep, using the parameters of its first generator_to_transmitter connection.
+
+    Attributes:
+        creator (PyASPGCreator): The grid whose supply chain is precomputed.
+        n_steps (int): The number of timesteps in the simulation horizon.
+        block_size (int): The number of timesteps computed per block.
+        block_start (int): The first timestep of the current block.
+        block_end (int): The timestep after the last one of the current block.
+        block (dict): The precomputed arrays of the current block, shaped (components, block_size).
+    """
+
+    def __init__(self, creator, n_steps, block_size=None):
+        """
+        Initialize a SupplyPrecomputer instance.
+
+        Args:
+            creator (PyASPGCreator): The grid whose supply chain is precomputed.
+            n_steps (int): The number of timesteps in the simulation horizon.
+            block_size (int): The number of timesteps computed per block. Default is the whole horizon.
+        """
+        if block_size is not None and block_size < 1:
+            raise ValueError("Block size must be at least 1")
+
+        self.creator = creator
+        self.n_steps = n_steps
+        self.block_size = block_size or max(n_steps, 1)
+        self.block_start = None
+        self.block_end = None
+        self.block = {}
+
+        components = creator.components
+        layers = creator.topology.layers
+        self.generators = components['generators']
+        self.transmitters = components['transmitters']
+        self.substations = components['substations']
+        self.distributors = components['distributors']
+
+        # The first connection of each generator provides its resource series
+        self.generator_params = [None] * len(self.generators)
+        for (_, _, params), source_id in zip(creator.connections['generator_to_transmitter'], layers['generator_to_transmitter'].edge_sources):
+            if self.generator_params[source_id] is None:
+                self.generator_params[source_id] = params
+
+        self.transmitter_layer = layers['generator_to_transmitter']
+        self.substation_layer = layers['transmitter_to_substation']
+        self.distributor_layer = layers['substation_to_distributor']
+
+        self.transmitter_loss = transmitter_losses(self.transmitters)
+        self.substation_efficiency = np.array([s.efficiency for s in self.substations], dtype=float)
+        self.substation_voltage = np.array([s.output_voltage for s in self.substations], dtype=float)
+        self.distributor_loss = distributor_losses(self.distributors)
+
+    def compute_block(self, start):
+        """
+        Compute the supply chain for the block of timesteps starting at a given timestep.
+
+        Args:
+            start (int): The first timestep of the block.
+        """
+        steps = np.arange(start, max(min(start + self.block_size, self.n_steps), start + 1))
+        n = len(steps)
+
+        generator_output = np.zeros((len(self.generators), n))
+        fuel = {}
+        for i, generator in enumerate(self.generators):
+            generator_output[i], fuel_after = generate_series(generator, self.generator_params[i] or {}, steps)
+            if fuel_after is not None:
+                fuel[i] = fuel_after
+
+        # Every node's input bus is the sum of its sources' outputs
+        transmitter_input = self.transmitter_layer.rollup(generator_output)
+        transmitter_output = np.maximum(transmitter_input * (1 - self.transmitter_loss)[:, None], 0)
+
+        substation_input = self.substation_layer.rollup(transmitter_output)
+        substation_output = substation_input * self.substation_efficiency[:, None]
+        voltage = self.substation_voltage[:, None]
+        substation_current = np.divide(substation_output, voltage, out=np.zeros_like(substation_output), where=voltage > 0)
+
+        distributor_input = self.distributor_layer.rollup(substation_output)
+        distributor_output = np.maximum(distributor_input * (1 - self.distributor_loss)[:, None], 0)
+
+        self.block_start = start
+        self.block_end = start + n
+        self.block = {
+            'generator_output': generator_output,
+            'fuel_capacity': fuel,
+            'transmitter_input': transmitter_input,
+            'transmitter_output': transmitter_output,
+            'substation_input': substation_input,
+            'substation_output': substation_output,
+            'substation_current': substation_current,
+            'distributor_input': distributor_input,
+            'distributor_output': distributor_output,
+        }
+
+    def apply(self, timestep):
+        """
+        Feed the precomputed supply of a timestep to the supply chain components.
+
+        Args:
+            timestep (int): The current timestep in the simulation.
+        """
+        if self.block_start is None or not self.block_start <= timestep < self.block_end:
+            self.compute_block(timestep)
+        k = timestep - self.block_start
+        block = self.block
+
+        for i, generator in enumerate(self.generators):
+            generator.output = block['generator_output'][i, k]
+            generator.calculate_current()
+        for i, fuel in block['fuel_capacity'].items():
+            self.generators[i].fuel_capacity = fuel[k]
+        for i, transmitter in enumerate(self.transmitters):
+            transmitter.input_power = block['transmitter_input'][i, k]
+            transmitter.output_power = block['transmitter_output'][i, k]
+        for i, substation in enumerate(self.substations):
+            substation.input_power = block['substation_input'][i, k]
+            substation.output_power = block['substation_output'][i, k]
+            substation.output_current = block['substation_current'][i, k]
+        for i, distributor in enumerate(self.distributors):
+            distributor.input_power = block['distributor_input'][i, k]
+            distributor.output_power = block['distributor_output'][i, k]
+            distributor.available_power = distributor.output_power
@@ -0,0 +1,279 @@
+import numpy as np
+from pyaspg.utils import log_me
+
+
+class LayerMatrix:
+    """
+    Class representing one connection layer of the grid as a sparse adjacency matrix.
+
+    The matrix has one row per source component and one column per target component. It is
+    stored in CSR form (``indptr``/``indices``) so the targets of a source are a slice lookup,
+    and in transposed CSR form (``t_indptr``/``t_indices``) so the sources of a target are too.
+
+    Attributes:
+        connection_type (str): The connection type of the layer (e.g. ``"distributor_to_prosumer"``).
+        shape (tuple): The number of source and target components.
+        edge_sources (np.ndarray): The source component ID of every edge, in connection order.
+        edge_targets (np.ndarray): The target component ID of every edge, in connection order.
+        sources (list): The source components, indexed by ID.
+        targets (list): The target components, indexed by ID.
+        edge_order (np.ndarray): The edge indices ordered by source.
+        indptr (np.ndarray): The CSR row pointer over sources.
+        indices (np.ndarray): The target component IDs ordered by source.
+        t_indptr (np.ndarray): The CSR row pointer over targets.
+        t_indices (np.ndarray): The source component IDs ordered by target.
+        connected_sources (np.ndarray): The IDs of the sources with at least one edge.
+        connected_targets (np.ndarray): The IDs of the targets with at least one edge.
+    """
+
+    def __init__(self, connection_type, edge_sources, edge_targets, shape, sources=None, targets=None):
+        """
+        Initialize a LayerMatrix instance.
+
+        Args:
+            connection_type (str): The connection type of the layer.
+            edge_sources (array-like): The source component ID of every edge.
+            edge_targets (array-like): The target component ID of every edge.
+            shape (tuple): The number of source and target components.
+            sources (list): The source components, indexed by ID.
+            targets (list): The target components, indexed by ID.
+        """
+        self.connection_type = connection_type
+        self.shape = shape
+        self.sources = sources
+        self.targets = targets
+        self.edge_sources = np.asarray(edge_sources, dtype=np.intp)
+        self.edge_targets = np.asarray(edge_targets, dtype=np.intp)
+
+        # Stable sorts keep the connection order of edges sharing a source (or a target)
+        by_source = np.argsort(self.edge_sources, kind="stable")
+        self.edge_order = by_source
+        self.indices = self.edge_targets[by_source]
+        self.indptr = self._row_pointer(self.edge_sources, shape[0])
+
+        by_target = np.argsort(self.edge_targets, kind="stable")
+        self.t_indices = self.edge_sources[by_target]
+        self.t_indptr = self._row_pointer(self.edge_targets, shape[1])
+
+        self.connected_sources = np.flatnonzero(np.diff(self.indptr))
+        self.connected_targets = np.flatnonzero(np.diff(self.t_indptr))
+
+    def _row_pointer(self, rows, n_rows):
+        indptr = np.zeros(n_rows + 1, dtype=np.intp)
+        np.cumsum(np.bincount(rows, minlength=n_rows), out=indptr[1:])
+        return indptr
+
+    @property
+    def n_edges(self):
+        """
+        Get the number of edges in the layer.
+
+        Returns:
+            int: The number of edges.
+        """
+        return len(self.edge_sources)
+
+    def children(self, source_id):
+        """
+        Get the targets connected to a source.
+
+        Args:
+            source_id (int): The source component ID.
+
+        Returns:
+            np.ndarray: The target component IDs, in connection order.
+        """
+        return self.indices[self.indptr[source_id]:self.indptr[source_id + 1]]
+
+    def parents(self, target_id):
+        """
+        Get the sources connected to a target.
+
+        Args:
+            target_id (int): The target component ID.
+
+        Returns:
+            np.ndarray: The source component IDs, in connection order.
+        """
+        return self.t_indices[self.t_indptr[target_id]:self.t_indptr[target_id + 1]]
+
+    def rollup(self, values):
+        """
+        Sum a per-source quantity into its targets (the product of the transposed matrix and a vector).
+
+        Args:
+            values (array-like): One value per source component, or one row per source component.
+
+        Returns:
+            np.ndarray: One summed value (or row) per target component.
+        """
+        values = np.asarray(values, dtype=float)
+        return self.segment_sum(values[self.edge_sources])
+
+    def gather(self, values):
+        """
+        Sum a per-target quantity into its sources (the product of the matrix and a vector), e.g. the power
+        received by the prosumers of each distributor.
+
+        Args:
+            values (array-like): One value per target component.
+
+        Returns:
+            np.ndarray: One summed value per source component.
+        """
+        values = np.asarray(values, dtype=float)
+        return np.bincount(self.edge_sources, weights=values[self.edge_targets], minlength=self.shape[0])
+
+    def segment_sum(self, edge_values):
+        """
+        Sum a per-edge quantity into the targets of the edges.
+
+        Args:
+            edge_values (array-like): One value (or row) per edge, in connection order.
+
+        Returns:
+            np.ndarray: One summed value (or row) per target component.
+        """
+        edge_values = np.asarray(edge_values, dtype=float)
+        if edge_values.ndim == 1:
+            return np.bincount(self.edge_targets, weights=edge_values, minlength=self.shape[1])
+        totals = np.zeros((self.shape[1],) + edge_values.shape[1:])
+        np.add.at(totals, self.edge_targets, edge_values)
+        return totals
+
+    def reach(self, source_mask):
+        """
+        Get the targets connected to any of the selected sources.
+
+        Args:
+            source_mask (np.ndarray): A boolean mask over source components.
+
+        Returns:
+            np.ndarray: A boolean mask over target components.
+        """
+        mask = np.zeros(self.shape[1], dtype=bool)
+        mask[self.edge_targets[source_mask[self.edge_sources]]] = True
+        return mask
+
+    def to_scipy(self):
+        """
+        Export the layer as a ``scipy.sparse.csr_matrix`` with unit weights.
+
+        Returns:
+            scipy.sparse.csr_matrix: The source-by-target adjacency matrix.
+        """
+        from scipy.sparse import csr_matrix
+
+        data = np.ones(len(self.indices), dtype=float)
+        return csr_matrix((data, self.indices, self.indptr), shape=self.shape)
+
+
+@log_me
+class GridTopology:
+    """
+    Class representing the topology of a smart grid with integer component IDs and one sparse matrix per layer.
+
+    A component's ID is its position in the creator's component list for its type.
+
+    Attributes:
+        components (dict): The component lists per component type.
+        ids (dict): A mapping from each component to its component type and ID.
+        layers (dict): The LayerMatrix of every connection type.
+        connection_rules (dict): The source and target component types of every connection type.
+    """
+
+    def __init__(self, components, connections, connection_rules):
+        """
+        Initialize a GridTopology instance.
+
+        Args:
+            components (dict): The component lists per component type.
+            connections (dict): The ``(source, target, params)`` lists per connection type.
+            connection_rules (dict): The source and target component types of every connection type.
+        """
+        self.components = components
+        self.connection_rules = connection_rules
+        self.ids = {}
+        for component_type, component_list in components.items():
+            for i, component in enumerate(component_list):
+                self.ids[component] = (component_type, i)
+
+        self.layers = {}
+        for connection_type, connection_list in connections.items():
+            source_type, target_type = connection_rules[connection_type]
+            sources = [self.ids[source][1] for source, _, _ in connection_list]
+            targets = [self.ids[target][1] for _, target, _ in connection_list]
+            shape = (len(components[source_type]), len(components[target_type]))
+            self.layers[connection_type] = LayerMatrix(connection_type, sources, targets, shape,
+                                                       components[source_type], components[target_type])
+
+    def id_of(self, component):
+        """
+        Get the ID of a component.
+
+        Args:
+            component: A component of the grid.
+
+        Returns:
+            int: The component ID within its component type.
+        """
+        return self.ids[component][1]
+
+    def mask(self, component_type, components=()):
+        """
+        Build a boolean mask over a component type.
+
+        Args:
+            component_type (str): The component type.
+            components (iterable): The components to select.
+
+        Returns:
+            np.ndarray: True for every selected component.
+        """
+        mask = np.zeros(len(self.components[component_type]), dtype=bool)
+        for component in components:
+            mask[self.id_of(component)] = True
+        return mask
+
+    def descendant_masks(self, component_type, mask):
+        """
+        Propagate a selection downstream through every layer.
+
+        Args:
+            component_type (str): The component type of the selection.
+            mask (np.ndarray): A boolean mask over the component type.
+
+        Returns:
+            dict: A boolean mask per component type reachable from the selection (including the selection itself).
+        """
+        masks = {component_type: mask}
+        # Connection rules are declared in upstream-to-downstream order, so one pass is enough
+        for connection_type, (source_type, target_type) in self.connection_rules.items():
+            if source_type in masks and connection_type in self.layers:
+                reached = self.layers[connection_type].reach(masks[source_type])
+                masks[target_type] = masks[target_type] | reached if target_type in masks else reached
+        return masks
+
+    def descendants(self, component, component_type):
+        """
+        Get all components of a type downstream of a component (e.g. all prosumers under a substation).
+
+        Args:
+            component: The upstream component.
+            component_type (str): The component type to collect.
+
+        Returns:
+            list: The downstream components, in ID order.
+        """
+        source_type, source_id = self.ids[component]
+        mask = np.zeros(len(self.components[source_type]), dtype=bool)
+        mask[source_id] = True
+        reached = self.descendant_masks(source_type, mask).get(component_type)
+        if reached is None or component_type == source_type:
+            return []
+        return [self.components[component_type][i] for i in np.flatnonzero(reached)]
+
+    def __str__(self):
+        """Return a string representation of the grid topology."""
+        layers = ", ".join(f"{name}: {layer.n_edges}" for name, layer in self.layers.items() if layer.n_edges)
+        return f"GridTopology ({len(self.ids)} components, Edges: {{{layers}}})"
@@ -1,2 +1,5 @@
 from .log_me import log_me
-from .consumption_pattern_parser import ConsumptionPatternParser
\ No newline at end of file
+from .consumption_pattern_parser import ConsumptionPatternParser
+from .consumption_stream_parser import ConsumptionStreamParser, ConsumptionStreamView, consumption_files, create_consumption_parser
+from .synthetic_load import SyntheticLoadGenerator, SyntheticLoadParser, LOAD_ARCHETYPES
+from .shared_inputs import SharedInputs, SharedArray
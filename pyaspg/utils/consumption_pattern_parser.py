@@ -1,6 +1,23 @@
 import pandas as pd
 import os
 
+
+def consumption_totals(frame):
+    """
+    Compute the total consumption of every row of household power data.
+
+    Args:
+        frame (pd.DataFrame): Rows with the Global_active_power (kW) and Sub_metering_1 to 3 (Wh) columns.
+
+    Returns:
+        pd.Series: The total consumption of every row.
+    """
+    return (frame['Global_active_power'] * 1000 +
+            frame['Sub_metering_1'] +
+            frame['Sub_metering_2'] +
+            frame['Sub_metering_3'])
+
+
 class ConsumptionPatternParser:
     """
     Class to parse and provide consumption data from a CSV file with an optional bias.
@@ -17,9 +34,12 @@ class ConsumptionPatternParser:
         if not os.path.exists(file_path):
             raise FileNotFoundError(f"The file {file_path} does not exist.")
         
+        self.file_path = file_path
         self.consumption_data = pd.read_csv(file_path)
         self.bias = bias
         self.timestep = 0
+        # Computed once, so each step is an array lookup instead of a row extraction
+        self._totals = consumption_totals(self.consumption_data).to_numpy()
 
     def __iter__(self):
         """
@@ -34,14 +54,18 @@ class ConsumptionPatternParser:
         Returns:
             float: The total consumption for the current timestep plus the bias.
         """
-        if self.timestep >= len(self.consumption_data):
+        if self.timestep >= len(self._totals):
             self.timestep = 0  # Reset to the beginning of the data
 
-        row = self.consumption_data.iloc[self.timestep]
-        total_consumption = (row['Global_active_power'] * 1000 +
-                             row['Sub_metering_1'] +
-                             row['Sub_metering_2'] +
-                             row['Sub_metering_3'] +
-                             self.bias)
+        total_consumption = self._totals[self.timestep] + self.bias
         self.timestep += 1
         return total_consumption
+
+    def __getstate__(self):
+        """
+        Get the state to pickle. Once the totals are in shared memory (see SharedInputs), the raw data is left out.
+        """
+        state = self.__dict__.copy()
+        if getattr(self._totals, 'shm', None) is not None:
+            state['consumption_data'] = None
+        return state
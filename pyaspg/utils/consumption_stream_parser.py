@@ -0,0 +1,287 @@
+import os
+import glob
+import queue
+import threading
+import weakref
+import numpy as np
+import pandas as pd
+from pyaspg.utils.consumption_pattern_parser import ConsumptionPatternParser, consumption_totals
+
+
+def consumption_files(source):
+    """
+    List the consumption files of a directory, a glob pattern or a list of paths, in date order.
+
+    Dated file names such as ``2006-12-16.csv`` sort chronologically, so the files are sorted by name.
+
+    Args:
+        source (str or list): A directory, a glob pattern such as ``"data/2007-*.csv"``, or a list of paths.
+
+    Returns:
+        list: The paths of the files.
+    """
+    if isinstance(source, (list, tuple)):
+        paths = list(source)
+    elif os.path.isdir(source):
+        paths = glob.glob(os.path.join(source, "*.csv"))
+    else:
+        paths = glob.glob(source)
+    return sorted(paths, key=os.path.basename)
+
+
+# The stream of each set of files, shared by the views of the prosumers reading it, with the number of live views
+_streams = {}
+
+
+def create_consumption_parser(source, bias=0):
+    """
+    Create the parser for the consumption source of a prosumer.
+
+    Prosumers reading the same dated files share one ConsumptionStreamParser, and so one prefetch thread,
+    through a view each. The stream is closed when the last of its views is garbage collected.
+
+    Args:
+        source (str or list): A CSV file, or a directory, glob pattern or list of dated CSV files.
+        bias (float): The bias to be added to each total meter reading.
+
+    Returns:
+        ConsumptionPatternParser or ConsumptionStreamView: The parser.
+    """
+    if isinstance(source, str) and not os.path.isdir(source) and not glob.has_magic(source):
+        return ConsumptionPatternParser(source, bias)
+
+    files = tuple(consumption_files(source))
+    if files not in _streams:
+        _streams[files] = [ConsumptionStreamParser(list(files) or source), 0]
+    _streams[files][1] += 1
+    view = _streams[files][0].view(bias)
+    weakref.finalize(view, _release_stream, files)
+    return view
+
+
+def _release_stream(files):
+    entry = _streams[files]
+    entry[1] -= 1
+    if entry[1] == 0:
+        del _streams[files]
+        entry[0].close()
+
+
+class ConsumptionStreamParser:
+    """
+    Class to stream consumption data from dated CSV files in date order, with an optional bias.
+
+    The files are read in chunks of rows, so memory stays bounded whatever the length of the dataset. With
+    ``prefetch`` above 0 a background thread reads up to that many chunks ahead while the simulation consumes
+    the current one. Missing readings (``?`` in the household power dataset) count as 0. After the last file
+    the stream starts again from the first one, unless ``loop`` is False.
+
+    The current and the previous chunk are kept, so several views (see ``view``) can read the stream one
+    step apart. Reading a step before the chunks kept restarts the stream from the first file.
+
+    Attributes:
+        files (list): The paths of the files, in date order.
+        bias (float): The bias added to each total meter reading.
+        chunk_size (int): The number of rows read at once.
+        prefetch (int): The number of chunks read ahead by the background thread, 0 to read in the caller's thread.
+        loop (bool): Start again from the first file after the last one.
+        timestep (int): The number of values returned so far.
+    """
+
+    columns = ['Global_active_power', 'Sub_metering_1', 'Sub_metering_2', 'Sub_metering_3']
+
+    def __init__(self, source, bias=0, chunk_size=1440, prefetch=2, loop=True):
+        """
+        Initialize the ConsumptionStreamParser instance.
+
+        Args:
+            source (str or list): A directory, a glob pattern or a list of dated CSV files.
+            bias (float): The bias to be added to each total meter reading. Default is 0.
+            chunk_size (int): The number of rows read at once. Default is one day of minutes.
+            prefetch (int): The number of chunks read ahead by a background thread, 0 to disable the thread.
+            loop (bool): Start again from the first file after the last one.
+        """
+        self.files = consumption_files(source)
+        if not self.files:
+            raise FileNotFoundError(f"No consumption files match {source}.")
+        if chunk_size < 1:
+            raise ValueError("Chunk size must be at least 1")
+
+        self.bias = bias
+        self.chunk_size = chunk_size
+        self.prefetch = prefetch
+        self.loop = loop
+        self.timestep = 0
+        self._reset()
+
+    def _reset(self):
+        self._kept = []
+        self._end = 0
+        self._reader = None
+        self._queue = None
+        self._thread = None
+        self._stop = None
+
+    def _chunks(self):
+        while True:
+            empty = True
+            for path in self.files:
+                for frame in pd.read_csv(path, usecols=self.columns, chunksize=self.chunk_size, na_values=['?']):
+                    totals = consumption_totals(frame.fillna(0)).to_numpy(dtype=float)
+                    if len(totals):
+                        empty = False
+                        yield totals
+            if not self.loop or empty:
+                return
+
+    def _prefetch(self):
+        try:
+            for chunk in self._chunks():
+                if not self._put(chunk):
+                    return
+            self._put(None)
+        except Exception as error:  # Raised in the caller's thread by _next_chunk
+            self._put(error)
+
+    def _put(self, item):
+        while not self._stop.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _next_chunk(self):
+        if self.prefetch < 1:
+            if self._reader is None:
+                self._reader = self._chunks()
+            return next(self._reader)
+
+        if self._thread is None:
+            self._queue = queue.Queue(maxsize=self.prefetch)
+            self._stop = threading.Event()
+            self._thread = threading.Thread(target=self._prefetch, name="consumption-prefetch", daemon=True)
+            self._thread.start()
+        item = self._queue.get()
+        if item is None:
+            self._queue.put(None)  # Later calls also end the stream
+            raise StopIteration
+        if isinstance(item, Exception):
+            raise item
+        return item
+
+    def __iter__(self):
+        """
+        Make the class an iterator.
+        """
+        return self
+
+    def __next__(self):
+        """
+        Return the next consumption value, reading the next chunk when the current one is used up.
+
+        Returns:
+            float: The total consumption for the current timestep plus the bias.
+        """
+        total_consumption = self.value(self.timestep) + self.bias
+        self.timestep += 1
+        return total_consumption
+
+    def value(self, step):
+        """
+        Get the total consumption at a step, without the bias, reading chunks as needed.
+
+        Args:
+            step (int): The step, counted from the first row of the first file.
+
+        Returns:
+            float: The total consumption.
+        """
+        if self._kept and step < self._kept[0][0]:
+            self.close()
+        while step >= self._end:
+            chunk = self._next_chunk()
+            self._kept = self._kept[-1:] + [(self._end, chunk)]
+            self._end += len(chunk)
+        for start, chunk in self._kept:
+            if step < start + len(chunk):
+                return chunk[step - start]
+
+    def view(self, bias=0):
+        """
+        Get a view reading the stream at its own position, for one prosumer.
+
+        Args:
+            bias (float): The bias added to each consumption value of the view.
+
+        Returns:
+            ConsumptionStreamView: The view to pass to Prosumer as ``consumption_parser``.
+        """
+        return ConsumptionStreamView(self, bias)
+
+    def close(self):
+        """
+        Stop the background thread and drop the chunks read. Reading on starts again from the first file.
+        """
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+        self._reset()
+
+    def __getstate__(self):
+        """
+        Get the state to pickle, without the thread and the chunks read. An unpickled parser starts from the first file.
+        """
+        state = self.__dict__.copy()
+        for attr in ('_kept', '_end', '_reader', '_queue', '_thread', '_stop'):
+            state.pop(attr)
+        state['timestep'] = 0
+        return state
+
+    def __setstate__(self, state):
+        """
+        Restore a pickled parser.
+        """
+        self.__dict__.update(state)
+        self._reset()
+
+
+class ConsumptionStreamView:
+    """
+    Class providing the consumption of one prosumer from a shared ConsumptionStreamParser, step by step.
+
+    Attributes:
+        stream (ConsumptionStreamParser): The shared stream.
+        bias (float): The bias added to each consumption value.
+        timestep (int): The number of values returned so far.
+    """
+
+    def __init__(self, stream, bias=0):
+        """
+        Initialize a ConsumptionStreamView instance.
+
+        Args:
+            stream (ConsumptionStreamParser): The shared stream.
+            bias (float): The bias added to each consumption value.
+        """
+        self.stream = stream
+        self.bias = bias
+        self.timestep = 0
+
+    def __iter__(self):
+        """
+        Make the class an iterator.
+        """
+        return self
+
+    def __next__(self):
+        """
+        Return the next consumption value.
+
+        Returns:
+            float: The total consumption for the current timestep plus the bias.
+        """
+        total_consumption = self.stream.value(self.timestep) + self.bias
+        self.timestep += 1
+        return total_consumption
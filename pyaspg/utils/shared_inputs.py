@@ -0,0 +1,141 @@
+from multiprocessing import shared_memory
+import numpy as np
+
+
+class SharedArray(np.ndarray):
+    """
+    Class representing a read-only NumPy array stored in a shared memory block.
+
+    Pickling the array sends the name of its block instead of its data, and unpickling attaches the block,
+    so worker processes read the same memory without a copy. Views and results of operations are ordinary
+    data and pickle by value.
+
+    Attributes:
+        shm (SharedMemory): The block holding the data, or None for views and results of operations.
+    """
+
+    def __array_finalize__(self, obj):
+        self.shm = None
+
+    def __reduce__(self):
+        if self.shm is None:
+            return np.array, (np.asarray(self),)
+        return attach_shared_array, (self.shm.name, self.shape, self.dtype.str)
+
+
+def attach_shared_array(name, shape, dtype):
+    """
+    Attach an array stored in a shared memory block by another process.
+
+    Args:
+        name (str): The name of the block.
+        shape (tuple): The shape of the array.
+        dtype (str): The data type of the array.
+
+    Returns:
+        SharedArray: The read-only array.
+    """
+    shm = shared_memory.SharedMemory(name=name)
+    array = np.ndarray(shape, dtype=dtype, buffer=shm.buf).view(SharedArray)
+    array.shm = shm
+    array.flags.writeable = False
+    return array
+
+
+class SharedInputs:
+    """
+    Class placing the large read-only inputs of grids in shared memory, for simulations run in several processes.
+
+    ``share_grid`` moves the generator resource series and the consumption totals of the prosumers into
+    shared memory blocks, so a pickled PyASPGCreator carries only the names of the blocks and every worker
+    attaches the same memory. Identical inputs (the same array, or the same consumption file) share one block.
+    The blocks live until ``close`` is called, which the ``with`` statement does on exit; workers must have
+    finished by then.
+
+    Attributes:
+        min_bytes (int): The size below which arrays are left as they are.
+        blocks (list): The shared memory blocks created.
+    """
+
+    def __init__(self, min_bytes=4096):
+        """
+        Initialize a SharedInputs instance.
+
+        Args:
+            min_bytes (int): The size in bytes below which arrays are not worth sharing.
+        """
+        self.min_bytes = min_bytes
+        self.blocks = []
+        self._shared = {}
+
+    def share(self, array):
+        """
+        Copy an array into a new shared memory block.
+
+        Args:
+            array (array-like): The array.
+
+        Returns:
+            SharedArray: The read-only shared copy.
+        """
+        array = np.ascontiguousarray(array)
+        shm = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+        self.blocks.append(shm)
+        shared = np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf).view(SharedArray)
+        shared[...] = array
+        shared.shm = shm
+        shared.flags.writeable = False
+        return shared
+
+    def _share_once(self, key, array):
+        if array.nbytes < self.min_bytes:
+            return array
+        # The original is kept with its copy, so its id cannot be reused by another array
+        if key not in self._shared:
+            self._shared[key] = (array, self.share(array))
+        return self._shared[key][1]
+
+    def share_grid(self, creator):
+        """
+        Move the large inputs of a grid into shared memory, in place.
+
+        Array values of the connection parameters (e.g. ``wind_speed`` or ``sunlight`` series) and the
+        consumption totals of ConsumptionPatternParser instances are replaced by shared copies. The parsers
+        then leave their raw DataFrame out when they are pickled.
+
+        Args:
+            creator (PyASPGCreator): The grid.
+
+        Returns:
+            int: The number of bytes of inputs replaced by shared copies.
+        """
+        shared_bytes = 0
+        for connection_list in creator.connections.values():
+            for _, _, params in connection_list:
+                for key, value in (params or {}).items():
+                    if isinstance(value, np.ndarray) and not isinstance(value, SharedArray):
+                        params[key] = self._share_once(('array', id(value)), value)
+                        shared_bytes += value.nbytes if isinstance(params[key], SharedArray) else 0
+
+        for prosumer in creator.components['prosumers']:
+            parser = prosumer.consumption_pattern_parser
+            totals = getattr(parser, '_totals', None)
+            if isinstance(totals, np.ndarray) and not isinstance(totals, SharedArray):
+                parser._totals = self._share_once(('consumption', getattr(parser, 'file_path', id(totals))), totals)
+                shared_bytes += totals.nbytes if isinstance(parser._totals, SharedArray) else 0
+        return shared_bytes
+
+    def close(self):
+        """
+        Release the shared memory blocks. Arrays still attached keep their memory until they are deleted.
+        """
+        for shm in self.blocks:
+            shm.unlink()
+        self.blocks = []
+        self._shared = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
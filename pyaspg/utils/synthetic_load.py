@@ -0,0 +1,218 @@
+import numpy as np
+
+# Parametric daily load shapes per prosumer type. The shape of a day is the base load plus Gaussian peaks
+# (hour, width in hours, amplitude in W); weekends scale the peaks. The noise is an AR(1) process per
+# prosumer with the given standard deviation (relative to the load) and step-to-step correlation.
+LOAD_ARCHETYPES = {
+    'House': {
+        'base': 300, 'peaks': [(7.5, 1.5, 800), (19, 2.5, 1500)], 'weekend_factor': 1.2,
+        'scale_std': 0.3, 'shift_std': 0.75, 'noise_std': 0.25, 'noise_correlation': 0.95,
+    },
+    'Apartment': {
+        'base': 150, 'peaks': [(7, 1, 400), (20, 2, 800)], 'weekend_factor': 1.1,
+        'scale_std': 0.3, 'shift_std': 0.75, 'noise_std': 0.3, 'noise_correlation': 0.95,
+    },
+    'Office': {
+        'base': 500, 'peaks': [(13, 3, 4000)], 'weekend_factor': 0.2,
+        'scale_std': 0.4, 'shift_std': 0.5, 'noise_std': 0.1, 'noise_correlation': 0.98,
+    },
+}
+
+
+class SyntheticLoadGenerator:
+    """
+    Class generating synthetic consumption for a population of prosumers, as an alternative to consumption files.
+
+    Every prosumer gets a view from ``parser()`` that plugs into Prosumer in place of a ConsumptionPatternParser.
+    The consumption of the whole population is generated in blocks of ``block_size`` steps with one vectorized
+    call, lazily, when the first view reaches a step outside the blocks kept in memory. Each prosumer scales
+    and shifts the daily shape of its archetype, and its noise mixes a component shared by the population
+    (e.g. weather) with its own, both correlated in time.
+
+    Attributes:
+        step_minutes (float): The length of a step in minutes.
+        block_size (int): The number of steps generated at once.
+        start_weekday (int): The weekday of the first step, 0 for Monday.
+        common_noise (float): The share of the noise variance common to all prosumers (between 0 and 1).
+        archetypes (dict): The load archetypes per prosumer type.
+        prosumer_types (list): The prosumer type of every registered prosumer.
+    """
+
+    def __init__(self, step_minutes=1, block_size=1440, seed=None, start_weekday=0, common_noise=0.3, archetypes=None):
+        """
+        Initialize a SyntheticLoadGenerator instance.
+
+        Args:
+            step_minutes (float): The length of a step in minutes. Default is 1, like the consumption files.
+            block_size (int): The number of steps generated at once. Default is one day of minutes.
+            seed (int): The seed of the random generator.
+            start_weekday (int): The weekday of the first step, 0 for Monday.
+            common_noise (float): The share of the noise variance common to all prosumers.
+            archetypes (dict): Load archetypes added to or replacing the default ones, per prosumer type.
+        """
+        if block_size < 1:
+            raise ValueError("Block size must be at least 1")
+        if not 0 <= common_noise <= 1:
+            raise ValueError("The common noise share must be between 0 and 1")
+
+        self.step_minutes = step_minutes
+        self.block_size = block_size
+        self.start_weekday = start_weekday
+        self.common_noise = common_noise
+        self.archetypes = dict(LOAD_ARCHETYPES, **(archetypes or {}))
+        self.prosumer_types = []
+        self.rng = np.random.default_rng(seed)
+        self._scales = []
+        self._shifts = []
+        self._blocks = {}
+        self._next_block = 0
+        self._state = None
+
+    def parser(self, prosumer_type="House", bias=0):
+        """
+        Register a prosumer and get its consumption view.
+
+        Args:
+            prosumer_type (str): The prosumer type, which selects the load archetype.
+            bias (float): The bias to be added to each consumption value.
+
+        Returns:
+            SyntheticLoadParser: The view to pass to Prosumer as ``consumption_parser``.
+        """
+        if prosumer_type not in self.archetypes:
+            raise ValueError(f"No load archetype for prosumer type {prosumer_type}, expected one of {sorted(self.archetypes)}")
+        if self._state is not None:
+            raise ValueError("Prosumers must be registered before the first block is generated")
+
+        archetype = self.archetypes[prosumer_type]
+        self._scales.append(self.rng.lognormal(0, archetype['scale_std']))
+        self._shifts.append(self.rng.normal(0, archetype['shift_std']))
+        self.prosumer_types.append(prosumer_type)
+        return SyntheticLoadParser(self, len(self.prosumer_types) - 1, bias)
+
+    def shapes(self, start, n_steps):
+        """
+        Compute the deterministic daily and weekly load shape of every prosumer.
+
+        Args:
+            start (int): The first step.
+            n_steps (int): The number of steps.
+
+        Returns:
+            np.ndarray: The load in W, shaped (prosumers, steps).
+        """
+        minutes = (start + np.arange(n_steps)) * self.step_minutes
+        hours = (minutes / 60) % 24
+        weekend = ((minutes // 1440 + self.start_weekday) % 7) >= 5
+
+        types = np.array(self.prosumer_types)
+        shifts = np.array(self._shifts)
+        load = np.zeros((len(types), n_steps))
+        for prosumer_type in np.unique(types):
+            archetype = self.archetypes[prosumer_type]
+            rows = types == prosumer_type
+            local_hours = hours[None, :] - shifts[rows, None]
+            peaks = np.zeros_like(local_hours)
+            for hour, width, amplitude in archetype['peaks']:
+                # Distance on the 24-hour circle, so evening peaks spill over midnight
+                distance = (local_hours - hour + 12) % 24 - 12
+                peaks += amplitude * np.exp(-0.5 * (distance / width) ** 2)
+            peaks *= np.where(weekend, archetype['weekend_factor'], 1.0)
+            load[rows] = archetype['base'] + peaks
+        return load * np.array(self._scales)[:, None]
+
+    def compute_block(self, start):
+        """
+        Generate the consumption of every prosumer for the block of steps starting at a given step.
+
+        Blocks are generated in order, since the noise of a block continues from the previous one.
+
+        Args:
+            start (int): The first step of the block, a multiple of the block size.
+        """
+        n = len(self.prosumer_types)
+        if self._state is None:
+            self._state = (0.0, np.zeros(n))
+
+        types = np.array(self.prosumer_types)
+        noise_std = np.array([self.archetypes[t]['noise_std'] for t in types])
+        phi = np.array([self.archetypes[t]['noise_correlation'] for t in types])
+        innovation = np.sqrt(1 - phi ** 2)
+        common_phi = phi.mean() if n else 0.0
+
+        common, own = self._state
+        noise = np.empty((n, self.block_size))
+        common_draws = self.rng.standard_normal(self.block_size)
+        own_draws = self.rng.standard_normal((self.block_size, n))
+        for k in range(self.block_size):
+            common = common_phi * common + np.sqrt(1 - common_phi ** 2) * common_draws[k]
+            own = phi * own + innovation * own_draws[k]
+            noise[:, k] = np.sqrt(self.common_noise) * common + np.sqrt(1 - self.common_noise) * own
+        self._state = (common, own)
+
+        block = np.maximum(self.shapes(start, self.block_size) * (1 + noise_std[:, None] * noise), 0)
+        self._blocks[start] = block
+        # The current and the previous block are kept, for views that are one step behind the others
+        self._blocks.pop(start - 2 * self.block_size, None)
+        self._next_block = start + self.block_size
+
+    def value(self, prosumer_id, step):
+        """
+        Get the consumption of a prosumer at a step, generating blocks as needed.
+
+        Args:
+            prosumer_id (int): The position of the prosumer in the registration order.
+            step (int): The step.
+
+        Returns:
+            float: The consumption in W.
+        """
+        start = step - step % self.block_size
+        while start not in self._blocks:
+            if start < self._next_block:
+                raise ValueError(f"Step {step} is no longer in memory")
+            self.compute_block(self._next_block)
+        return self._blocks[start][prosumer_id, step - start]
+
+
+class SyntheticLoadParser:
+    """
+    Class providing the synthetic consumption of one prosumer, step by step, like a ConsumptionPatternParser.
+
+    Attributes:
+        generator (SyntheticLoadGenerator): The generator of the population.
+        prosumer_id (int): The position of the prosumer in the population.
+        bias (float): The bias added to each consumption value.
+        timestep (int): The number of values returned so far.
+    """
+
+    def __init__(self, generator, prosumer_id, bias=0):
+        """
+        Initialize a SyntheticLoadParser instance.
+
+        Args:
+            generator (SyntheticLoadGenerator): The generator of the population.
+            prosumer_id (int): The position of the prosumer in the population.
+            bias (float): The bias added to each consumption value.
+        """
+        self.generator = generator
+        self.prosumer_id = prosumer_id
+        self.bias = bias
+        self.timestep = 0
+
+    def __iter__(self):
+        """
+        Make the class an iterator.
+        """
+        return self
+
+    def __next__(self):
+        """
+        Return the next consumption value.
+
+        Returns:
+            float: The consumption for the current timestep plus the bias.
+        """
+        total_consumption = self.generator.value(self.prosumer_id, self.timestep) + self.bias
+        self.timestep += 1
+        return total_consumption
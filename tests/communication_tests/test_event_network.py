@@ -0,0 +1,79 @@
+import numpy as np
+import pytest
+import simpy
+from pyaspg.communication import EventCommunicationNetwork, SmartMeter
+from pyaspg.distribution import Transmitter, Distributor, Substation
+from pyaspg.generation import WindTurbine
+from pyaspg.management import NetAggregator
+from pyaspg.prosume import Prosumer
+from pyaspg.simulation import PyASPGCreator, GridSimulator
+
+def test_queue_bandwidth_and_latency():
+    """
+    Test that packets leave the queue at the bandwidth, arrive after the latency and are dropped when the queue is full.
+    """
+    env = simpy.Environment()
+    network = EventCommunicationNetwork("AMI", reliability=1, latency=2, bandwidth=2, queue_capacity=3)
+    network.attach(env)
+    arrivals = []
+    assert network.submit(list(range(5)), lambda packets: arrivals.extend((env.now, packet) for packet in packets)) == 3
+    assert network.packets_dropped == 2
+    assert network.backlog == 3
+    env.run(until=0.75)
+    # One packet left by t=0.75, so two are still queued and one more fits
+    assert network.submit(['late', 'dropped'], lambda packets: arrivals.extend((env.now, packet) for packet in packets)) == 1
+    env.run()
+
+    assert arrivals == [(2.5, 0), (3.0, 1), (3.5, 2), (4.0, 'late')]
+    assert network.packets_delivered == 4
+    assert network.mean_delay == pytest.approx((2.5 + 3.0 + 3.5 + 3.25) / 4)
+
+def test_losses_are_drawn_per_batch():
+    """
+    Test that the losses of a batch are seeded and accounted for, and that resolution groups the deliveries.
+    """
+    outcomes = []
+    for _ in range(2):
+        env = simpy.Environment()
+        network = EventCommunicationNetwork("AMI", reliability=0.5, latency=0.3, resolution=1, seed=7)
+        network.attach(env)
+        batches = []
+        network.submit(list(range(1000)), batches.append)
+        env.run()
+        outcomes.append([packet for batch in batches for packet in batch])
+
+        assert len(batches) == 1
+        assert network.packets_lost + network.packets_delivered == 1000
+        assert 400 < network.packets_delivered < 600
+        assert network.total_delay == pytest.approx(network.packets_delivered)
+    assert outcomes[0] == outcomes[1]
+
+def test_meter_readings_arrive_late(tmp_path):
+    """
+    Test that in a simulation the aggregator receives the readings measured when they were sent.
+    """
+    network = EventCommunicationNetwork("AMI", reliability=1, latency=2.5)
+    grid_creator = PyASPGCreator()
+    transmitter = Transmitter(name="HVL1")
+    substation = Substation(name="MS1", input_voltage=25000, output_voltage=10000)
+    distributor = Distributor(name="LVL1")
+    prosumers = [Prosumer(name=f"H{i}", production_pattern=(100, 0)) for i in range(2)]
+    meters = [SmartMeter(prosumer, network) for prosumer in prosumers]
+    aggregator = NetAggregator("AGG1")
+    grid_creator.define_connections(
+        generator_to_transmitter=[(WindTurbine("WT1", 20000, 25000, std_dev=0), transmitter, {'wind_speed': np.full(5, 0.5)})],
+        transmitter_to_substation=[(transmitter, substation)],
+        substation_to_distributor=[(substation, distributor)],
+        distributor_to_prosumer=[(distributor, prosumer) for prosumer in prosumers],
+        prosumer_to_smart_meter=list(zip(prosumers, meters)),
+        smart_meter_to_aggregator=[(meter, aggregator) for meter in meters],
+    )
+    simulator = GridSimulator(grid_creator)
+    with pytest.raises(ValueError):
+        simulator.run_simulation(duration=5, timestep=1, output_dir=None, mode='fixed')
+
+    simulator.run_simulation(duration=5, timestep=1, output_dir=None)
+    # Readings sent at steps 0 to 2 arrived by t=5, the last one measured after 3 steps of production
+    assert network.packets_delivered == 6
+    assert aggregator.data_collected[0]['timestep'] == 2
+    assert aggregator.data_collected[0]['total_production'] == pytest.approx(300)
@@ -1 +1,44 @@
-# TBA
\ No newline at end of file
+import numpy as np
+import pytest
+from pyaspg.simulation import PyASPGCreator
+from pyaspg.communication import SmartMeter
+from pyaspg.distribution import Transmitter, Distributor, Substation
+from pyaspg.generation import WindTurbine
+from pyaspg.management import NetAggregator, UtilityCompany
+from pyaspg.prosume import Prosumer
+
+@pytest.fixture
+def build_grid(tmp_path):
+    """
+    Build a metered grid: a wind turbine feeding one distributor, whose prosumers all read the same one-row load file.
+
+    The returned function takes the communication network of the meters and optionally:
+    ``prosumers`` (the number of prosumers), ``production_step`` (prosumer ``i`` produces ``production_step * i`` W),
+    ``wind_speed`` (the constant wind speed of the turbine), ``aggregators`` (the number of aggregators, all
+    reporting to one utility) and ``aggregator_edges`` (the ``(meter, aggregator)`` index pairs, in connection order).
+    """
+    with open(tmp_path / "load.csv", 'w') as load_file:
+        load_file.write("Global_active_power,Sub_metering_1,Sub_metering_2,Sub_metering_3\n1.0,0,0,0\n")
+
+    def build(network, prosumers=3, production_step=0, wind_speed=0.5, aggregators=0, aggregator_edges=()):
+        grid_creator = PyASPGCreator()
+        transmitter = Transmitter(name="HVL1")
+        substation = Substation(name="MS1", input_voltage=25000, output_voltage=10000)
+        distributor = Distributor(name="LVL1")
+        prosumer_list = [Prosumer(name=f"H{i}", consumption_file=str(tmp_path / "load.csv"), production_pattern=(production_step * i, 0))
+                         for i in range(prosumers)]
+        meters = [SmartMeter(prosumer, network) for prosumer in prosumer_list]
+        aggregator_list = [NetAggregator(f"AGG{j + 1}") for j in range(aggregators)]
+        utility = UtilityCompany("UC1")
+        grid_creator.define_connections(
+            generator_to_transmitter=[(WindTurbine("WT1", 20000, 25000, std_dev=0), transmitter, {'wind_speed': np.full(10, wind_speed)})],
+            transmitter_to_substation=[(transmitter, substation)],
+            substation_to_distributor=[(substation, distributor)],
+            distributor_to_prosumer=[(distributor, prosumer) for prosumer in prosumer_list],
+            prosumer_to_smart_meter=list(zip(prosumer_list, meters)),
+            smart_meter_to_aggregator=[(meters[i], aggregator_list[j]) for i, j in aggregator_edges],
+            aggregator_to_utility=[(aggregator, utility) for aggregator in aggregator_list],
+        )
+        return grid_creator
+
+    return build
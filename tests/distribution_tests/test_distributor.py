@@ -58,3 +58,19 @@ def test_distribute_large_distance():
     
     assert output_power >= 0  # Output power should never be negative
     assert output_power <= input_power  # Output power should not exceed input power
+
+
+def test_receive_accumulates_until_reset():
+    """
+    Test that the available power reflects every input received in the timestep.
+    """
+    distributor = Distributor(name="Low Voltage Line 1", efficiency=0.9, distance=10)
+
+    distributor.receive(1000)
+    distributor.receive(1000)
+    assert distributor.input_power == 2000
+    assert distributor.available_power == pytest.approx(2000 * 0.9)
+
+    distributor.reset()
+    assert distributor.input_power == 0
+    assert distributor.available_power == 0
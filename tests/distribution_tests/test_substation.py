@@ -47,4 +47,17 @@ def test_substation_transform():
     output_power = substation.transform()
     
     assert output_power == input_power * 0.98  # Check that the output power matches the expected value
-    assert substation.output_current == output_power / substation.output_voltage  # Check the calculated current
\ No newline at end of file
+    assert substation.output_current == output_power / substation.output_voltage  # Check the calculated current
+
+def test_receive_accumulates_until_reset():
+    """
+    Test that power from several transmitters is summed on the input bus until it is reset.
+    """
+    substation = Substation(name="Substation 1", input_voltage=25000, output_voltage=10000, efficiency=0.98)
+
+    substation.receive(1000)
+    substation.receive(2000)
+    assert substation.transform() == pytest.approx(3000 * 0.98)
+
+    substation.reset()
+    assert substation.input_power == 0
@@ -57,4 +57,17 @@ def test_transmit_large_distance():
     output_power = transmitter.transmit()
     
     assert output_power >= 0  # Output power should never be negative
-    assert output_power <= input_power  # Output power should not exceed input power
\ No newline at end of file
+    assert output_power <= input_power  # Output power should not exceed input power
+
+def test_receive_accumulates_until_reset():
+    """
+    Test that the input bus sums the power of several sources until it is reset.
+    """
+    transmitter = Transmitter(name="High Voltage Line 1", efficiency=0.97, distance=100)
+
+    transmitter.receive(1000)
+    transmitter.receive(500)
+    assert transmitter.input_power == 1500
+
+    transmitter.reset()
+    assert transmitter.input_power == 0
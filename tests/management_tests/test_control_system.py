@@ -53,4 +53,4 @@ def test_issue_commands(control_system, net_aggregator):
     commands = control_system.analyze_grid()
     control_system.issue_commands(net_aggregator, commands)
     
-    assert net_aggregator.commands["load_balancing"] == ["Reduce generation"]
+    assert list(net_aggregator.commands["load_balancing"]) == ["Reduce generation"]
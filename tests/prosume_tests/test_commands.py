@@ -0,0 +1,104 @@
+import pytest
+from pyaspg.prosume import Prosumer, CompactProsumer, Command, ReduceConsumption, ScaleConsumption, CapProduction
+from pyaspg.management import NetAggregator
+
+@pytest.fixture
+def prosumer(tmp_path):
+    with open(tmp_path / "load.csv", 'w') as load_file:
+        load_file.write("Global_active_power,Sub_metering_1,Sub_metering_2,Sub_metering_3\n1.0,0,0,0\n")
+    return Prosumer(name="H1", consumption_file=str(tmp_path / "load.csv"), production_pattern=(800, 0))
+
+def test_commands_adjust_until_they_expire(prosumer):
+    """
+    Test that typed commands adjust the generated consumption and production for their time to live only.
+    """
+    reduce, cap = ReduceConsumption(400, ttl=2), CapProduction(300, ttl=1)
+    reduce.issue(0)
+    cap.issue(0)
+    prosumer.receive_command(reduce)
+    prosumer.receive_command(cap)
+    prosumer.receive_command("Reduce consumption by 500 W")
+
+    generated = []
+    for timestep in range(3):
+        prosumer.expire_commands(timestep)
+        generated.append((prosumer.generate_consumption(), prosumer.generate_production()))
+
+    assert generated == [(600, 300), (600, 800), (1000, 800)]
+    assert list(prosumer.received_commands) == ["Reduce consumption by 500 W"]
+
+def test_commands_compose_in_arrival_order(prosumer):
+    """
+    Test that several active commands are applied one after the other.
+    """
+    prosumer.receive_command(ReduceConsumption(200))
+    prosumer.receive_command(ScaleConsumption(0.5))
+    assert prosumer.generate_consumption() == pytest.approx(400)
+
+def test_command_queue_is_bounded():
+    """
+    Test that a prosumer keeps only its latest commands.
+    """
+    prosumer = CompactProsumer(name="H1")
+    for i in range(CompactProsumer.command_capacity + 10):
+        prosumer.receive_command(f"Command {i}")
+
+    assert len(prosumer.received_commands) == CompactProsumer.command_capacity
+    assert prosumer.received_commands[0] == "Command 10"
+
+def test_full_queue_keeps_active_commands():
+    """
+    Test that a full queue makes room with expired commands first, then plain messages, before active typed commands.
+    """
+    prosumer = CompactProsumer(name="H1")
+    active = ReduceConsumption(100)
+    prosumer.receive_command(active)
+    prosumer.receive_command(ReduceConsumption(100, ttl=1), 0)
+    for i in range(CompactProsumer.command_capacity - 3):
+        prosumer.receive_command(f"Command {i}")
+    prosumer.receive_command(ScaleConsumption(0.5, ttl=10), 0)
+
+    prosumer.receive_command("Late command", 1)
+    assert prosumer.received_commands[0] is active
+    assert prosumer.received_commands[1] == "Command 0"
+
+    prosumer.receive_command("Later command", 1)
+    assert prosumer.received_commands[0] is active
+    assert prosumer.received_commands[1] == "Command 1"
+    assert len(prosumer.received_commands) == CompactProsumer.command_capacity
+
+def test_unissued_commands_are_issued_on_receipt(prosumer):
+    """
+    Test that a typed command sent without being issued is issued at the step it is received, so it still expires.
+    """
+    aggregator = NetAggregator("AGG1")
+    command = ReduceConsumption(400, ttl=1)
+    aggregator.send_command(prosumer, command, 3)
+    assert (command.issued, command.expires) == (3, 4)
+
+    prosumer.expire_commands(4)
+    assert list(prosumer.received_commands) == []
+    with pytest.raises(ValueError):
+        aggregator.send_command(prosumer, ReduceConsumption(400, ttl=1))
+
+def test_broadcast_shares_one_command():
+    """
+    Test that an aggregator issues a broadcast command once and queues the same instance at every prosumer.
+    """
+    aggregator = NetAggregator("AGG1")
+    prosumers = [CompactProsumer(name=f"H{i}") for i in range(3)]
+    command = ScaleConsumption(0.8, ttl=4)
+
+    assert aggregator.broadcast(command, prosumers, 5) == 3
+    assert (command.issued, command.expires) == (5, 9)
+    assert all(prosumer.received_commands[0] is command for prosumer in prosumers)
+    assert list(aggregator.commands['broadcast']) == [command]
+
+def test_invalid_commands():
+    """
+    Test that invalid command parameters are rejected.
+    """
+    with pytest.raises(ValueError):
+        Command(ttl=0)
+    with pytest.raises(ValueError):
+        ScaleConsumption(-1)
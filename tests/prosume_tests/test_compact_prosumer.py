@@ -0,0 +1,37 @@
+import pytest
+from pyaspg.prosume import Prosumer, CompactProsumer
+
+def test_compact_prosumer_has_no_dict():
+    """
+    Test that the compact prosumer stores its attributes in slots only.
+    """
+    prosumer = CompactProsumer(name="H1", storage_capacity=5000)
+
+    assert not hasattr(prosumer, '__dict__')
+    with pytest.raises(AttributeError):
+        prosumer.unknown_attribute = 1
+
+def test_compact_prosumer_behaves_like_prosumer():
+    """
+    Test that the compact prosumer follows the same consumption and storage rules as the prosumer.
+    """
+    regular = Prosumer(name="H1", storage_capacity=5000)
+    compact = CompactProsumer(name="H1", storage_capacity=5000)
+
+    for prosumer in (regular, compact):
+        prosumer.produce(6000)
+        prosumer.consume(8000)
+        prosumer.receive(1500, "LVL1")
+
+    for field in Prosumer.log_fields + ('total_consumption', 'total_production'):
+        assert getattr(compact, field) == getattr(regular, field)
+
+def test_received_commands_created_lazily():
+    """
+    Test that the command list is only allocated when a command arrives.
+    """
+    prosumer = CompactProsumer(name="H1")
+    assert prosumer._received_commands is None
+
+    prosumer.receive_command("Reduce consumption by 500 W")
+    assert list(prosumer.received_commands) == ["Reduce consumption by 500 W"]
@@ -15,7 +15,7 @@ def test_prosumer_initialization(prosumer):
     assert prosumer.storage_capacity == 5000
     assert prosumer.stored_energy == 0
     assert prosumer.net_power == 0
-    assert prosumer.received_commands == []
+    assert list(prosumer.received_commands) == []
 
 def test_prosumer_net_power(prosumer):
     """
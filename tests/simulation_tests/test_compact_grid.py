@@ -0,0 +1,57 @@
+import os
+import csv
+import pytest
+from pyaspg.simulation import PyASPGCreator, GridSimulator
+from pyaspg.distribution import CompactTransmitter, CompactDistributor, CompactSubstation
+from pyaspg.communication import CompactSmartMeter, CommunicationNetwork
+from pyaspg.management import CompactNetAggregator, UtilityCompany
+from pyaspg.prosume import Prosumer, CompactProsumer
+from pyaspg.generation import WindTurbine
+
+def test_simulation_logs_compact_components(tmp_path):
+    """
+    Test that DataLog writes every component type of a grid built from slotted classes.
+    """
+    network = CommunicationNetwork(name="SGN", reliability=1.0)
+    transmitter = CompactTransmitter(name="HVL1")
+    substation = CompactSubstation(name="MS1", input_voltage=25000, output_voltage=10000)
+    distributor = CompactDistributor(name="LVL1")
+    aggregator = CompactNetAggregator(name="NA1")
+    prosumers = [CompactProsumer(name=f"H{i+1}", storage_capacity=100) for i in range(3)]
+    meters = [CompactSmartMeter(prosumer=prosumer, communication_network=network) for prosumer in prosumers]
+
+    grid_creator = PyASPGCreator()
+    grid_creator.define_connections(
+        generator_to_transmitter=[(WindTurbine(name="WT1", nominal_capacity=2000, voltage=25000), transmitter, {'wind_speed': [0.5] * 3})],
+        transmitter_to_substation=[(transmitter, substation)],
+        substation_to_distributor=[(substation, distributor)],
+        distributor_to_prosumer=[(distributor, prosumer) for prosumer in prosumers],
+        prosumer_to_smart_meter=list(zip(prosumers, meters)),
+        smart_meter_to_aggregator=[(meter, aggregator) for meter in meters],
+        aggregator_to_utility=[(aggregator, UtilityCompany(name="UC1"))],
+    )
+    GridSimulator(grid_creator).run_simulation(duration=3, timestep=1, output_dir=str(tmp_path))
+
+    with open(os.path.join(tmp_path, "distributors.csv"), encoding="UTF-8") as file:
+        rows = list(csv.reader(file))
+    assert rows[0] == ['timestep'] + list(CompactDistributor.log_fields) + ['power_to_prosumers']
+    assert len(rows) == 4
+
+    with open(os.path.join(tmp_path, "prosumers.csv"), encoding="UTF-8") as file:
+        rows = list(csv.reader(file))
+    assert rows[0] == ['timestep', 'name', 'stored_energy_before', 'net_power_before', 'received_power', 'stored_energy', 'net_power', 'distributor_name']
+    assert len(rows) == 1 + 3 * 3
+
+def test_full_and_compact_prosumers_share_a_layer():
+    """
+    Test that full and compact variants of a component can be connected on the same layer, while other types cannot.
+    """
+    distributor = CompactDistributor(name="LVL1")
+    prosumers = [Prosumer(name="H1"), CompactProsumer(name="H2", storage_capacity=100)]
+
+    grid_creator = PyASPGCreator()
+    grid_creator.define_connections(distributor_to_prosumer=[(distributor, prosumer) for prosumer in prosumers])
+    assert grid_creator.components['prosumers'] == prosumers
+
+    with pytest.raises(ValueError):
+        PyASPGCreator().define_connections(distributor_to_prosumer=[(distributor, prosumers[0]), (distributor, CompactDistributor(name="LVL2"))])
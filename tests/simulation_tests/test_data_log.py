@@ -0,0 +1,194 @@
+import io
+import os
+import pandas as pd
+import pytest
+from pyaspg.simulation import PyASPGCreator, GridSimulator, DataLog, OutputSpec, read_delta_log
+from pyaspg.distribution import Transmitter, Distributor
+from pyaspg.prosume import Prosumer
+from pyaspg.management import NetAggregator
+from pyaspg.communication import CommunicationNetwork
+
+def write_log(output_dir, delta, tolerance=0.0):
+    transmitters = [Transmitter(name="HVL1"), Transmitter(name="HVL2")]
+    components = {'transmitters': transmitters, 'distributors': []}
+    data_log = DataLog(str(output_dir), delta=delta, tolerance=tolerance)
+    data_log.initialize_files(components, {})
+
+    inputs = [(100, 5), (100, 5), (100.5, 5), (200, 5), (200, 7), (200, 7)]
+    for timestep, (first, second) in enumerate(inputs):
+        transmitters[0].input_power, transmitters[1].input_power = first, second
+        data_log.log_data(timestep, components, {})
+    data_log.close_files()
+    return output_dir / "transmitters.csv"
+
+def test_delta_mode_skips_unchanged_rows(tmp_path):
+    """
+    Test that delta mode only writes the rows of components whose fields changed.
+    """
+    frame = pd.read_csv(write_log(tmp_path, delta=True))
+
+    assert list(frame.loc[frame['name'] == "HVL1", 'timestep']) == [0, 2, 3]
+    assert list(frame.loc[frame['name'] == "HVL2", 'timestep']) == [0, 4]
+
+def test_delta_mode_tolerance(tmp_path):
+    """
+    Test that changes within the tolerance are not written.
+    """
+    frame = pd.read_csv(write_log(tmp_path, delta=True, tolerance=1))
+
+    assert list(frame.loc[frame['name'] == "HVL1", 'timestep']) == [0, 3]
+    assert list(frame.loc[frame['name'] == "HVL2", 'timestep']) == [0, 4]
+
+def test_read_delta_log_restores_dense_series(tmp_path):
+    """
+    Test that the reader forward-fills a delta log back to the dense log.
+    """
+    (tmp_path / "dense").mkdir()
+    (tmp_path / "delta").mkdir()
+    dense = pd.read_csv(write_log(tmp_path / "dense", delta=False))
+    restored = read_delta_log(str(write_log(tmp_path / "delta", delta=True)))
+
+    pd.testing.assert_frame_equal(restored, dense, check_dtype=False)
+
+def test_delta_mode_logs_fields_changed_in_place(tmp_path):
+    """
+    Test that delta mode writes the rows of a component whose list field is changed in place, like dense mode.
+    """
+    aggregator = NetAggregator(name="NA1")
+    components = {'aggregators': [aggregator]}
+    for delta in (False, True):
+        (tmp_path / str(delta)).mkdir()
+        aggregator.data_collected = []
+        data_log = DataLog(str(tmp_path / str(delta)), delta=delta)
+        data_log.initialize_files(components, {})
+        for timestep in range(3):
+            aggregator.data_collected.append({'prosumer': "H1", 'net_power': timestep})
+            data_log.log_data(timestep, components, {})
+        data_log.close_files()
+
+        assert len(pd.read_csv(tmp_path / str(delta) / "aggregators.csv")) == 3
+
+@pytest.mark.parametrize('use_topology', [True, False])
+def test_power_to_prosumers_on_multi_distributor_grid(tmp_path, use_topology):
+    """
+    Test that a distributor feeding several prosumers logs their summed received power, with and without the topology.
+    """
+    distributors = [Distributor(name="D1"), Distributor(name="D2")]
+    prosumers = [Prosumer(name=f"H{i}") for i in range(3)]
+    grid_creator = PyASPGCreator()
+    grid_creator.define_connections(distributor_to_prosumer=[(distributors[0], prosumers[0]), (distributors[0], prosumers[1]),
+                                                             (distributors[1], prosumers[2])])
+    for prosumer in prosumers:
+        prosumer.received_power = 1000
+
+    data_log = DataLog(str(tmp_path))
+    data_log.initialize_files(grid_creator.components, grid_creator.connections, grid_creator.topology if use_topology else None)
+    data_log.log_data(0, grid_creator.components, grid_creator.connections)
+    data_log.close_files()
+
+    frame = pd.read_csv(tmp_path / "distributors.csv")
+    assert list(frame['power_to_prosumers']) == [2000, 1000]
+
+def test_gzip_output_matches_plain(tmp_path):
+    """
+    Test that gzip-compressed logs hold the same rows as plain ones and can be read back in delta mode.
+    """
+    (tmp_path / "plain").mkdir()
+    (tmp_path / "gzip").mkdir()
+    plain = pd.read_csv(write_log(tmp_path / "plain", delta=True))
+
+    transmitters = [Transmitter(name="HVL1")]
+    data_log = DataLog(str(tmp_path / "gzip"), delta=True, compression='gzip', compression_level=1)
+    data_log.initialize_files({'transmitters': transmitters, 'distributors': []}, {})
+    for timestep, power in enumerate([100, 100, 250]):
+        transmitters[0].input_power = power
+        data_log.log_data(timestep, {'transmitters': transmitters, 'distributors': []}, {})
+    data_log.close_files()
+
+    compressed = read_delta_log(str(tmp_path / "gzip" / "transmitters.csv.gz"))
+    assert list(compressed['input_power']) == [100, 100, 250]
+    assert list(plain.columns) == list(compressed.columns)
+
+def write_compressed(output_dir, compression):
+    transmitters = [Transmitter(name="HVL1")]
+    components = {'transmitters': transmitters, 'distributors': []}
+    data_log = DataLog(str(output_dir), compression=compression)
+    data_log.initialize_files(components, {})
+    for timestep, power in enumerate([100, 100, 250]):
+        transmitters[0].input_power = power
+        data_log.log_data(timestep, components, {})
+    data_log.close_files()
+
+@pytest.mark.parametrize('compression, module', [('zstd', 'zstandard'), ('lz4', 'lz4.frame')])
+def test_zstd_and_lz4_output_matches_plain(tmp_path, compression, module):
+    """
+    Test that zstd- and lz4-compressed logs decompress to the plain log.
+    """
+    library = pytest.importorskip(module)
+    (tmp_path / "plain").mkdir()
+    (tmp_path / compression).mkdir()
+    write_compressed(tmp_path / "plain", None)
+    write_compressed(tmp_path / compression, compression)
+
+    with open(tmp_path / compression / f"transmitters.csv{DataLog.suffixes[compression]}", 'rb') as compressed_file:
+        compressed = compressed_file.read()
+    if compression == 'zstd':
+        text = library.ZstdDecompressor().stream_reader(io.BytesIO(compressed)).read()
+    else:
+        text = library.decompress(compressed)
+    assert text == (tmp_path / "plain" / "transmitters.csv").read_bytes()
+
+def test_gzip_defaults_to_a_fast_level(tmp_path):
+    """
+    Test that gzip output is written at a fast compression level by default.
+    """
+    write_compressed(tmp_path, 'gzip')
+    # Byte 8 of a gzip header is 4 for the fastest level and 2 for the slowest
+    assert (tmp_path / "transmitters.csv.gz").read_bytes()[8] == 4
+
+def test_read_delta_log_needs_a_csv_path(tmp_path):
+    """
+    Test that a path without a .csv extension is rejected rather than read with a wrong timesteps file.
+    """
+    write_log(tmp_path, delta=True)
+    os.rename(tmp_path / "transmitters.csv", tmp_path / "transmitters.txt")
+    with pytest.raises(ValueError):
+        read_delta_log(str(tmp_path / "transmitters.txt"))
+
+def test_float_precision(tmp_path):
+    """
+    Test that floats are written with the configured number of significant digits.
+    """
+    transmitters = [Transmitter(name="HVL1")]
+    transmitters[0].input_power = 2 / 3
+    data_log = DataLog(str(tmp_path), float_precision=4)
+    data_log.initialize_files({'transmitters': transmitters, 'distributors': []}, {})
+    data_log.log_data(0, {'transmitters': transmitters, 'distributors': []}, {})
+    data_log.close_files()
+
+    with open(tmp_path / "transmitters.csv", encoding="UTF-8") as file:
+        rows = file.read().splitlines()
+    assert rows[1].split(',')[2] == "0.6667"
+
+def test_invalid_compression(tmp_path):
+    """
+    Test that unknown compressions are rejected.
+    """
+    with pytest.raises(ValueError):
+        DataLog(str(tmp_path), compression='bz2')
+
+def test_compressed_files_are_complete_after_a_failed_run(tmp_path, build_grid):
+    """
+    Test that a simulation failing midway still closes its compressed files, so the rows written so far can be read.
+    """
+    simulator = GridSimulator(build_grid(CommunicationNetwork("AMI")))
+
+    def fail(env):
+        yield env.timeout(2.5)
+        raise RuntimeError("Process failed")
+
+    simulator.add_process(fail)
+    with pytest.raises(RuntimeError):
+        simulator.run_simulation(duration=5, timestep=1, output_dir=str(tmp_path), output=OutputSpec(compression='gzip'))
+
+    assert list(pd.read_csv(tmp_path / "transmitters.csv.gz")['timestep']) == [0, 1, 2]
@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+import pytest
+from pyaspg.simulation import PyASPGCreator, GridSimulator
+from pyaspg.distribution import Transmitter, Distributor, Substation
+from pyaspg.prosume import Prosumer
+from pyaspg.generation import WindTurbine
+
+def build_grid():
+    grid_creator = PyASPGCreator()
+    transmitter = Transmitter(name="HVL1")
+    substation = Substation(name="MS1", input_voltage=25000, output_voltage=10000)
+    distributor = Distributor(name="LVL1")
+    grid_creator.define_connections(
+        generator_to_transmitter=[(WindTurbine("WT1", 2000, 25000, std_dev=0), transmitter, {'wind_speed': [0.5] * 10})],
+        transmitter_to_substation=[(transmitter, substation)],
+        substation_to_distributor=[(substation, distributor)],
+        distributor_to_prosumer=[(distributor, Prosumer(name="H1")), (distributor, Prosumer(name="H2"))],
+    )
+    return grid_creator
+
+def run(tmp_path, mode, simulator=None):
+    np.random.seed(0)
+    simulator = simulator or GridSimulator(build_grid())
+    simulator.run_simulation(duration=10, timestep=1, output_dir=str(tmp_path / mode), mode=mode)
+    return pd.read_csv(tmp_path / mode / "prosumers.csv")
+
+def test_fixed_mode_matches_simpy(tmp_path):
+    """
+    Test that the plain loop runs the same steps at the same times as the SimPy process.
+    """
+    fixed = run(tmp_path, 'fixed')
+    simpy_run = run(tmp_path, 'simpy')
+
+    assert fixed['timestep'].nunique() == 10
+    pd.testing.assert_frame_equal(fixed, simpy_run)
+
+def test_auto_mode_runs_added_processes(tmp_path):
+    """
+    Test that added processes run alongside the steps, and that the fixed mode rejects them.
+    """
+    times = []
+    def sample(env):
+        while True:
+            times.append(env.now)
+            yield env.timeout(2.5)
+
+    simulator = GridSimulator(build_grid())
+    simulator.add_process(sample)
+    run(tmp_path, 'auto', simulator)
+    assert times == [0, 2.5, 5, 7.5]
+
+    with pytest.raises(ValueError):
+        run(tmp_path, 'fixed', simulator)
@@ -0,0 +1,119 @@
+import json
+import os
+import pytest
+import yaml
+from pyaspg.simulation import PyASPGCreator, GridSimulator, load_grid
+from pyaspg.generation import WindTurbine
+from pyaspg.prosume import CompactProsumer
+
+GRID = {
+    'seed': 3,
+    'components': {
+        'generators': [{'type': 'WindTurbine', 'name': 'WT{i}', 'count': 2, 'nominal_capacity': 2000, 'voltage': 25000, 'std_dev': 0}],
+        'transmitters': [{'name': 'HVL1', 'efficiency': 0.97, 'distance': 100}],
+        'substations': [{'name': 'MS1', 'input_voltage': 25000, 'output_voltage': 10000}],
+        'distributors': [{'name': 'LVL{i}', 'count': 2}],
+        'prosumers': [{'type': 'CompactProsumer', 'name': 'H{i}', 'count': 4, 'consumption_file': 'load.csv', 'vary': {'bias': [1, 2, 3, 4]}}],
+        'communication_networks': [{'name': 'SGN', 'reliability': 1.0}],
+        'smart_meters': [{'prosumers': 'H*', 'communication_network': 'SGN'}],
+        'aggregators': [{'name': 'NA1'}],
+    },
+    'connections': {
+        'generator_to_transmitter': [{'source': 'WT*', 'target': 'HVL1', 'params': {'wind_speed': [0.5, 0.5, 0.5]}}],
+        'transmitter_to_substation': [{'source': 'HVL1', 'target': 'MS1'}],
+        'substation_to_distributor': [{'source': 'MS1', 'target': 'LVL*'}],
+        'distributor_to_prosumer': [{'source': 'LVL*', 'target': 'H*', 'rule': 'round_robin'}],
+        'prosumer_to_smart_meter': [{'source': 'H*', 'target': 'H*', 'rule': 'pair'}],
+        'smart_meter_to_aggregator': [{'source': 'H*', 'target': 'NA1'}],
+    },
+}
+
+def write_grid(tmp_path, grid=GRID, name="grid.json"):
+    with open(tmp_path / "load.csv", 'w') as load_file:
+        load_file.write("Global_active_power,Sub_metering_1,Sub_metering_2,Sub_metering_3\n1.0,0,1,17\n2.0,0,2,16\n")
+    with open(tmp_path / name, 'w') as grid_file:
+        if name.endswith(".json"):
+            json.dump(grid, grid_file)
+        else:
+            yaml.safe_dump(grid, grid_file)
+    return str(tmp_path / name)
+
+def test_builds_components_and_connections(tmp_path):
+    """
+    Test that counts, index templates, varied values and connection rules expand into the expected grid.
+    """
+    grid = dict(GRID, connections=dict(GRID['connections'], distributor_to_prosumer=[{'source': 'LVL1', 'target': ['H1', 'H3']}, {'source': 'LVL2', 'target': ['H2', 'H4']}]))
+    grid_creator = load_grid(write_grid(tmp_path, grid), use_cache=False)
+    components = grid_creator.components
+
+    assert [g.name for g in components['generators']] == ['WT1', 'WT2']
+    assert all(isinstance(g, WindTurbine) for g in components['generators'])
+    assert all(isinstance(p, CompactProsumer) for p in components['prosumers'])
+    assert [p.consumption_pattern_parser.bias for p in components['prosumers']] == [1, 3, 2, 4]
+    assert len(components['smart_meters']) == 4
+    assert [(s.prosumer.name, t.name) for s, t, _ in grid_creator.connections['smart_meter_to_aggregator']] == [(f"H{i}", "NA1") for i in range(1, 5)]
+    assert [p.name for p in grid_creator.topology.descendants(components['distributors'][1], 'prosumers')] == ['H2', 'H4']
+
+def test_cache_reused_until_inputs_change(tmp_path):
+    """
+    Test that the built grid is cached by content hash and rebuilt when an input file changes.
+    """
+    path = write_grid(tmp_path, name="grid.yaml")
+    cache_dir = tmp_path / "cache"
+    first = PyASPGCreator.from_file(path, cache_dir=str(cache_dir))
+    assert len(os.listdir(cache_dir)) == 1
+
+    second = PyASPGCreator.from_file(path, cache_dir=str(cache_dir))
+    assert [p.name for p in second.components['prosumers']] == [p.name for p in first.components['prosumers']]
+    assert second.topology.layers['distributor_to_prosumer'].n_edges == 4
+
+    with open(tmp_path / "load.csv", 'a') as load_file:
+        load_file.write("3.0,0,0,0\n")
+    PyASPGCreator.from_file(path, cache_dir=str(cache_dir))
+    assert len(os.listdir(cache_dir)) == 2
+
+def test_unseeded_random_grids_are_not_cached(tmp_path):
+    """
+    Test that a grid drawing random params without a seed is rebuilt with fresh draws instead of being cached.
+    """
+    connections = dict(GRID['connections'], generator_to_transmitter=[{'source': 'WT*', 'target': 'HVL1', 'params': {'wind_speed': {'random': 3}}}])
+    grid = {key: value for key, value in GRID.items() if key != 'seed'}
+    path = write_grid(tmp_path, dict(grid, connections=connections))
+    cache_dir = tmp_path / "cache"
+
+    speeds = [load_grid(path, cache_dir=str(cache_dir)).connections['generator_to_transmitter'][0][2]['wind_speed'] for _ in range(2)]
+    assert not cache_dir.exists()
+    assert list(speeds[0]) != list(speeds[1])
+
+def test_missing_input_file(tmp_path):
+    """
+    Test that hashing a grid for the cache fails on a missing consumption file instead of leaving it out.
+    """
+    path = write_grid(tmp_path)
+    os.remove(tmp_path / "load.csv")
+    with pytest.raises(FileNotFoundError):
+        load_grid(path, cache_dir=str(tmp_path / "cache"))
+
+def test_cached_grid_runs(tmp_path):
+    """
+    Test that a grid loaded from the cache can be simulated.
+    """
+    path = write_grid(tmp_path)
+    load_grid(path, cache_dir=str(tmp_path / "cache"))
+    grid_creator = load_grid(path, cache_dir=str(tmp_path / "cache"))
+    GridSimulator(grid_creator).run_simulation(duration=3, timestep=1, output_dir=str(tmp_path / "out"))
+
+    assert grid_creator.components['prosumers'][0].last_generated_consumption == pytest.approx(1000 + 0 + 1 + 17 + 1)
+
+@pytest.mark.parametrize("change", [
+    {'components': {'generators': [{'type': 'FusionReactor', 'name': 'F1'}]}},
+    {'connections': {'distributor_to_prosumer': [{'source': 'LVL9', 'target': 'H1'}]}},
+    {'connections': {'distributor_to_prosumer': [{'source': 'LVL1', 'target': 'H1', 'rule': 'nearest'}]}},
+])
+def test_invalid_definitions(tmp_path, change):
+    """
+    Test that unknown types, unmatched names and unknown connection rules are rejected.
+    """
+    grid = {'components': dict(GRID['components'], **change.get('components', {})), 'connections': change.get('connections', {})}
+    with pytest.raises(ValueError):
+        load_grid(write_grid(tmp_path, grid), use_cache=False)
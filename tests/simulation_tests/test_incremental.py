@@ -0,0 +1,137 @@
+import numpy as np
+import pytest
+from pyaspg.simulation import PyASPGCreator, GridSimulator, SimulationCache
+from pyaspg.simulation.incremental import Resimulation, draw_key
+from pyaspg.distribution import Transmitter, Distributor, Substation
+from pyaspg.prosume import Prosumer
+from pyaspg.generation import WindTurbine, PowerPlant
+
+def build_grid(tmp_path, efficiency=0.9, storage_capacity=0, production_pattern=(300, 0)):
+    with open(tmp_path / "load.csv", 'w') as load_file:
+        load_file.write("Global_active_power,Sub_metering_1,Sub_metering_2,Sub_metering_3\n")
+        for kw in (4.0, 1.0, 6.0, 0.2):
+            load_file.write(f"{kw},0,0,0\n")
+    grid_creator = PyASPGCreator()
+    transmitter = Transmitter(name="HVL1")
+    substation = Substation(name="MS1", input_voltage=25000, output_voltage=10000)
+    feeders = [Distributor(name="LVL1", efficiency=efficiency), Distributor(name="LVL2")]
+    prosumers = [Prosumer(name=f"H{i}", consumption_file=str(tmp_path / "load.csv"), production_pattern=production_pattern,
+                          storage_capacity=storage_capacity if i == 0 else 0) for i in range(4)]
+    grid_creator.define_connections(
+        generator_to_transmitter=[(WindTurbine("WT1", 20000, 25000, std_dev=0), transmitter, {'wind_speed': np.full(8, 0.5)})],
+        transmitter_to_substation=[(transmitter, substation)],
+        substation_to_distributor=[(substation, feeder) for feeder in feeders],
+        distributor_to_prosumer=[(feeders[i // 2], prosumer) for i, prosumer in enumerate(prosumers)],
+    )
+    return grid_creator
+
+def test_rerun_matches_a_full_run(tmp_path):
+    """
+    Test that changing a distributor and a prosumer in place and resimulating gives the results of a full run.
+    """
+    grid_creator = build_grid(tmp_path)
+    simulator = GridSimulator(grid_creator)
+    cache = simulator.run_baseline(duration=8, timestep=1)
+
+    grid_creator.components['distributors'][0].efficiency = 0.3
+    grid_creator.components['prosumers'][0].storage_capacity = 2000
+    results = simulator.resimulate(cache)
+    expected = GridSimulator(build_grid(tmp_path, efficiency=0.3, storage_capacity=2000)).run_baseline(duration=8, timestep=1).results
+
+    for component_type, arrays in expected.arrays.items():
+        for field, array in arrays.items():
+            assert results[component_type, field] == pytest.approx(array), (component_type, field)
+
+def test_changed_draws_restart_the_consumption_file(tmp_path):
+    """
+    Test that a prosumer whose production changed rereads its consumption from the start, over a run that ends mid-file.
+    """
+    grid_creator = build_grid(tmp_path)
+    simulator = GridSimulator(grid_creator)
+    cache = simulator.run_baseline(duration=6, timestep=1)
+
+    grid_creator.components['prosumers'][1].production_pattern = (500, 0)
+    results = simulator.resimulate(cache)
+    modified = build_grid(tmp_path)
+    modified.components['prosumers'][1].production_pattern = (500, 0)
+    expected = GridSimulator(modified).run_baseline(duration=6, timestep=1).results
+
+    assert results['prosumers', 'received_power'][:, 1] != pytest.approx(cache.results['prosumers', 'received_power'][:, 1])
+    for component_type, arrays in expected.arrays.items():
+        for field, array in arrays.items():
+            assert results[component_type, field] == pytest.approx(array), (component_type, field)
+
+def test_changed_power_plant_starts_from_its_initial_fuel(tmp_path):
+    """
+    Test that a power plant changed after a baseline run on the same grid is recomputed from the fuel it started with.
+    """
+    grid_creator = PyASPGCreator()
+    plant = PowerPlant("PP1", 1000, 25000, fuel_capacity=50, consumption_rate=10, std_dev=0.1)
+    transmitter = Transmitter(name="HVL1")
+    substation = Substation(name="MS1", input_voltage=25000, output_voltage=10000)
+    distributor = Distributor(name="LVL1")
+    grid_creator.define_connections(
+        generator_to_transmitter=[(plant, transmitter)],
+        transmitter_to_substation=[(transmitter, substation)],
+        substation_to_distributor=[(substation, distributor)],
+        distributor_to_prosumer=[(distributor, Prosumer(name="H1", production_pattern=(0, 0)))],
+    )
+    simulator = GridSimulator(grid_creator)
+    cache = simulator.run_baseline(duration=8, timestep=1)
+    assert plant.fuel_capacity == 0
+
+    plant.std_dev = 0
+    results = simulator.resimulate(cache)
+    assert list(results['generators', 'output'][:, 0]) == [1000] * 5 + [0] * 3
+    assert list(results['generators', 'fuel_capacity'][:, 0]) == [40, 30, 20, 10, 0, 0, 0, 0]
+    assert plant.fuel_capacity == 0
+
+def test_only_dirty_feeders_rerun(tmp_path):
+    """
+    Test that the clean feeder is spliced from the cache and the dirty one replays its baseline draws.
+    """
+    grid_creator = build_grid(tmp_path, production_pattern=(300, 200))
+    simulator = GridSimulator(grid_creator)
+    cache = simulator.run_baseline(duration=8, timestep=1)
+
+    grid_creator.components['prosumers'][1].storage_capacity = 500
+    grid_creator.components['prosumers'][1].production_pattern = (9000, 0)
+    resimulation = Resimulation(grid_creator, cache, simulator.connection_handlers['distributor_to_prosumer'])
+    assert list(resimulation.dirty['distributors']) == [True, False]
+    assert list(resimulation.dirty['prosumers']) == [True, True, False, False]
+    assert not resimulation.dirty['substations'].any()
+
+    results = resimulation.run()
+    baseline = cache.results
+    assert results['prosumers', 'net_power'][:, 2:] == pytest.approx(baseline['prosumers', 'net_power'][:, 2:])
+    assert results['distributors', 'available_power'][:, 1] == pytest.approx(baseline['distributors', 'available_power'][:, 1])
+    # The unchanged prosumer of the dirty feeder replays its baseline draws
+    assert results['prosumers', 'net_power'][:, 0] == pytest.approx(baseline['prosumers', 'net_power'][:, 0])
+    assert results['prosumers', 'stored_energy'][:, 1] == pytest.approx(np.full(8, 500))
+
+def test_unchanged_grid_is_all_cached(tmp_path):
+    """
+    Test that an unchanged grid is not rerun and a saved cache can be reloaded.
+    """
+    grid_creator = build_grid(tmp_path)
+    simulator = GridSimulator(grid_creator)
+    cache = simulator.run_baseline(duration=8, timestep=1)
+    cache.save(tmp_path / "baseline.pkl")
+    cache = SimulationCache.load(tmp_path / "baseline.pkl")
+
+    results = simulator.resimulate(cache)
+    assert results['prosumers', 'net_power'] == pytest.approx(cache.results['prosumers', 'net_power'])
+    assert results['distributors', 'power_to_prosumers'] == pytest.approx(cache.results['distributors', 'power_to_prosumers'])
+
+def test_draw_keys_follow_streamed_files(tmp_path):
+    """
+    Test that prosumers streaming different directories of dated files get different draw keys.
+    """
+    for day in ("a", "b"):
+        (tmp_path / day).mkdir()
+        with open(tmp_path / day / "2007-01-01.csv", 'w') as load_file:
+            load_file.write("Global_active_power,Sub_metering_1,Sub_metering_2,Sub_metering_3\n1.0,0,0,0\n")
+    first, second, third = (Prosumer(name="H1", consumption_file=str(tmp_path / day)) for day in ("a", "b", "a"))
+
+    assert draw_key(first) != draw_key(second)
+    assert draw_key(first) == draw_key(third)
@@ -0,0 +1,80 @@
+import numpy as np
+import pytest
+from pyaspg.simulation import PyASPGCreator, GridSimulator, LiveFeed, LiveFeedReader, LiveFeedSpec
+from pyaspg.distribution import Transmitter, Distributor, Substation
+from pyaspg.prosume import Prosumer
+from pyaspg.generation import WindTurbine
+
+def test_reader_only_returns_new_records(tmp_path):
+    """
+    Test that successive reads return the records appended in between.
+    """
+    path = str(tmp_path / "feed.bin")
+    feed = LiveFeed(path, ['time', 'value'], capacity=8)
+    reader = LiveFeedReader(path)
+
+    for i in range(3):
+        feed.append([i, i * 10])
+    assert list(reader.read_new()['value']) == [0, 10, 20]
+
+    feed.append([3, 30])
+    assert list(reader.read_new()['time']) == [3]
+    assert reader.read_new().empty
+
+def test_ring_overwrites_oldest_records(tmp_path):
+    """
+    Test that a slow reader skips records the ring already overwrote.
+    """
+    path = str(tmp_path / "feed.bin")
+    feed = LiveFeed(path, ['time'], capacity=4)
+    reader = LiveFeedReader(path)
+
+    for i in range(10):
+        feed.append([i])
+    # The oldest slot of a full ring may be the one the writer is overwriting
+    assert list(reader.read_new()['time']) == [7, 8, 9]
+    assert reader.skipped == 7
+
+    feed.close()
+    assert reader.finished
+    assert list(LiveFeedReader(path).read_new()['time']) == [6, 7, 8, 9]
+
+def test_reader_drops_the_slot_being_written(tmp_path):
+    """
+    Test that a record overwritten before the count advances is not returned half-written.
+    """
+    path = str(tmp_path / "feed.bin")
+    feed = LiveFeed(path, ['time', 'value'], capacity=4)
+    for i in range(4):
+        feed.append([i, i])
+    reader = LiveFeedReader(path)
+
+    # The writer stops halfway through the next record, over the oldest slot
+    feed._records[0, 0] = 4
+    records = reader.read_new()
+    assert list(records['time']) == [1, 2, 3]
+    assert list(records['value']) == [1, 2, 3]
+
+def test_simulation_publishes_aggregates(tmp_path):
+    """
+    Test that a simulation publishes downsampled aggregates to the live feed.
+    """
+    grid_creator = PyASPGCreator()
+    transmitter = Transmitter(name="HVL1")
+    substation = Substation(name="MS1", input_voltage=25000, output_voltage=10000)
+    distributor = Distributor(name="LVL1")
+    grid_creator.define_connections(
+        generator_to_transmitter=[(WindTurbine(name="WT1", nominal_capacity=2000, voltage=25000, std_dev=0), transmitter, {'wind_speed': [0.5] * 10})],
+        transmitter_to_substation=[(transmitter, substation)],
+        substation_to_distributor=[(substation, distributor)],
+        distributor_to_prosumer=[(distributor, Prosumer(name="H1"))],
+    )
+    path = str(tmp_path / "feed.bin")
+    GridSimulator(grid_creator).run_simulation(duration=10, timestep=1, output_dir=str(tmp_path / "out"), live_feed=LiveFeedSpec(path, every=3))
+
+    reader = LiveFeedReader(path)
+    records = reader.read_new()
+    assert reader.finished
+    assert list(records['step']) == [0, 3, 6, 9]
+    assert np.allclose(records['generation'], 1000)
+    assert "LVL1.available_power" in records.columns
@@ -0,0 +1,52 @@
+import json
+import pandas as pd
+from pyaspg.simulation import PyASPGCreator, GridSimulator, LoggingSpec
+from pyaspg.distribution import Transmitter, Distributor, Substation
+from pyaspg.prosume import Prosumer
+from pyaspg.generation import WindTurbine
+
+def run(tmp_path, spec):
+    grid_creator = PyASPGCreator()
+    transmitter = Transmitter(name="HVL1", efficiency=0.97, distance=100)
+    substation = Substation(name="MS1", input_voltage=25000, output_voltage=10000, efficiency=0.98)
+    distributor = Distributor(name="LVL1", efficiency=0.9, distance=10)
+    grid_creator.define_connections(
+        generator_to_transmitter=[(WindTurbine("WT1", 2000, 25000, std_dev=0), transmitter, {'wind_speed': [0.5] * 3})],
+        transmitter_to_substation=[(transmitter, substation)],
+        substation_to_distributor=[(substation, distributor)],
+        distributor_to_prosumer=[(distributor, Prosumer(name=f"H{i}")) for i in range(10)],
+    )
+    GridSimulator(grid_creator).run_simulation(duration=3, timestep=1, output_dir=str(tmp_path), logging_spec=spec)
+
+def test_component_types_and_static_metadata(tmp_path):
+    """
+    Test that only the selected component types are logged and that static fields move to the metadata file.
+    """
+    run(tmp_path, LoggingSpec(component_types=['transmitters', 'distributors']))
+
+    assert not (tmp_path / "generators.csv").exists()
+    assert not (tmp_path / "prosumers.csv").exists()
+    transmitters = pd.read_csv(tmp_path / "transmitters.csv")
+    assert list(transmitters.columns) == ['timestep', 'name', 'input_power', 'output_power']
+    assert len(transmitters) == 3
+
+    with open(tmp_path / "metadata.json") as metadata_file:
+        metadata = json.load(metadata_file)
+    assert metadata['transmitters'] == {'HVL1': {'efficiency': 0.97, 'distance': 100}}
+    assert metadata['distributors']['LVL1']['distance'] == 10
+
+def test_names_sample_and_columns(tmp_path):
+    """
+    Test that components can be selected by name or by sample and columns by name.
+    """
+    spec = LoggingSpec(names={'transmitters': ['HVL2']}, sample={'prosumers': 3}, seed=1,
+                       columns={'prosumers': ['net_power'], 'distributors': ['power_to_prosumers']})
+    run(tmp_path, spec)
+
+    assert not (tmp_path / "transmitters.csv").exists()
+    prosumers = pd.read_csv(tmp_path / "prosumers.csv")
+    assert list(prosumers.columns) == ['timestep', 'name', 'net_power']
+    assert prosumers['name'].nunique() == 3
+    assert len(prosumers) == 9
+    distributors = pd.read_csv(tmp_path / "distributors.csv")
+    assert list(distributors.columns) == ['timestep', 'name', 'power_to_prosumers']
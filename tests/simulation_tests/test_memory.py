@@ -0,0 +1,57 @@
+import os
+import tracemalloc
+import pytest
+from pyaspg.simulation import GridSimulator, MemoryProfiler
+from pyaspg.communication import CommunicationNetwork
+
+def test_timeline_attributes_growth_to_containers(tmp_path, build_grid):
+    """
+    Test that the profiler samples every few steps and attributes the growth of the network packets.
+    """
+    network = CommunicationNetwork("AMI", reliability=1)
+    profiler = MemoryProfiler(every=2, top=5)
+    GridSimulator(build_grid(network)).run_simulation(duration=7, timestep=1, output_dir=str(tmp_path / "out"),
+                                                      memory_profile=profiler)
+
+    assert [sample['step'] for sample in profiler.timeline] == [0, 2, 4, 6, 7]
+    packets = [sample['containers']['communication_networks.transmitted_data'][0] for sample in profiler.timeline]
+    assert packets[-1] == len(network.transmitted_data) > 0
+    assert packets == sorted(packets)
+    assert profiler.timeline[0]['containers']['prosumers.consumption_data'][0] == 3
+    assert profiler.timeline[0]['containers']['data_log.buffer_capacity'][1] > 0
+
+    summary = profiler.summary()
+    assert summary['steps'] == 7
+    assert summary['containers']['communication_networks.transmitted_data'][0] == len(network.transmitted_data) / 7
+    assert summary['containers']['aggregators.commands'] == (0, 0)
+    assert not tracemalloc.is_tracing()
+
+    with open(os.path.join(tmp_path, "out", "simlog.txt")) as log_file:
+        simlog = log_file.read()
+    assert "Memory timeline" in simlog
+    assert "Top growing lines" in simlog
+
+def test_tracing_started_by_the_caller_is_left_running(build_grid):
+    """
+    Test that the profiler does not stop a trace it did not start.
+    """
+    tracemalloc.start()
+    try:
+        profiler = MemoryProfiler(every=3)
+        GridSimulator(build_grid(CommunicationNetwork("AMI"))).run_simulation(duration=3, timestep=1, output_dir=None,
+                                                                              memory_profile=profiler)
+        assert tracemalloc.is_tracing()
+        assert [sample['step'] for sample in profiler.timeline] == [0, 3]
+    finally:
+        tracemalloc.stop()
+
+def test_tracing_stops_when_a_step_fails(tmp_path, build_grid):
+    """
+    Test that the profiler stops tracing when the simulation raises.
+    """
+    profiler = MemoryProfiler(every=1)
+    with pytest.raises(ValueError):
+        GridSimulator(build_grid(CommunicationNetwork("AMI"), wind_speed=2)).run_simulation(duration=3, timestep=1, output_dir=str(tmp_path / "out"),
+                                                                                           memory_profile=profiler)
+    assert not tracemalloc.is_tracing()
+    assert profiler.baseline is None
@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+from pyaspg.simulation import GridSimulator
+from pyaspg.simulation.connection_handler import MessageBusHandler
+from pyaspg.communication import CommunicationNetwork, EventCommunicationNetwork
+
+# Two aggregators sharing the first meter, with the edges out of meter order
+AGGREGATOR_EDGES = [(0, 0), (3, 1), (1, 0), (2, 0), (0, 1)]
+
+@pytest.fixture
+def bus_grid(build_grid):
+    return lambda network: build_grid(network, prosumers=4, production_step=100, aggregators=2, aggregator_edges=AGGREGATOR_EDGES)
+
+def test_each_aggregator_gets_one_batch(bus_grid):
+    """
+    Test that every aggregator receives the readings of its meters as one record batch and sums it.
+    """
+    grid_creator = bus_grid(CommunicationNetwork("AMI", reliability=1))
+    GridSimulator(grid_creator, message_bus=True).run_simulation(duration=3, timestep=1, output_dir=None)
+
+    first, second = grid_creator.components['aggregators']
+    assert list(first.readings['meter_id']) == [0, 1, 2]
+    assert list(second.readings['meter_id']) == [3, 0]
+    assert list(first.readings['timestep']) == [2, 2, 2]
+    assert list(first.readings['production']) == pytest.approx([0, 300, 600])
+    assert first.readings['consumption'] == pytest.approx(np.full(3, 3000))
+    assert second.utility_data['total_production'] == pytest.approx(900)
+    assert second.utility_data['total_consumption'] == pytest.approx(6000)
+
+def test_lost_readings_are_not_delivered(bus_grid):
+    """
+    Test that a network that loses every packet delivers no batch.
+    """
+    grid_creator = bus_grid(CommunicationNetwork("AMI", reliability=0))
+    GridSimulator(grid_creator, message_bus=True).run_simulation(duration=3, timestep=1, output_dir=None)
+    assert all(aggregator.readings is None for aggregator in grid_creator.components['aggregators'])
+
+def test_event_network_delivers_batches_late(bus_grid):
+    """
+    Test that readings sent over an event-driven network reach the aggregators in batches after the latency.
+    """
+    network = EventCommunicationNetwork("AMI", reliability=1, latency=1.5)
+    grid_creator = bus_grid(network)
+    GridSimulator(grid_creator, message_bus=True).run_simulation(duration=4, timestep=1, output_dir=None)
+
+    first, second = grid_creator.components['aggregators']
+    assert network.packets_delivered == 3 * 5
+    assert list(first.readings['timestep']) == [2, 2, 2]
+    assert list(second.readings['meter_id']) == [3, 0]
+
+def test_single_connection_reports_the_meter_id(bus_grid):
+    """
+    Test that a reading delivered connection by connection carries the topology ID of its meter.
+    """
+    grid_creator = bus_grid(CommunicationNetwork("AMI", reliability=1))
+    meter = grid_creator.components['smart_meters'][3]
+    aggregator = grid_creator.components['aggregators'][1]
+    MessageBusHandler(grid_creator).handle_connection(meter, aggregator, {}, 0)
+    assert list(aggregator.readings['meter_id']) == [3]
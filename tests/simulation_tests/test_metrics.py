@@ -0,0 +1,60 @@
+import urllib.error
+import urllib.request
+import pytest
+from pyaspg.simulation import GridSimulator, MetricsExporter
+from pyaspg.communication import CommunicationNetwork
+
+def scrape(url):
+    with urllib.request.urlopen(url, timeout=5) as response:
+        assert response.headers['Content-Type'].startswith('text/plain')
+        return response.read().decode()
+
+def samples(text):
+    return dict(line.rsplit(' ', 1) for line in text.splitlines() if not line.startswith('#'))
+
+def test_endpoint_exports_run_metrics(tmp_path, build_grid):
+    """
+    Test that the endpoint serves the step, handler, packet and unserved energy metrics of a run.
+    """
+    network = CommunicationNetwork('AMI "main"', reliability=1)
+    grid_creator = build_grid(network, prosumers=2, wind_speed=0)
+    with MetricsExporter() as metrics:
+        GridSimulator(grid_creator).run_simulation(duration=3, timestep=1, output_dir=str(tmp_path / "out"), metrics=metrics)
+        values = samples(scrape(metrics.url))
+
+    assert values['pyaspg_steps_total'] == '3'
+    assert values['pyaspg_step_seconds_count'] == '3'
+    assert values['pyaspg_step_seconds_bucket{le="+Inf"}'] == '3'
+    assert float(values['pyaspg_simulation_time']) == 2
+    assert float(values['pyaspg_handler_seconds_total{connection_type="distributor_to_prosumer"}']) > 0
+    assert values['pyaspg_handler_seconds_total{connection_type="aggregator_to_utility"}'] == '0.0'
+    assert values['pyaspg_packets_sent_total{network="AMI \\"main\\""}'] == str(network.packets_sent)
+    assert network.packets_sent > 0
+    unserved = sum(prosumer.net_power for prosumer in grid_creator.components['prosumers'])
+    assert unserved > 0
+    assert float(values['pyaspg_unserved_power']) == pytest.approx(unserved)
+    assert float(values['pyaspg_output_bytes']) > 0
+    assert metrics.server is None
+
+def test_bucket_counts_are_cumulative():
+    """
+    Test that the step latency histogram is rendered with cumulative buckets.
+    """
+    metrics = MetricsExporter(buckets=(0.1, 0.2))
+    for seconds in (0.05, 0.15, 0.1, 0.5):
+        metrics.observe_step(0, seconds, [], 1)
+
+    values = samples(metrics.render())
+    assert values['pyaspg_step_seconds_bucket{le="0.1"}'] == '2'
+    assert values['pyaspg_step_seconds_bucket{le="0.2"}'] == '3'
+    assert values['pyaspg_step_seconds_bucket{le="+Inf"}'] == '4'
+    assert float(values['pyaspg_step_seconds_sum']) == pytest.approx(0.8)
+
+def test_other_paths_are_not_found():
+    """
+    Test that only /metrics is served.
+    """
+    with MetricsExporter() as metrics:
+        with pytest.raises(urllib.error.HTTPError) as error:
+            urllib.request.urlopen(metrics.url.replace('/metrics', '/'), timeout=5)
+    assert error.value.code == 404
@@ -0,0 +1,71 @@
+import os
+import time
+import numpy as np
+import pytest
+from pyaspg.simulation import PyASPGCreator, GridSimulator, StepPacer
+from pyaspg.distribution import Transmitter, Distributor, Substation
+from pyaspg.prosume import Prosumer
+from pyaspg.generation import WindTurbine
+
+def build_grid():
+    grid_creator = PyASPGCreator()
+    transmitter = Transmitter(name="HVL1")
+    substation = Substation(name="MS1", input_voltage=25000, output_voltage=10000)
+    distributor = Distributor(name="LVL1")
+    grid_creator.define_connections(
+        generator_to_transmitter=[(WindTurbine("WT1", 20000, 25000, std_dev=0), transmitter, {'wind_speed': np.full(10, 0.5)})],
+        transmitter_to_substation=[(transmitter, substation)],
+        substation_to_distributor=[(substation, distributor)],
+        distributor_to_prosumer=[(distributor, Prosumer(name="H1"))],
+    )
+    return grid_creator
+
+def test_histogram_and_summary():
+    """
+    Test the latency histogram, the misses and the summary of recorded steps.
+    """
+    pacer = StepPacer(budget=0.1, n_steps=2, bins=(0.5, 1.0))
+    for latency, slack in ((0.01, 0.09), (0.07, 0.03), (0.2, -0.1)):
+        pacer.record(latency, slack)
+
+    assert list(pacer.histogram()) == [1, 1, 1]
+    assert pacer.misses == 1
+    summary = pacer.summary()
+    assert summary['steps'] == 3
+    assert summary['miss_rate'] == pytest.approx(1 / 3)
+    assert summary['latency_max'] == pytest.approx(0.2)
+    assert summary['slack_min'] == pytest.approx(-0.1)
+
+def test_realtime_mode_paces_and_logs(tmp_path):
+    """
+    Test that the realtime mode follows the wall clock and writes its histogram to simlog.txt.
+    """
+    simulator = GridSimulator(build_grid())
+    started = time.monotonic()
+    simulator.run_simulation(duration=5, timestep=1, output_dir=str(tmp_path), mode='realtime', realtime_factor=0.05)
+
+    assert time.monotonic() - started >= 0.2
+    assert simulator.pacer.n_steps == 5
+    assert simulator.pacer.budget == pytest.approx(0.05)
+    with open(os.path.join(tmp_path, 'simlog.txt')) as log_file:
+        simlog = log_file.read()
+    assert "Deadline misses:" in simlog
+    assert "Latency histogram" in simlog
+
+def test_slow_step_misses_its_deadline():
+    """
+    Test that a step slower than its budget is counted as a miss.
+    """
+    simulator = GridSimulator(build_grid())
+    step = simulator._step
+
+    def slow_step(t, *args, **kwargs):
+        if t == 2:
+            time.sleep(0.08)
+        step(t, *args, **kwargs)
+
+    simulator._step = slow_step
+    simulator.run_simulation(duration=5, timestep=1, output_dir=None, mode='realtime', realtime_factor=0.04)
+    assert simulator.pacer.misses >= 1
+    assert simulator.pacer.slacks[2] < 0
+    assert simulator.pacer.latencies[2] >= 0.08
@@ -0,0 +1,45 @@
+from pyaspg.simulation import PyASPGCreator, GridSimulator, ProgressMonitor, ProgressSpec
+from pyaspg.distribution import Transmitter, Distributor, Substation
+from pyaspg.prosume import Prosumer
+from pyaspg.generation import WindTurbine
+
+def build_grid(n_steps):
+    grid_creator = PyASPGCreator()
+    transmitter = Transmitter(name="HVL1")
+    substation = Substation(name="MS1", input_voltage=25000, output_voltage=10000)
+    distributor = Distributor(name="LVL1")
+    grid_creator.define_connections(
+        generator_to_transmitter=[(WindTurbine("WT1", 2000, 25000, std_dev=0), transmitter, {'wind_speed': [0.5] * n_steps})],
+        transmitter_to_substation=[(transmitter, substation)],
+        substation_to_distributor=[(substation, distributor)],
+        distributor_to_prosumer=[(distributor, Prosumer(name="H1"))],
+    )
+    return grid_creator
+
+def test_callback_and_simlog(tmp_path):
+    """
+    Test that reports reach the callback every few steps and at the end, and are written to the simulation log.
+    """
+    reports = []
+    GridSimulator(build_grid(10)).run_simulation(duration=10, timestep=1, output_dir=str(tmp_path),
+                                                 progress=ProgressSpec(reports.append, every=4, log=True))
+
+    assert [report['step'] for report in reports] == [4, 8, 10]
+    assert all(report['total_steps'] == 10 for report in reports)
+    assert reports[-1]['eta'] == 0
+    assert reports[-1]['output_bytes'] > 0
+
+    with open(tmp_path / "simlog.txt", encoding="UTF-8") as log_file:
+        lines = [line for line in log_file if line.startswith("Progress:")]
+    assert len(lines) == 3
+    assert lines[-1].startswith("Progress: step 10/10 (100.0%)")
+
+def test_sliding_window(tmp_path):
+    """
+    Test that the throughput is measured over the most recent reports only.
+    """
+    monitor = ProgressMonitor(100, str(tmp_path), every=1, window=2)
+    for step in range(1, 6):
+        monitor.update(step)
+
+    assert [step for step, _ in monitor.window] == [3, 4, 5]
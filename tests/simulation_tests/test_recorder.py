@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+from pyaspg.simulation import PyASPGCreator, GridSimulator, MemoryRecorder
+from pyaspg.distribution import Transmitter, Distributor, Substation
+from pyaspg.prosume import Prosumer
+from pyaspg.generation import WindTurbine
+
+def build_grid():
+    grid_creator = PyASPGCreator()
+    transmitter = Transmitter(name="HVL1")
+    substation = Substation(name="MS1", input_voltage=25000, output_voltage=10000)
+    distributors = [Distributor(name="LVL1"), Distributor(name="LVL2")]
+    grid_creator.define_connections(
+        generator_to_transmitter=[(WindTurbine("WT1", 2000, 25000, std_dev=0), transmitter, {'wind_speed': [0.5, 0.7, 0.2, 0.9]})],
+        transmitter_to_substation=[(transmitter, substation)],
+        substation_to_distributor=[(substation, distributor) for distributor in distributors],
+        distributor_to_prosumer=[(distributors[0], Prosumer(name="H1")), (distributors[1], Prosumer(name="H2")), (distributors[1], Prosumer(name="H3"))],
+    )
+    return grid_creator
+
+def test_matches_csv_output(tmp_path):
+    """
+    Test that the in-memory results hold the same numbers as the CSV files and export to the same layout.
+    """
+    np.random.seed(0)
+    GridSimulator(build_grid()).run_simulation(duration=4, timestep=1, output_dir=str(tmp_path / "csv"))
+    np.random.seed(0)
+    results = GridSimulator(build_grid()).run_simulation(duration=4, timestep=1, output_dir=None)
+
+    assert results['prosumers', 'received_power'].shape == (4, 3)
+    assert list(results.times) == [0, 1, 2, 3]
+    assert results.names['distributors'] == ['LVL1', 'LVL2']
+
+    results.to_csv(str(tmp_path / "memory"))
+    for component_type in ('prosumers', 'distributors', 'generators'):
+        written = pd.read_csv(tmp_path / "csv" / f"{component_type}.csv")
+        exported = pd.read_csv(tmp_path / "memory" / f"{component_type}.csv")
+        for column in exported.columns:
+            assert np.allclose(exported[column], written[column]) if column != 'name' else list(exported[column]) == list(written[column])
+    assert not (tmp_path / "memory" / "simlog.txt").exists()
+
+def test_arrays_grow_past_preallocation():
+    """
+    Test that recording more steps than preallocated keeps every step.
+    """
+    grid_creator = build_grid()
+    recorder = MemoryRecorder(grid_creator.components, 2, grid_creator.topology)
+    for step in range(5):
+        grid_creator.components['prosumers'][0].received_power = step
+        recorder.record(step, grid_creator.components)
+    results = recorder.results()
+
+    assert list(results['prosumers', 'received_power'][:, 0]) == [0, 1, 2, 3, 4]
+    assert results['distributors', 'power_to_prosumers'].shape == (5, 2)
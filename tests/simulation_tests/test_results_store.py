@@ -0,0 +1,66 @@
+import os
+import numpy as np
+import pandas as pd
+import pytest
+from pyaspg.simulation import PyASPGCreator, GridSimulator, ResultsStore, LoggingSpec, OutputSpec
+from pyaspg.distribution import Transmitter, Distributor, Substation
+from pyaspg.prosume import Prosumer
+from pyaspg.generation import WindTurbine
+
+def run(tmp_path, n_steps=10, chunk_steps=4, spec=None):
+    grid_creator = PyASPGCreator()
+    transmitter = Transmitter(name="HVL1")
+    substation = Substation(name="MS1", input_voltage=25000, output_voltage=10000)
+    distributors = [Distributor(name="LVL1"), Distributor(name="LVL2")]
+    grid_creator.define_connections(
+        generator_to_transmitter=[(WindTurbine("WT1", 2000, 25000, std_dev=0), transmitter, {'wind_speed': np.linspace(0, 1, n_steps)})],
+        transmitter_to_substation=[(transmitter, substation)],
+        substation_to_distributor=[(substation, distributor) for distributor in distributors],
+        distributor_to_prosumer=[(distributors[i % 2], Prosumer(name=f"H{i + 1}")) for i in range(5)],
+    )
+    GridSimulator(grid_creator).run_simulation(duration=n_steps, timestep=1, output_dir=str(tmp_path), logging_spec=spec,
+                                               output=OutputSpec(results_store=str(tmp_path / "store"), store_chunk_steps=chunk_steps))
+    return ResultsStore(str(tmp_path / "store"))
+
+def test_store_matches_csv(tmp_path):
+    """
+    Test that the store holds the same numbers as the CSV files, split in chunks with a partial last chunk.
+    """
+    store = run(tmp_path)
+
+    assert [chunk['n_steps'] for chunk in store.index['chunks']] == [4, 4, 2]
+    assert store.names('distributors') == ['LVL1', 'LVL2']
+    written = pd.read_csv(tmp_path / "distributors.csv")
+    stored = store.frame('distributors')
+    for column in ('timestep', 'available_power', 'power_to_prosumers'):
+        assert np.allclose(stored[column], written[column])
+
+def test_range_and_component_queries(tmp_path):
+    """
+    Test that time ranges spanning chunks and component subsets return the matching slices.
+    """
+    store = run(tmp_path)
+    times, values = store.select('generators', 'output', start=3, end=6)
+    assert list(times) == [3, 4, 5, 6]
+    assert np.allclose(values[:, 0], 2000 * np.linspace(0, 1, 10)[3:7])
+
+    _, values = store.select('prosumers', 'received_power', names=['H4', 'H2'])
+    assert values.shape == (10, 2)
+
+    at_step = store.at('distributors', 7, fields=['input_power'])
+    assert list(at_step['name']) == ['LVL1', 'LVL2']
+    assert list(at_step['timestep']) == [7, 7]
+
+    times, values = store.select('generators', 'output', start=20)
+    assert times.size == 0 and values.shape == (0, 1)
+    with pytest.raises(KeyError):
+        store.select('prosumers', 'received_power', names=['H9'])
+
+def test_store_follows_logged_types(tmp_path):
+    """
+    Test that only the component types of the logging spec are stored.
+    """
+    store = run(tmp_path, spec=LoggingSpec(component_types=['distributors']))
+
+    assert list(store.index['types']) == ['distributors']
+    assert not os.path.exists(tmp_path / "store" / "prosumers")
@@ -0,0 +1,87 @@
+import numpy as np
+import pandas as pd
+import pytest
+from pyaspg.simulation import DataLog, RollupWindow
+from pyaspg.prosume import Prosumer
+from pyaspg.management import NetAggregator
+
+def write_rollups(output_dir, rollups, full_resolution=True, n_steps=7):
+    prosumers = [Prosumer(name="H1"), Prosumer(name="H2")]
+    aggregator = NetAggregator(name="AG1")
+    components = {'prosumers': prosumers, 'aggregators': [aggregator], 'distributors': []}
+    data_log = DataLog(str(output_dir), rollups=rollups, full_resolution=full_resolution)
+    data_log.initialize_files(components, {})
+
+    for timestep in range(n_steps):
+        prosumers[0].received_power = timestep
+        prosumers[1].received_power = 10 * timestep
+        aggregator.utility_data = {'total_consumption': timestep, 'total_production': 1, 'total_stored_energy': 0}
+        data_log.log_data(timestep, components, {})
+    data_log.close_files()
+
+def test_window_statistics(tmp_path):
+    """
+    Test that every closed window gets its sum, mean, min and max, and that the last partial window is written.
+    """
+    write_rollups(tmp_path, [RollupWindow('prosumers', 3, fields=['received_power'])])
+    frame = pd.read_csv(tmp_path / "prosumers_3.csv")
+    first = frame[frame['name'] == "H1"]
+
+    assert list(first['window_start']) == [0, 3, 6]
+    assert list(first['window_end']) == [3, 6, 9]
+    assert list(first['received_power_sum']) == [3, 12, 6]
+    assert list(first['received_power_mean']) == [1, 4, 6]
+    assert list(first['received_power_min']) == [0, 3, 6]
+    assert list(first['received_power_max']) == [2, 5, 6]
+    assert list(frame.loc[frame['name'] == "H2", 'received_power_sum']) == [30, 120, 60]
+
+def test_matches_pandas_resample(tmp_path):
+    """
+    Test that the rollups match resampling the full-resolution log afterwards.
+    """
+    write_rollups(tmp_path, [RollupWindow('prosumers', 2)], n_steps=8)
+    full = pd.read_csv(tmp_path / "prosumers.csv")
+    rollup = pd.read_csv(tmp_path / "prosumers_2.csv")
+
+    full['window'] = full['timestep'] // 2
+    expected = full.groupby(['window', 'name'])['received_power'].agg(['sum', 'mean', 'min', 'max']).reset_index()
+    assert np.allclose(rollup[['received_power_sum', 'received_power_mean', 'received_power_min', 'received_power_max']], expected[['sum', 'mean', 'min', 'max']])
+
+def test_aggregator_fields_without_full_resolution(tmp_path):
+    """
+    Test that aggregator data is rolled up from its dictionary and that the per-timestep files can be turned off.
+    """
+    rollups = [RollupWindow('aggregators', 4, statistics=['sum']), RollupWindow('prosumers', 60)]
+    write_rollups(tmp_path, rollups, full_resolution=False, n_steps=8)
+    frame = pd.read_csv(tmp_path / "aggregators_4.csv")
+
+    assert list(frame.columns) == ['window_start', 'window_end', 'name', 'utility_data.total_consumption_sum',
+                                   'utility_data.total_production_sum', 'utility_data.total_stored_energy_sum']
+    assert list(frame['utility_data.total_consumption_sum']) == [6, 22]
+    assert len(pd.read_csv(tmp_path / "prosumers_60.csv")) == 2
+    assert not (tmp_path / "prosumers.csv").exists()
+
+def test_invalid_statistic():
+    """
+    Test that unknown statistics are rejected.
+    """
+    with pytest.raises(ValueError):
+        RollupWindow('prosumers', 15, statistics=['median'])
+
+def test_energy_integrates_over_the_timestep(tmp_path):
+    """
+    Test that the energy of a window is the sum of its power samples times the timestep.
+    """
+    prosumer = Prosumer(name="H1")
+    components = {'prosumers': [prosumer], 'distributors': []}
+    data_log = DataLog(str(tmp_path), rollups=[RollupWindow('prosumers', 30, fields=['received_power'])],
+                       full_resolution=False, timestep=10)
+    data_log.initialize_files(components, {})
+    for t in range(0, 60, 10):
+        prosumer.received_power = 1000
+        data_log.log_data(t, components, {})
+    data_log.close_files()
+
+    frame = pd.read_csv(tmp_path / "prosumers_30.csv")
+    assert list(frame['received_power_sum']) == [3000, 3000]
+    assert list(frame['received_power_energy']) == [30000, 30000]
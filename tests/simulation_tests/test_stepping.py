@@ -0,0 +1,98 @@
+import numpy as np
+import pytest
+from pyaspg.simulation import PyASPGCreator, GridSimulator
+from pyaspg.distribution import Transmitter, Distributor, Substation
+from pyaspg.prosume import Prosumer, ReduceConsumption
+from pyaspg.communication import CommunicationNetwork, SmartMeter
+from pyaspg.management import NetAggregator
+from pyaspg.generation import WindTurbine
+
+def build_grid(tmp_path):
+    with open(tmp_path / "load.csv", 'w') as load_file:
+        load_file.write("Global_active_power,Sub_metering_1,Sub_metering_2,Sub_metering_3\n5.0,0,0,0\n")
+    grid_creator = PyASPGCreator()
+    transmitter = Transmitter(name="HVL1")
+    substation = Substation(name="MS1", input_voltage=25000, output_voltage=10000)
+    distributor = Distributor(name="LVL1")
+    grid_creator.define_connections(
+        generator_to_transmitter=[(WindTurbine("WT1", 20000, 25000, std_dev=0), transmitter, {'wind_speed': np.full(5, 0.5)})],
+        transmitter_to_substation=[(transmitter, substation)],
+        substation_to_distributor=[(substation, distributor)],
+        distributor_to_prosumer=[(distributor, Prosumer(name="H1", consumption_file=str(tmp_path / "load.csv"), production_pattern=(0, 0)))],
+    )
+    return grid_creator
+
+def test_yields_one_live_snapshot(tmp_path):
+    """
+    Test that every step yields the same handle, reflecting the live state.
+    """
+    grid_creator = build_grid(tmp_path)
+    snapshots = []
+    for snapshot in GridSimulator(grid_creator).iter_steps(duration=5, timestep=1):
+        snapshots.append((snapshot, snapshot.step, snapshot.time, snapshot.values('prosumers', 'received_power')[0]))
+
+    assert all(handle is snapshots[0][0] for handle, _, _, _ in snapshots)
+    assert [(step, time) for _, step, time, _ in snapshots] == [(i, i) for i in range(5)]
+    assert snapshots[-1][3] == pytest.approx(5000)
+
+@pytest.mark.parametrize('supply_block', [1, 3, None])
+def test_inputs_apply_to_the_next_step_only(tmp_path, supply_block):
+    """
+    Test that overrides and generator params set between steps affect the next step only, whatever the precomputed block.
+    """
+    grid_creator = build_grid(tmp_path)
+    generator = grid_creator.components['generators'][0]
+    distributor = grid_creator.components['distributors'][0]
+    received, output = [], []
+    for snapshot in GridSimulator(grid_creator).iter_steps(duration=4, timestep=1, precompute_supply=True, supply_block=supply_block):
+        received.append(grid_creator.components['prosumers'][0].received_power)
+        output.append(generator.output)
+        if snapshot.step == 0:
+            snapshot.set(distributor, 'available_power', 1000)
+        if snapshot.step == 1:
+            snapshot.set_param(generator, 'wind_speed', 0.25)
+
+    assert received[:2] == pytest.approx([5000, 1000])
+    assert output == pytest.approx([10000, 10000, 5000, 10000])
+
+def test_set_param_copies_the_series(tmp_path):
+    """
+    Test that setting a generator param leaves the caller's series untouched and fails past the end of the series.
+    """
+    grid_creator = build_grid(tmp_path)
+    generator = grid_creator.components['generators'][0]
+    wind_speed = grid_creator.connections['generator_to_transmitter'][0][2]['wind_speed']
+    for snapshot in GridSimulator(grid_creator).iter_steps(duration=5, timestep=1):
+        if snapshot.step < 4:
+            snapshot.set_param(generator, 'wind_speed', 0.25)
+        else:
+            with pytest.raises(ValueError):
+                snapshot.set_param(generator, 'wind_speed', 0.25)
+
+    assert wind_speed == pytest.approx(np.full(5, 0.5))
+    assert generator.output == pytest.approx(5000)
+
+def test_broadcast_reaches_the_metered_prosumers(tmp_path):
+    """
+    Test that a command broadcast between steps adjusts the prosumers metered by the aggregator for its time to live.
+    """
+    grid_creator = build_grid(tmp_path)
+    prosumer = grid_creator.components['prosumers'][0]
+    other = Prosumer(name="H2", consumption_file=str(tmp_path / "load.csv"), production_pattern=(0, 0))
+    network = CommunicationNetwork("AMI", reliability=1)
+    meter = SmartMeter(prosumer, network)
+    aggregator = NetAggregator("AGG1")
+    grid_creator.define_connections(
+        distributor_to_prosumer=[(grid_creator.components['distributors'][0], other)],
+        prosumer_to_smart_meter=[(prosumer, meter), (other, SmartMeter(other, network))],
+        smart_meter_to_aggregator=[(meter, aggregator)],
+    )
+
+    consumption = []
+    for snapshot in GridSimulator(grid_creator).iter_steps(duration=5, timestep=1):
+        consumption.append((prosumer.last_generated_consumption, other.last_generated_consumption))
+        if snapshot.step == 0:
+            assert snapshot.broadcast(aggregator, ReduceConsumption(2000, ttl=2)) == 1
+
+    assert consumption == [(5000, 5000), (3000, 5000), (3000, 5000), (5000, 5000), (5000, 5000)]
+    assert len(prosumer.received_commands) == 0
@@ -0,0 +1,100 @@
+import numpy as np
+import pytest
+from pyaspg.simulation import PyASPGCreator, GridSimulator
+from pyaspg.simulation.supply_chain import SupplyPrecomputer
+from pyaspg.distribution import Transmitter, Distributor, Substation
+from pyaspg.prosume import Prosumer
+from pyaspg.generation import WindTurbine, PowerPlant
+
+def build_grid(generator, params, extra_generators=()):
+    grid_creator = PyASPGCreator()
+    transmitter = Transmitter(name="HVL1", efficiency=0.97, distance=100)
+    substation = Substation(name="MS1", input_voltage=25000, output_voltage=10000, efficiency=0.98)
+    distributors = [Distributor(name="LVL1", efficiency=0.9, distance=10), Distributor(name="LVL2", efficiency=0.8, distance=5)]
+
+    grid_creator.define_connections(
+        generator_to_transmitter=[(generator, transmitter, params)] + [(g, transmitter, params) for g in extra_generators],
+        transmitter_to_substation=[(transmitter, substation)],
+        substation_to_distributor=[(substation, distributor) for distributor in distributors],
+        distributor_to_prosumer=[(distributors[0], Prosumer(name="H1")), (distributors[1], Prosumer(name="H2"))],
+    )
+    return grid_creator
+
+def step_by_step(grid_creator, n_steps):
+    simulator = GridSimulator(grid_creator)
+    history = []
+    for step in range(n_steps):
+        for component_type in GridSimulator.bus_components:
+            for component in grid_creator.components[component_type]:
+                component.reset()
+        for connection_type in GridSimulator.supply_connections:
+            handler = simulator.connection_handlers[connection_type]
+            handler.handle_layer(grid_creator.connections[connection_type], grid_creator.topology.layers[connection_type], step)
+        history.append([d.available_power for d in grid_creator.components['distributors']])
+    return np.array(history)
+
+def precomputed(grid_creator, n_steps, block_size):
+    supply = SupplyPrecomputer(grid_creator, n_steps, block_size)
+    history = []
+    for step in range(n_steps):
+        supply.apply(step)
+        history.append([d.available_power for d in grid_creator.components['distributors']])
+    return np.array(history)
+
+@pytest.mark.parametrize("block_size", [None, 1, 2, 4])
+def test_matches_handlers_for_wind(block_size):
+    """
+    Test that the precomputed supply matches the per-step handlers when generation is deterministic.
+    """
+    wind_speed = [0.8, 0.6, 0.0, 0.7, 1.0]
+    expected = step_by_step(build_grid(WindTurbine("WT1", 2000, 25000, std_dev=0), {'wind_speed': wind_speed}), 5)
+    result = precomputed(build_grid(WindTurbine("WT1", 2000, 25000, std_dev=0), {'wind_speed': wind_speed}), 5, block_size)
+
+    assert np.allclose(result, expected)
+
+def test_generators_sum_into_transmitter():
+    """
+    Test that several generators feeding one transmitter are summed in both execution paths.
+    """
+    wind_speed = [0.5, 1.0, 0.25]
+    expected_grid = build_grid(WindTurbine("WT1", 2000, 25000, std_dev=0), {'wind_speed': wind_speed}, [WindTurbine("WT2", 1000, 25000, std_dev=0)])
+    result_grid = build_grid(WindTurbine("WT1", 2000, 25000, std_dev=0), {'wind_speed': wind_speed}, [WindTurbine("WT2", 1000, 25000, std_dev=0)])
+    expected = step_by_step(expected_grid, 3)
+    result = precomputed(result_grid, 3, None)
+
+    assert np.allclose(result, expected)
+    assert expected_grid.components['transmitters'][0].input_power == pytest.approx(3000 * 0.25)
+    assert result_grid.components['transmitters'][0].input_power == pytest.approx(3000 * 0.25)
+
+def test_matches_handlers_for_power_plant():
+    """
+    Test that fuel consumption is precomputed until the power plant runs dry.
+    """
+    expected_grid = build_grid(PowerPlant("PP1", 1000, 25000, fuel_capacity=25, consumption_rate=10, std_dev=0), {})
+    result_grid = build_grid(PowerPlant("PP1", 1000, 25000, fuel_capacity=25, consumption_rate=10, std_dev=0), {})
+    expected = step_by_step(expected_grid, 5)
+    result = precomputed(result_grid, 5, 2)
+
+    assert np.allclose(result, expected)
+    assert result[3:].sum() == 0
+    assert result_grid.components['generators'][0].fuel_capacity == 0
+
+def test_invalid_wind_speed():
+    """
+    Test that out-of-range resources are rejected like in the generators.
+    """
+    supply = SupplyPrecomputer(build_grid(WindTurbine("WT1", 2000, 25000), {'wind_speed': [0.5, 1.5]}), 2)
+    with pytest.raises(ValueError):
+        supply.apply(0)
+
+def test_run_simulation_with_precomputed_supply(tmp_path):
+    """
+    Test that a simulation can run with the precomputed supply chain.
+    """
+    grid_creator = build_grid(WindTurbine("WT1", 2000, 25000, std_dev=0), {'wind_speed': [0.5] * 4})
+    GridSimulator(grid_creator).run_simulation(duration=4, timestep=1, output_dir=str(tmp_path), precompute_supply=True, supply_block=3)
+
+    with open(tmp_path / "distributors.csv", encoding="UTF-8") as file:
+        rows = file.read().splitlines()
+    assert len(rows) == 1 + 4 * 2
+    assert grid_creator.components['transmitters'][0].input_power == pytest.approx(1000)
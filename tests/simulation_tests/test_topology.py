@@ -0,0 +1,85 @@
+import numpy as np
+import pytest
+from pyaspg.simulation import PyASPGCreator
+from pyaspg.distribution import Transmitter, Distributor, Substation
+from pyaspg.prosume import Prosumer
+from pyaspg.generation import WindTurbine
+
+@pytest.fixture
+def grid():
+    grid_creator = PyASPGCreator()
+    wind_turbine = WindTurbine(name="WT1", nominal_capacity=2000, voltage=25000)
+    wind_turbine_2 = WindTurbine(name="WT2", nominal_capacity=1000, voltage=25000)
+    transmitter = Transmitter(name="HVL1", efficiency=0.97, distance=100)
+    substations = [Substation(name=f"MS{i+1}", input_voltage=25000, output_voltage=10000) for i in range(2)]
+    distributors = [Distributor(name=f"LVL{i+1}") for i in range(3)]
+    prosumers = [Prosumer(name=f"H{i+1}") for i in range(6)]
+
+    grid_creator.define_connections(
+        generator_to_transmitter=[
+            (wind_turbine, transmitter, {'wind_speed': [0.8, 0.6, 0.7]}),
+            (wind_turbine_2, transmitter, {'wind_speed': [0.5, 0.5, 0.5]}),
+        ],
+        transmitter_to_substation=[(transmitter, substation) for substation in substations],
+        substation_to_distributor=[(substations[0], distributors[0]), (substations[0], distributors[1]), (substations[1], distributors[2])],
+        distributor_to_prosumer=[(distributors[i // 2], prosumer) for i, prosumer in enumerate(prosumers)],
+    )
+    return grid_creator
+
+def test_component_ids(grid):
+    """
+    Test that component IDs are the positions in the component lists.
+    """
+    topology = grid.topology
+    for component_type, component_list in grid.components.items():
+        for i, component in enumerate(component_list):
+            assert topology.id_of(component) == i
+
+def test_layer_csr(grid):
+    """
+    Test the CSR and transposed CSR lookups of a layer.
+    """
+    layer = grid.topology.layers['distributor_to_prosumer']
+
+    assert layer.shape == (3, 6)
+    assert layer.n_edges == 6
+    assert list(layer.children(1)) == [2, 3]
+    assert list(layer.parents(5)) == [2]
+    assert list(layer.indptr) == [0, 2, 4, 6]
+
+def test_rollup(grid):
+    """
+    Test that a rollup sums source values into their targets.
+    """
+    assert np.allclose(grid.topology.layers['generator_to_transmitter'].rollup([1.5, 2.5]), [4.0])
+    assert np.allclose(grid.topology.layers['substation_to_distributor'].rollup([10.0, 20.0]), [10, 10, 20])
+    assert np.allclose(grid.topology.layers['distributor_to_prosumer'].rollup(np.arange(3)), [0, 0, 1, 1, 2, 2])
+
+def test_gather(grid):
+    """
+    Test that gathering sums target values into their sources.
+    """
+    assert np.allclose(grid.topology.layers['distributor_to_prosumer'].gather(np.arange(6)), [1, 5, 9])
+    assert np.allclose(grid.topology.layers['transmitter_to_substation'].gather([1.0, 2.0]), [3.0])
+
+def test_descendants(grid):
+    """
+    Test the topology query for all prosumers under a substation.
+    """
+    substation = grid.components['substations'][0]
+    prosumers = grid.topology.descendants(substation, 'prosumers')
+
+    assert [p.name for p in prosumers] == ["H1", "H2", "H3", "H4"]
+    assert grid.topology.descendants(substation, 'generators') == []
+
+def test_topology_kept_in_sync(grid):
+    """
+    Test that defining new connections rebuilds the topology.
+    """
+    before = grid.topology
+    distributor = grid.components['distributors'][2]
+    grid.define_connections(distributor_to_prosumer=[(distributor, Prosumer(name="H7"))])
+
+    assert grid.topology is not before
+    assert grid.topology.layers['distributor_to_prosumer'].shape == (3, 7)
+    assert list(grid.topology.layers['distributor_to_prosumer'].children(2)) == [4, 5, 6]
@@ -0,0 +1,73 @@
+import gc
+import pickle
+import pytest
+import pandas as pd
+from pyaspg.utils import ConsumptionStreamParser, ConsumptionStreamView, ConsumptionPatternParser, create_consumption_parser
+from pyaspg.prosume import Prosumer
+
+@pytest.fixture
+def dated_files(tmp_path):
+    # Written out of order, so the parser has to sort them by date
+    for day, powers in [("2007-01-02", [2.0, 2.5, "?"]), ("2007-01-01", [1.0, 1.5])]:
+        frame = pd.DataFrame({
+            "Global_active_power": powers,
+            "Sub_metering_1": [1] * len(powers),
+            "Sub_metering_2": [0] * len(powers),
+            "Sub_metering_3": [0] * len(powers),
+        })
+        frame.to_csv(tmp_path / f"{day}.csv", index=False)
+    return tmp_path
+
+@pytest.mark.parametrize("prefetch", [0, 1, 3])
+@pytest.mark.parametrize("chunk_size", [1, 2, 10])
+def test_streams_days_in_order_and_loops(dated_files, prefetch, chunk_size):
+    parser = ConsumptionStreamParser(str(dated_files), bias=10, chunk_size=chunk_size, prefetch=prefetch)
+    values = [next(parser) for _ in range(7)]
+    parser.close()
+
+    assert values == pytest.approx([1011, 1511, 2011, 2511, 11, 1011, 1511])
+    assert parser.timestep == 7
+
+def test_glob_without_loop(dated_files):
+    parser = ConsumptionStreamParser(str(dated_files / "2007-01-0[12].csv"), loop=False, chunk_size=2)
+    assert list(parser) == pytest.approx([1001, 1501, 2001, 2501, 1])
+
+def test_missing_files(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        ConsumptionStreamParser(str(tmp_path / "*.csv"))
+
+def test_pickled_parser_restarts(dated_files):
+    parser = ConsumptionStreamParser(str(dated_files), chunk_size=1)
+    next(parser)
+    restored = pickle.loads(pickle.dumps(parser))
+    parser.close()
+
+    assert next(restored) == pytest.approx(1001)
+    restored.close()
+
+def test_prosumer_source(dated_files):
+    assert isinstance(create_consumption_parser(str(dated_files / "2007-01-01.csv")), ConsumptionPatternParser)
+    prosumer = Prosumer(name="H1", consumption_file=str(dated_files))
+    assert isinstance(prosumer.consumption_pattern_parser, ConsumptionStreamView)
+    assert prosumer.generate_consumption() == pytest.approx(1001)
+
+def test_prosumers_share_one_stream(dated_files):
+    prosumers = [Prosumer(name=f"H{i}", consumption_file=str(dated_files), bias=i) for i in range(3)]
+    stream = prosumers[0].consumption_pattern_parser.stream
+    assert all(prosumer.consumption_pattern_parser.stream is stream for prosumer in prosumers)
+
+    values = [prosumer.generate_consumption() for _ in range(2) for prosumer in prosumers]
+    assert values == pytest.approx([1001, 1002, 1003, 1501, 1502, 1503])
+    assert stream._thread is not None
+
+    del prosumers
+    gc.collect()
+    assert stream._thread is None
+
+def test_views_rewind(dated_files):
+    stream = ConsumptionStreamParser(str(dated_files), chunk_size=1)
+    view = stream.view(bias=5)
+    values = [next(view) for _ in range(4)]
+    view.timestep = 1
+    assert next(view) == pytest.approx(values[1])
+    stream.close()
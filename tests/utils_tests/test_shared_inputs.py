@@ -0,0 +1,67 @@
+import pickle
+import multiprocessing
+import numpy as np
+import pytest
+from pyaspg.utils import SharedInputs, SharedArray
+from pyaspg.simulation import PyASPGCreator, GridSimulator
+from pyaspg.distribution import Transmitter, Distributor, Substation
+from pyaspg.prosume import Prosumer
+from pyaspg.generation import WindTurbine
+
+def build_grid(tmp_path, n_steps):
+    with open(tmp_path / "load.csv", 'w') as load_file:
+        load_file.write("Global_active_power,Sub_metering_1,Sub_metering_2,Sub_metering_3\n")
+        for i in range(2000):
+            load_file.write(f"{i % 7},1,0,0\n")
+    grid_creator = PyASPGCreator()
+    transmitter = Transmitter(name="HVL1")
+    substation = Substation(name="MS1", input_voltage=25000, output_voltage=10000)
+    distributor = Distributor(name="LVL1")
+    wind_speed = np.linspace(0, 1, n_steps)
+    grid_creator.define_connections(
+        generator_to_transmitter=[(WindTurbine(f"WT{i}", 20000, 25000, std_dev=0), transmitter, {'wind_speed': wind_speed}) for i in range(2)],
+        transmitter_to_substation=[(transmitter, substation)],
+        substation_to_distributor=[(substation, distributor)],
+        distributor_to_prosumer=[(distributor, Prosumer(name=f"H{i}", consumption_file=str(tmp_path / "load.csv"))) for i in range(3)],
+    )
+    return grid_creator
+
+def run_in_worker(grid_creator):
+    GridSimulator(grid_creator).run_simulation(duration=5, timestep=1, output_dir=None)
+    parser = grid_creator.components['prosumers'][0].consumption_pattern_parser
+    return parser.consumption_data is None, isinstance(parser._totals, SharedArray), parser._totals.shm.name
+
+def test_pickle_sends_handles(tmp_path):
+    grid_creator = build_grid(tmp_path, 100_000)
+    plain_size = len(pickle.dumps(grid_creator))
+    with SharedInputs() as shared:
+        shared_bytes = shared.share_grid(grid_creator)
+        # The series shared by both turbines and the file shared by the three prosumers take one block each
+        assert len(shared.blocks) == 2
+        assert shared_bytes == 2 * 800_000 + 3 * 2000 * 8
+        params = [params for _, _, params in grid_creator.connections['generator_to_transmitter']]
+        assert params[0]['wind_speed'] is params[1]['wind_speed']
+
+        data = pickle.dumps(grid_creator)
+        assert len(data) < plain_size / 10
+        copy = pickle.loads(data)
+        series = copy.connections['generator_to_transmitter'][0][2]['wind_speed']
+        assert isinstance(series, SharedArray)
+        assert series.shm.name == params[0]['wind_speed'].shm.name
+        assert series[50_000] == pytest.approx(50_000 / 99_999)
+        with pytest.raises(ValueError):
+            series[0] = 1
+        # Views pickle by value
+        assert type(pickle.loads(pickle.dumps(series[:3]))) is np.ndarray
+        del copy, series
+
+def test_workers_attach_the_blocks(tmp_path):
+    if 'fork' not in multiprocessing.get_all_start_methods():
+        pytest.skip("The fork start method is not available")
+    grid_creator = build_grid(tmp_path, 10_000)
+    with SharedInputs() as shared:
+        shared.share_grid(grid_creator)
+        name = grid_creator.components['prosumers'][0].consumption_pattern_parser._totals.shm.name
+        with multiprocessing.get_context('fork').Pool(2) as pool:
+            results = pool.map(run_in_worker, [grid_creator, grid_creator])
+    assert results == [(True, True, name)] * 2
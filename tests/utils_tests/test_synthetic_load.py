@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+from pyaspg.utils import SyntheticLoadGenerator
+from pyaspg.prosume import Prosumer, CompactProsumer
+
+def test_daily_shape_and_weekend():
+    generator = SyntheticLoadGenerator(step_minutes=60, block_size=24, seed=0, archetypes={'Flat': {
+        'base': 100, 'peaks': [(12, 1, 1000)], 'weekend_factor': 0.5, 'scale_std': 0, 'shift_std': 0, 'noise_std': 0, 'noise_correlation': 0.9,
+    }})
+    parser = generator.parser('Flat', bias=5)
+    values = np.array([next(parser) for _ in range(24 * 7)])
+
+    assert values[12] == pytest.approx(1105)
+    assert values[0] == pytest.approx(105)
+    # Saturday noon is the sixth day
+    assert values[5 * 24 + 12] == pytest.approx(605)
+    assert parser.timestep == 24 * 7
+
+def test_blocks_are_seeded_and_lazy():
+    first = SyntheticLoadGenerator(block_size=100, seed=1)
+    second = SyntheticLoadGenerator(block_size=100, seed=1)
+    parsers = [first.parser(prosumer_type) for prosumer_type in ('House', 'Apartment', 'Office')]
+    others = [second.parser(prosumer_type) for prosumer_type in ('House', 'Apartment', 'Office')]
+
+    assert not first._blocks
+    values = [[next(parser) for parser in parsers] for _ in range(250)]
+    assert sorted(first._blocks) == [100, 200]
+    assert values == [[next(parser) for parser in others] for _ in range(250)]
+    assert np.min(values) >= 0
+
+def test_noise_is_correlated_in_time():
+    generator = SyntheticLoadGenerator(step_minutes=1, block_size=1440, seed=2, common_noise=0)
+    parsers = [generator.parser('Office') for _ in range(50)]
+    generator.compute_block(0)
+    relative = generator._blocks[0] / generator.shapes(0, 1440) - 1
+
+    lag_correlation = np.corrcoef(relative[:, 1:].ravel(), relative[:, :-1].ravel())[0, 1]
+    assert lag_correlation > 0.9
+
+def test_plugs_into_prosumers():
+    generator = SyntheticLoadGenerator(seed=3)
+    prosumers = [Prosumer(name="H1", consumption_parser=generator.parser('House')),
+                 CompactProsumer(name="A1", prosumer_type="Apartment", consumption_parser=generator.parser('Apartment'))]
+
+    assert all(prosumer.generate_consumption() > 0 for prosumer in prosumers)
+    with pytest.raises(ValueError):
+        generator.parser('House')
+    with pytest.raises(ValueError):
+        SyntheticLoadGenerator().parser('Castle')